@@ -0,0 +1,110 @@
+"""initial schema
+
+Creates the tables the models declared before JSONB support. Databases set
+up from the Supabase schema already have some of them; only missing tables
+are created, so this revision can be applied to those as well.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    ]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'templates' not in existing:
+        op.create_table(
+            'templates',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('title', sa.String(), nullable=False),
+            sa.Column('description', sa.String()),
+            sa.Column('sections', sa.JSON(), nullable=False),
+            sa.Column('version', sa.Integer()),
+            sa.Column('is_active', sa.Boolean()),
+            *_timestamps()
+        )
+        op.create_index('ix_templates_created_at_id', 'templates', ['created_at', 'id'])
+
+    if 'questionnaire_responses' not in existing:
+        op.create_table(
+            'questionnaire_responses',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                'template_id', postgresql.UUID(as_uuid=True),
+                sa.ForeignKey('templates.id'), nullable=False
+            ),
+            sa.Column('responses', sa.JSON(), nullable=False),
+            sa.Column('status', sa.String(), server_default='submitted', nullable=False),
+            *_timestamps()
+        )
+
+    if 'book_outlines' not in existing:
+        op.create_table(
+            'book_outlines',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                'questionnaire_id', postgresql.UUID(as_uuid=True),
+                sa.ForeignKey('questionnaire_responses.id')
+            ),
+            sa.Column('chapters', sa.JSON(), nullable=False),
+            sa.Column('status', sa.String(), server_default='draft', nullable=False),
+            *_timestamps()
+        )
+
+    if 'audiobooks' not in existing:
+        op.create_table(
+            'audiobooks',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                'outline_id', postgresql.UUID(as_uuid=True),
+                sa.ForeignKey('book_outlines.id')
+            ),
+            sa.Column('chapter_files', sa.JSON(), nullable=False),
+            sa.Column('total_duration', sa.Integer()),
+            sa.Column('status', sa.String(), server_default='generating', nullable=False),
+            *_timestamps()
+        )
+
+    if 'jobs' not in existing:
+        op.create_table(
+            'jobs',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('kind', sa.String(), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('idempotency_key', sa.String(), unique=True),
+            sa.Column('status', sa.String(), server_default='queued', nullable=False),
+            sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('max_attempts', sa.Integer(), server_default='3', nullable=False),
+            sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('locked_by', sa.String()),
+            sa.Column('lease_expires_at', sa.DateTime(timezone=True)),
+            sa.Column('heartbeat_at', sa.DateTime(timezone=True)),
+            sa.Column('progress', sa.Float(), server_default='0', nullable=False),
+            sa.Column('message', sa.String()),
+            sa.Column('result', sa.JSON()),
+            sa.Column('error', sa.Text()),
+            *_timestamps()
+        )
+        op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after'])
+        op.create_index('ix_jobs_status_lease_expires_at', 'jobs', ['status', 'lease_expires_at'])
+
+
+def downgrade() -> None:
+    for table in ('jobs', 'audiobooks', 'book_outlines', 'questionnaire_responses', 'templates'):
+        op.drop_table(table)
@@ -0,0 +1,63 @@
+"""jsonb documents and questionnaire response indexes
+
+Stores templates.sections and questionnaire_responses.responses as JSONB
+and adds the indexes behind the response search and count API: composite
+B-trees for template/status/created_at filters and a jsonb_path_ops GIN
+index for answer containment (@>) and jsonpath (@?) filters.
+
+Indexes are built CONCURRENTLY, outside the migration transaction, so
+writes to questionnaire_responses are not blocked while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+JSONB_COLUMNS = [
+    ('templates', 'sections'),
+    ('questionnaire_responses', 'responses'),
+]
+
+INDEXES = {
+    'ix_questionnaire_responses_template_status_created':
+        'questionnaire_responses (template_id, status, created_at)',
+    'ix_questionnaire_responses_status_created':
+        'questionnaire_responses (status, created_at)',
+    'ix_questionnaire_responses_responses_gin':
+        'questionnaire_responses USING gin (responses jsonb_path_ops)',
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, column in JSONB_COLUMNS:
+        column_type = next(c['type'] for c in inspector.get_columns(table) if c['name'] == column)
+        # Tables created from the Supabase schema are JSONB already; the
+        # conversion rewrites the table, so skip it when there's nothing to do
+        if not isinstance(column_type, postgresql.JSONB):
+            op.alter_column(
+                table, column,
+                type_=postgresql.JSONB(),
+                postgresql_using=f'{column}::jsonb'
+            )
+
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}')
+        op.execute('ANALYZE questionnaire_responses')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    # The columns stay JSONB: the original Supabase schema declares them so
+    # and JSONB reads back the same documents as json
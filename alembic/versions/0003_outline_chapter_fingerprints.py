@@ -0,0 +1,83 @@
+"""fingerprints on outline chapters
+
+Adds a fingerprint to every chapter in book_outlines.chapters, as new
+outlines get from ChapterSchema. Rows are read in id order in batches of
+BATCH_SIZE, so memory stays flat however large the table is. Chapters
+missing a title or content are fingerprinted as if it were empty, and
+entries that aren't objects are left as they are and logged.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02
+"""
+import hashlib
+import json
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+logger = logging.getLogger(f"alembic.versions.{revision}")
+
+book_outlines = sa.table(
+    'book_outlines',
+    sa.column('id'),
+    sa.column('chapters', sa.JSON),
+)
+
+
+def _rewrite(transform) -> None:
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(book_outlines.c.id, book_outlines.c.chapters).order_by(book_outlines.c.id)
+        if last_id is not None:
+            query = query.where(book_outlines.c.id > last_id)
+        rows = bind.execute(query.limit(BATCH_SIZE)).all()
+        if not rows:
+            return
+        for outline_id, chapters in rows:
+            rewritten = []
+            for chapter in chapters or []:
+                if isinstance(chapter, dict):
+                    chapter = transform(dict(chapter))
+                else:
+                    logger.warning("Outline %s has a chapter that isn't an object; left as is", outline_id)
+                rewritten.append(chapter)
+            bind.execute(
+                book_outlines.update()
+                .where(book_outlines.c.id == outline_id)
+                .values(chapters=rewritten)
+            )
+        last_id = rows[-1][0]
+
+
+def _chapter_fingerprint(title: str, content: str) -> str:
+    # A copy of app.schemas.outline.chapter_fingerprint as of this revision;
+    # migrations must not change when the app does
+    text = json.dumps([title, content], ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _add_fingerprint(chapter: dict) -> dict:
+    chapter['fingerprint'] = _chapter_fingerprint(chapter.get('title', ""), chapter.get('content', ""))
+    return chapter
+
+
+def _drop_fingerprint(chapter: dict) -> dict:
+    chapter.pop('fingerprint', None)
+    return chapter
+
+
+def upgrade() -> None:
+    _rewrite(_add_fingerprint)
+
+
+def downgrade() -> None:
+    _rewrite(_drop_fingerprint)
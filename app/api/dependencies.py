@@ -1,10 +1,83 @@
-from fastapi import Depends
-from typing import AsyncGenerator
+from fastapi import Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
+import hmac
+from app.core.config import get_settings
+from app.core.errors import DetailedHTTPException
+from app.db.session import get_async_session, replica_session
+from app.services.template_service import TemplateService
+from app.services.questionnaire_service import QuestionnaireService
+from app.services.storage import StorageBackend, get_storage_backend
+from app.services.job_events import get_job_event_broker  # noqa: F401
+from app.services.job_queue import get_job_queue  # noqa: F401
 
-# Placeholder for dependency injection functions
-async def get_supabase_client() -> AsyncGenerator:
+def get_storage() -> StorageBackend:
     """
-    Dependency to get Supabase client
+    Dependency to get the shared storage backend; created once in the app
+    lifespan, so requests reuse its pooled connections
     """
-    # TODO: Implement Supabase client initialization
-    yield None
+    return get_storage_backend()
+
+async def get_read_session(
+    session: AsyncSession = Depends(get_async_session),
+    x_read_your_writes: bool = Header(False)
+) -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get a session for read-only endpoints: a replica when one
+    is available, failing over to the primary session if the replica does.
+    Neither connects until a statement runs. Clients that just wrote and
+    need to read it back, e.g. right after creating a template, send
+    X-Read-Your-Writes: true.
+    """
+    if x_read_your_writes:
+        yield session
+        return
+    async with replica_session(fallback=session) as replica:
+        yield replica if replica is not None else session
+
+def get_template_service(
+    session: AsyncSession = Depends(get_async_session)
+) -> TemplateService:
+    """
+    Dependency to get a TemplateService bound to the request's session
+    """
+    return TemplateService(session)
+
+def get_template_reader(
+    session: AsyncSession = Depends(get_read_session)
+) -> TemplateService:
+    """
+    Dependency to get a TemplateService for reads, possibly on a replica
+    """
+    return TemplateService(session)
+
+def get_questionnaire_service(
+    session: AsyncSession = Depends(get_async_session)
+) -> QuestionnaireService:
+    """
+    Dependency to get a QuestionnaireService bound to the request's session
+    """
+    return QuestionnaireService(session)
+
+def get_questionnaire_reader(
+    session: AsyncSession = Depends(get_read_session)
+) -> QuestionnaireService:
+    """
+    Dependency to get a QuestionnaireService for reads, possibly on a replica
+    """
+    return QuestionnaireService(session)
+
+def require_internal_token(
+    x_internal_token: Optional[str] = Header(None)
+) -> None:
+    """
+    Guard for operational endpoints: they only exist when INTERNAL_API_TOKEN
+    is configured, and then require it in the X-Internal-Token header
+    """
+    expected = get_settings().INTERNAL_API_TOKEN
+    if expected is None or not expected.get_secret_value():
+        raise DetailedHTTPException(status_code=404, detail="Not Found")
+    if x_internal_token is None or not hmac.compare_digest(
+        x_internal_token.encode(), expected.get_secret_value().encode()
+    ):
+        raise DetailedHTTPException(status_code=401, detail="Invalid internal token")
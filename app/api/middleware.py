@@ -1,32 +1,217 @@
+import gzip
+from typing import Callable, Dict, Optional
+import anyio
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import get_settings
 from app.core.errors import DetailedHTTPException
 import uuid
 from loguru import logger
 
-async def error_handler(request: Request, call_next):
-    try:
-        response = await call_next(request)
-        return response
-    except DetailedHTTPException as e:
-        return JSONResponse(
-            status_code=e.status_code,
-            content={
-                'status': 'error',
-                'detail': e.detail,
-                'request_id': e.request_id
-            }
-        )
-    except Exception as e:
-        error_id = str(uuid.uuid4())
-        logger.exception(f"Unhandled error: {error_id}")
-        return JSONResponse(
-            status_code=500,
-            content={
-                'status': 'error',
-                'detail': 'Internal server error',
-                'request_id': error_id
-            }
-        )
-
-__all__ = ['error_handler']
+def detailed_exception_response(exc: DetailedHTTPException) -> JSONResponse:
+    """
+    Render a DetailedHTTPException using the standard error contract
+    """
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=exc.get_response(include_traceback=get_settings().EXPOSE_ERROR_TRACEBACKS),
+        headers=exc.headers
+    )
+
+async def detailed_exception_handler(request: Request, exc: DetailedHTTPException):
+    """
+    Exception handler for DetailedHTTPException raised inside routes; FastAPI's
+    own HTTPException handling runs before any middleware would see it.
+    """
+    return detailed_exception_response(exc)
+
+def unhandled_exception_response(exc: Exception) -> JSONResponse:
+    error_id = str(uuid.uuid4())
+    logger.exception(f"Unhandled error: {error_id}")
+    return JSONResponse(
+        status_code=500,
+        content={
+            'status': 'error',
+            'detail': 'Internal server error',
+            'request_id': error_id
+        }
+    )
+
+class ErrorHandlerMiddleware:
+    """
+    Pure ASGI middleware turning uncaught exceptions into the JSON error
+    contract.
+
+    Unlike BaseHTTPMiddleware it does not spawn a task or pipe the response
+    through a memory stream, so streaming responses pass through untouched.
+    Errors raised after the response has started can't be rewritten and are
+    re-raised, unlogged, for the server to log once.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_started:
+                # Too late to rewrite the response; the server's error
+                # middleware logs it
+                raise
+            if isinstance(e, DetailedHTTPException):
+                response = detailed_exception_response(e)
+            else:
+                response = unhandled_exception_response(e)
+            await response(scope, receive, send)
+
+class SettingsCORSMiddleware:
+    """
+    CORSMiddleware for ALLOWED_ORIGINS, built on the first request so that
+    creating the app reads no settings
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._cors = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._cors is None:
+            self._cors = CORSMiddleware(
+                self.app,
+                allow_origins=get_settings().ALLOWED_ORIGINS,
+                allow_credentials=True,
+                allow_methods=["*"],
+                allow_headers=["*"],
+            )
+        await self._cors(scope, receive, send)
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+class CompressionMiddleware:
+    """
+    Compresses JSON responses of at least RESPONSE_COMPRESSION_MIN_BYTES
+    with brotli, when the optional brotli package is installed and the
+    client accepts it, or else gzip.
+
+    Unlike GZipMiddleware it leaves every other media type alone, so audio
+    range responses and event streams keep their bytes and lengths, and it
+    only handles single-message bodies instead of buffering streams. Large
+    bodies are compressed in a worker thread.
+    """
+
+    OFFLOAD_BYTES = 256 * 1024
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._compressors: Optional[Dict[str, Callable[[bytes], bytes]]] = None
+        self._min_bytes = 0
+
+    def _configure(self) -> None:
+        settings = get_settings()
+        self._min_bytes = settings.RESPONSE_COMPRESSION_MIN_BYTES
+        compressors = {}
+        if settings.RESPONSE_COMPRESSION_ENABLED:
+            try:
+                import brotli
+            except ImportError:
+                pass
+            else:
+                quality = settings.RESPONSE_COMPRESSION_BROTLI_QUALITY
+                compressors["br"] = lambda body: brotli.compress(body, quality=quality)
+            level = settings.RESPONSE_COMPRESSION_GZIP_LEVEL
+            compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+        self._compressors = compressors
+
+    def _choose(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for coding in self._compressors:
+            if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                return coding
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self._compressors is None:
+            self._configure()
+        coding = self._choose(scope) if self._compressors else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the first body message shows whether to compress
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            held, start = start, None
+            headers = MutableHeaders(raw=list(held.get("headers", [])))
+            body = message.get("body", b"")
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or len(body) < self._min_bytes
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith("application/json")
+            ):
+                await send(held)
+                await send(message)
+                return
+            compress = self._compressors[coding]
+            if len(body) >= self.OFFLOAD_BYTES:
+                body = await anyio.to_thread.run_sync(compress, body)
+            else:
+                body = compress(body)
+            headers["content-encoding"] = coding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**held, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+__all__ = [
+    'CompressionMiddleware',
+    'ErrorHandlerMiddleware',
+    'SettingsCORSMiddleware',
+    'detailed_exception_handler',
+    'detailed_exception_response',
+    'unhandled_exception_response'
+]
@@ -0,0 +1,77 @@
+import asyncio
+import os
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.api.dependencies import get_job_queue
+from app.api.responses import range_file_response
+from app.core.config import get_settings
+from app.core.errors import DetailedHTTPException
+from app.db.session import get_async_session
+from app.schemas.audiobook import AudiobookCreate
+from app.schemas.job import JobResponse
+from app.services.audio_service import AudioService
+from app.services.job_queue import JobQueue
+from app.utils.audio_processing import AUDIO_MEDIA_TYPES
+
+router = APIRouter()
+
+@router.post("/", response_model=JobResponse, status_code=202)
+async def create_audiobook(
+    request: AudiobookCreate,
+    idempotency_key: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session),
+    queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    Queue rendering of an approved outline. Returns the job at once; follow
+    its progress at /api/jobs/{id}/events. Retrying with the same
+    Idempotency-Key header returns the original job.
+    """
+    if idempotency_key is not None:
+        key = f"audiobook:{idempotency_key}"
+        existing = await queue.get_by_idempotency_key(session, key)
+        if existing is not None:
+            return existing
+    else:
+        key = None
+    audiobook = await AudioService(session).start_audiobook(request.outline_id)
+    return await queue.enqueue(
+        session,
+        'audiobook',
+        {'audiobook_id': str(audiobook.id)},
+        idempotency_key=key,
+        max_attempts=get_settings().JOB_MAX_ATTEMPTS
+    )
+
+@router.api_route("/{audiobook_id}/chapters/{index}", methods=["GET", "HEAD"])
+async def stream_chapter(
+    audiobook_id: UUID,
+    index: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    A chapter's audio. Supports Range requests, so players can start
+    playback and seek at once, and ETag revalidation with If-None-Match.
+    """
+    path = await AudioService(session).get_chapter_file(audiobook_id, index)
+    # Release the connection before a possibly long download
+    await session.close()
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError as e:
+        raise DetailedHTTPException(
+            status_code=404,
+            detail=f"Chapter {index} of audiobook {audiobook_id} not found",
+            internal_error=e
+        )
+    media_type = AUDIO_MEDIA_TYPES.get(path.suffix.lstrip("."), "application/octet-stream")
+    return range_file_response(
+        request,
+        path,
+        stat_result,
+        media_type,
+        chunk_size=get_settings().AUDIO_STREAM_CHUNK_BYTES
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from app.api.dependencies import require_internal_token
+from app.core.logging import get_log_pipeline_stats
+from app.db.pool_metrics import pool_metrics
+from app.db.session import get_engine, get_replicas
+from app.services.encoding import get_encoding_executor
+from app.services.template_cache import get_template_cache
+
+# Operational endpoints; disabled unless INTERNAL_API_TOKEN is set
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+@router.get("/db/pool")
+async def db_pool_metrics():
+    """Live connection pool usage and checkout wait times, per replica too"""
+    snapshot = pool_metrics.snapshot(get_engine().pool)
+    replicas = get_replicas().snapshots()
+    if replicas:
+        snapshot['replicas'] = replicas
+    return snapshot
+
+@router.get("/cache/templates")
+async def template_cache_metrics():
+    """Template cache hit/miss/eviction/invalidation counters"""
+    return get_template_cache().stats()
+
+@router.get("/logging")
+async def log_pipeline_metrics():
+    """Queued log sink counters, including records dropped on overflow"""
+    return get_log_pipeline_stats()
+
+@router.get("/encoding")
+async def encoding_pool_metrics():
+    """Encoding process pool size, queue depth and job counters"""
+    return get_encoding_executor().stats()
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from app.api.dependencies import get_job_event_broker, get_job_queue
+from app.core.errors import DetailedHTTPException
+from app.schemas.job import TERMINAL_JOB_STATUSES, JobEvent, JobResponse
+from app.services.job_events import JobEventBroker
+from app.services.job_queue import JobQueue
+
+router = APIRouter()
+
+# Comment line sent when no event arrived for this long, so proxies keep
+# the connection open
+SSE_KEEPALIVE_SECONDS = 15.0
+# How often a stream re-reads the job while the event listener is down
+SSE_POLL_SECONDS = 2.0
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    queue: JobQueue = Depends(get_job_queue)
+):
+    job = await queue.get(job_id)
+    if job is None:
+        raise DetailedHTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: UUID,
+    queue: JobQueue = Depends(get_job_queue),
+    broker: JobEventBroker = Depends(get_job_event_broker)
+):
+    """
+    Server-sent events with the job's progress: the current state first,
+    then every update pushed by the worker, until the job finishes. The
+    job is also re-read whenever no update arrived for a while, so updates
+    missed by the event listener still reach the client. A deleted job
+    ends the stream with a "deleted" event.
+    """
+    job = await queue.get(job_id)
+    if job is None:
+        raise DetailedHTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def read_event() -> Optional[JobEvent]:
+        current = await queue.get(job_id)
+        if current is None:
+            return None
+        return JobEvent(
+            job_id=current.id,
+            status=current.status,
+            progress=current.progress,
+            message=current.message
+        )
+
+    async def events() -> AsyncIterator[str]:
+        async with broker.subscribe(job_id) as updates:
+            # Re-read after subscribing so no update can fall in between
+            event = await read_event()
+            while True:
+                if event is None:
+                    yield f"event: deleted\ndata: {json.dumps({'job_id': str(job_id)})}\n\n"
+                    return
+                yield f"event: progress\ndata: {event.model_dump_json()}\n\n"
+                if event.status in TERMINAL_JOB_STATUSES:
+                    return
+                sent = event
+                while event == sent:
+                    timeout = SSE_KEEPALIVE_SECONDS if broker.listening else SSE_POLL_SECONDS
+                    try:
+                        event = await asyncio.wait_for(updates.get(), timeout)
+                    except asyncio.TimeoutError:
+                        event = await read_event()
+                        if event == sent:
+                            yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.api.dependencies import require_internal_token
+from app.core.instrumentation import render_metrics
+
+# Prometheus scrape target; guarded like /internal, so configure the
+# scrape job to send the X-Internal-Token header
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-route latency, DB time, query count and validation time histograms"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.api.dependencies import get_job_queue
+from app.core.config import get_settings
+from app.core.errors import DetailedHTTPException
+from app.db.session import get_async_session
+from app.schemas.bulk import MAX_BULK_ITEMS
+from app.schemas.job import JobResponse
+from app.schemas.outline import OutlineGenerationRequest
+from app.services.job_queue import JobQueue
+
+router = APIRouter()
+
+@router.post("/generate", response_model=JobResponse, status_code=202)
+async def generate_outlines(
+    request: OutlineGenerationRequest,
+    idempotency_key: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session),
+    queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    Queue outline generation for a cohort of questionnaire responses. One
+    job covers the whole cohort; follow it at /api/jobs/{id}/events.
+    """
+    if len(request.questionnaire_ids) > MAX_BULK_ITEMS:
+        raise DetailedHTTPException(
+            status_code=413,
+            detail=f"Outline generation is limited to {MAX_BULK_ITEMS} responses per request",
+            context={'item_count': len(request.questionnaire_ids)}
+        )
+    return await queue.enqueue(
+        session,
+        'outlines',
+        {'questionnaire_ids': [str(i) for i in dict.fromkeys(request.questionnaire_ids)]},
+        idempotency_key=f"outlines:{idempotency_key}" if idempotency_key else None,
+        max_attempts=get_settings().JOB_MAX_ATTEMPTS
+    )
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Body, Depends, Query
+from typing import Any, List, Optional, Union
+from uuid import UUID
+from app.api.dependencies import get_questionnaire_reader, get_questionnaire_service
+from app.api.responses import ModelJSONResponse
+from app.core.errors import DetailedHTTPException
+from app.schemas.bulk import MAX_BULK_ITEMS, BulkCreateResult
+from app.schemas.questionnaire import (
+    QuestionnaireResponsePage,
+    QuestionnaireResponseResponse,
+    QuestionnaireResponseWithTemplate,
+    QuestionnaireResponseWithTemplatePage,
+    ResponseCounts,
+    ResponseQuery
+)
+from app.services.questionnaire_service import QuestionnaireService
+
+router = APIRouter()
+
+@router.post("/bulk", response_model=BulkCreateResult[QuestionnaireResponseResponse])
+async def bulk_create_responses(
+    payloads: List[Any] = Body(...),
+    atomic: bool = False,
+    service: QuestionnaireService = Depends(get_questionnaire_service)
+):
+    """
+    Import many questionnaire responses in one transaction, reporting invalid
+    items by index
+    """
+    if len(payloads) > MAX_BULK_ITEMS:
+        raise DetailedHTTPException(
+            status_code=413,
+            detail=f"Bulk requests are limited to {MAX_BULK_ITEMS} items",
+            context={'item_count': len(payloads)}
+        )
+    return await service.bulk_create_responses(payloads, atomic=atomic)
+
+
+@router.post(
+    "/search",
+    response_model=Union[QuestionnaireResponseWithTemplatePage, QuestionnaireResponsePage]
+)
+async def search_responses(
+    query: ResponseQuery,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    include_template: bool = False,
+    service: QuestionnaireService = Depends(get_questionnaire_reader)
+):
+    """
+    Responses filtered by template, status, creation time and answers, in
+    pages of at most limit items; include_template adds each response's
+    template summary
+    """
+    return ModelJSONResponse(await service.search_responses(
+        query, cursor=cursor, limit=limit, include_template=include_template
+    ))
+
+@router.post("/counts", response_model=ResponseCounts)
+async def count_responses(
+    query: ResponseQuery,
+    group_by: Optional[str] = None,
+    service: QuestionnaireService = Depends(get_questionnaire_reader)
+):
+    """
+    Number of matching responses, optionally grouped by status, template_id
+    or an answer (answers.<key>)
+    """
+    return await service.count_responses(query, group_by=group_by)
+
+@router.get(
+    "/{response_id}",
+    response_model=Union[QuestionnaireResponseWithTemplate, QuestionnaireResponseResponse]
+)
+async def get_response(
+    response_id: UUID,
+    include_template: bool = False,
+    service: QuestionnaireService = Depends(get_questionnaire_reader)
+):
+    """A single questionnaire response, optionally with its template summary"""
+    response = await service.get_response(response_id, include_template=include_template)
+    if response is None:
+        raise DetailedHTTPException(
+            status_code=404,
+            detail=f"Questionnaire response {response_id} not found"
+        )
+    return ModelJSONResponse(response)
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Body, Depends, Query
+from typing import Any, List, Optional
+from uuid import UUID
+from app.api.dependencies import get_template_reader, get_template_service
+from app.api.responses import ModelJSONResponse
+from app.core.errors import DetailedHTTPException
+from app.schemas.bulk import MAX_BULK_ITEMS, BulkCreateResult
+from app.schemas.template import TemplateCreate, TemplatePage, TemplateResponse
+from app.services.template_service import TemplateService
+
+router = APIRouter()
+
+@router.post("/", response_model=TemplateResponse, status_code=201)
+async def create_template(
+    template: TemplateCreate,
+    service: TemplateService = Depends(get_template_service)
+):
+    """Create a questionnaire template"""
+    return await service.create_template(template)
+
+@router.get("/", response_model=TemplatePage)
+async def list_templates(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    service: TemplateService = Depends(get_template_reader)
+):
+    """Templates in creation order; pass next_cursor back to get the next page"""
+    # Returned as a response so the page is serialized once, without
+    # FastAPI re-validating and converting it
+    return ModelJSONResponse(await service.list_templates_page(cursor=cursor, limit=limit))
+
+@router.post("/bulk", response_model=BulkCreateResult[TemplateResponse])
+async def bulk_create_templates(
+    payloads: List[Any] = Body(...),
+    atomic: bool = False,
+    service: TemplateService = Depends(get_template_service)
+):
+    """
+    Create many templates in one transaction, reporting invalid items by index
+    """
+    if len(payloads) > MAX_BULK_ITEMS:
+        raise DetailedHTTPException(
+            status_code=413,
+            detail=f"Bulk requests are limited to {MAX_BULK_ITEMS} items",
+            context={'item_count': len(payloads)}
+        )
+    return await service.bulk_create_templates(payloads, atomic=atomic)
+
+@router.get("/{template_id}", response_model=TemplateResponse)
+async def get_template(
+    template_id: UUID,
+    service: TemplateService = Depends(get_template_reader)
+):
+    """A single template, served from the template cache when possible"""
+    template = await service.get_template_by_id(template_id)
+    if template is None:
+        raise DetailedHTTPException(
+            status_code=404,
+            detail=f"Template {template_id} not found"
+        )
+    return ModelJSONResponse(template)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic import PostgresDsn, SecretStr, AnyUrl, computed_field, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional, Literal
@@ -7,18 +8,110 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = Field(..., env="PROJECT_NAME")  # Add PROJECT_NAME to the settings configuration
     ENVIRONMENT: Literal["development", "production", "testing"] = "development"
     DEBUG: bool = True
+    # Include tracebacks of internal errors in 5xx response bodies. Never
+    # enable outside local debugging: they can leak secrets and hostnames.
+    EXPOSE_ERROR_TRACEBACKS: bool = False
     LOG_LEVEL: str = "DEBUG"
 
+    # Logging Pipeline
+    LOG_MODE: Literal["queued", "sync"] = "queued"
+    LOG_QUEUE_MAX_SIZE: int = 10000
+    LOG_QUEUE_OVERFLOW: Literal["drop", "block"] = "drop"
+    LOG_BATCH_SIZE: int = 256
+    LOG_FLUSH_INTERVAL_SECONDS: float = 0.5
+    LOG_FILE_PATH: str = "logs/audiov4.log"
+    LOG_FILE_MAX_BYTES: int = 500 * 1024 * 1024
+    LOG_FILE_RETENTION_DAYS: int = 10
+
     # Supabase Configuration
     SUPABASE_URL: AnyUrl
     SUPABASE_SERVICE_ROLE_KEY: SecretStr
     SUPABASE_ANON_KEY: SecretStr
 
+    # Object Storage
+    # "local" keeps objects under STORAGE_LOCAL_DIR (default AUDIO_OUTPUT_DIR,
+    # where chapters are rendered, so publishing them copies nothing)
+    STORAGE_BACKEND: Literal["supabase", "local"] = "local"
+    STORAGE_BUCKET: str = "audiobooks"
+    STORAGE_LOCAL_DIR: Optional[str] = None
+    STORAGE_MAX_CONNECTIONS: int = 20
+    STORAGE_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    STORAGE_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    STORAGE_TIMEOUT_SECONDS: float = 60.0
+    STORAGE_UPLOAD_CONCURRENCY: int = 4  # Files uploaded at once per audiobook
+    STORAGE_MULTIPART_THRESHOLD_BYTES: int = 6 * 1024 * 1024  # Larger files upload in parts
+
     # OpenAI Configuration
     OPENAI_API_KEY: SecretStr
 
+    # Text-to-Speech / Audio Generation
+    TTS_PROVIDER: Literal["openai", "stub"] = "openai"
+    TTS_VOICE: str = "alloy"
+    TTS_MODEL: str = "tts-1"
+    TTS_AUDIO_FORMAT: str = "wav"
+    TTS_MAX_CONCURRENCY: int = 16  # Across every book in this process
+    TTS_MAX_CONCURRENCY_PER_BOOK: int = 8
+    TTS_MAX_RETRIES: int = 3
+    TTS_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    TTS_CHUNK_MAX_CHARS: int = 4000  # OpenAI speech input limit is 4096
+    AUDIO_OUTPUT_DIR: str = "audio"
+    AUDIO_STREAM_CHUNK_BYTES: int = 256 * 1024  # Read size when sendfile is unavailable
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_DIR: str = "cache/tts"
+    TTS_CACHE_MAX_BYTES: int = 5 * 1024 ** 3
+
+    # Audio Post-processing
+    # Levels every TTS chunk and trims its edge silence; wav output only
+    AUDIO_NORMALIZE_ENABLED: bool = True
+    AUDIO_TARGET_LOUDNESS_DB: float = -18.0  # Gated RMS, dBFS
+    AUDIO_MAX_GAIN_DB: float = 20.0
+    AUDIO_SILENCE_THRESHOLD_DB: float = -50.0
+    AUDIO_KEEP_SILENCE_SECONDS: float = 0.25  # Kept at each end of a chunk
+
+    # Audio Encoding
+    # Chapters are assembled in a process pool; with a format set, wav
+    # chapters are encoded there with ffmpeg (which must be installed)
+    AUDIO_ENCODE_FORMAT: Optional[Literal["mp3", "aac"]] = None
+    AUDIO_ENCODE_BITRATE: str = "64k"
+    # Processes per API or job worker process; 0 = the cores available
+    # divided by JOB_WORKER_PROCESSES (at least 1)
+    AUDIO_ENCODE_WORKERS: int = 0
+
+    # Outline Generation (LLM)
+    LLM_PROVIDER: Literal["openai", "fake"] = "openai"
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_MAX_TOKENS: int = 2000  # Per outline completion
+    LLM_MAX_IN_FLIGHT: int = 16
+    LLM_TOKENS_PER_MINUTE: int = 200000  # Match the account's TPM limit
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_MAX_CONNECTIONS: int = 32  # Pooled HTTP connections to the provider
+    LLM_MAX_RETRIES: int = 3
+    OUTLINE_CACHE_MAX_SIZE: int = 1024
+    OUTLINE_CACHE_TTL_SECONDS: int = 3600
+    OUTLINE_WRITE_BATCH_SIZE: int = 50
+
+    # Background Jobs
+    JOB_WORKER_PROCESSES: int = 2
+    JOB_WORKER_CONCURRENCY: int = 2  # Jobs run at once by each worker process
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_HEARTBEAT_SECONDS: float = 10.0  # Must be well below JOB_LEASE_SECONDS
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_DELAY_SECONDS: float = 5.0
+
     # Database Configuration
     DATABASE_URL: PostgresDsn
+    DB_ECHO: bool = False  # Log every SQL statement; independent of DEBUG
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # Seconds; -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Set to 0 behind pgbouncer
+    # Read-only replicas, each with its own pool sized like the primary's.
+    # Empty sends reads to DATABASE_URL. Set as a JSON list in the env
+    DATABASE_REPLICA_URLS: List[PostgresDsn] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30.0  # How long a replica that failed to connect is skipped
 
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = ["*"]
@@ -26,6 +119,26 @@ class Settings(BaseSettings):
     # Security Settings
     SECRET_KEY: SecretStr
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Token for the /internal telemetry endpoints; they return 404 when unset
+    INTERNAL_API_TOKEN: Optional[SecretStr] = None
+
+    # Response Compression (JSON only; brotli when the package is installed)
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 4096
+    RESPONSE_COMPRESSION_GZIP_LEVEL: int = 1  # Higher levels cost far more for little gain on JSON
+    RESPONSE_COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Instrumentation
+    # Adds per-request app/db/validate durations to responses; they reveal
+    # backend timing to clients, so disable where that matters
+    SERVER_TIMING_ENABLED: bool = True
+    # Fail any request that issues more SQL statements than this (0 = off).
+    # Meant for tests and local runs, where an N+1 should break loudly
+    DB_QUERY_BUDGET_PER_REQUEST: int = 0
+
+    # Template Cache
+    TEMPLATE_CACHE_MAX_SIZE: int = 1024
+    TEMPLATE_CACHE_TTL_SECONDS: float = 300.0
 
     # Computed Fields
     @computed_field
@@ -48,5 +161,19 @@ class Settings(BaseSettings):
         if self.DEBUG and self.is_production:
             raise ValueError("Debug mode should not be enabled in production!")
 
-# Create a singleton settings instance
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    The process-wide settings, read from the environment and .env on first
+    call. Importing this module does no I/O, so anything that only needs
+    models or schemas (workers, CLI tools, test collection) never pays for
+    or depends on a complete configuration.
+    """
+    return Settings()
+
+def __getattr__(name: str):
+    # Keeps `from app.core.config import settings` working; it resolves to
+    # get_settings() when that import runs, so only use it inside functions
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
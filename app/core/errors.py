@@ -1,8 +1,72 @@
 from fastapi import HTTPException
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Hashable, Tuple
+import sys
+import threading
+import time
+import traceback
 import uuid
+from loguru import logger
+
+_SYS_INFO = {
+    'python_version': sys.version,
+    'platform': sys.platform
+}
+
+
+class ErrorSampler:
+    """
+    Rate-limits logging of identical errors.
+
+    At most max_per_window occurrences of the same key are logged per window;
+    the number suppressed in between is reported with the next logged one.
+    """
+
+    def __init__(
+        self,
+        max_per_window: int = 10,
+        window_seconds: float = 60.0,
+        clock=time.monotonic
+    ):
+        self.max_per_window = max_per_window
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window_started = clock()
+        self._counts: Dict[Hashable, int] = {}
+        self._suppressed: Dict[Hashable, int] = {}
+
+    def should_log(self, key: Hashable) -> Tuple[bool, int]:
+        """
+        Return (log_it, suppressed_since_last_logged) for one occurrence
+        """
+        with self._lock:
+            now = self._clock()
+            if now - self._window_started >= self.window_seconds:
+                self._window_started = now
+                self._counts.clear()
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+            if count > self.max_per_window:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False, 0
+            return True, self._suppressed.pop(key, 0)
+
+
+error_sampler = ErrorSampler()
+
 
 class DetailedHTTPException(HTTPException):
+    """
+    HTTPException carrying a request id, optional context and the internal
+    error that caused it.
+
+    Construction is cheap: the request id is generated on first access, and
+    the traceback and error trace are only built when the error is logged at
+    ERROR level (5xx with an internal error) or when error_trace is read.
+    Repeated errors of the same type from the same call site are sampled by
+    error_sampler.
+    """
+
     def __init__(
         self,
         status_code: int,
@@ -10,15 +74,76 @@ class DetailedHTTPException(HTTPException):
         internal_error: Optional[Exception] = None,
         context: Dict[str, Any] = None
     ):
-        self.request_id = str(uuid.uuid4())
-        self.error_response = {
+        self._request_id: Optional[str] = None
+        self.internal_error = internal_error
+        self.context = context or {}
+        self._error_trace: Optional[Dict[str, Any]] = None
+        super().__init__(status_code=status_code, detail=detail)
+
+        if internal_error is not None:
+            # Sample on where the error was raised rather than on the detail
+            # text, which usually interpolates ids and would never repeat
+            caller = sys._getframe(1)
+            self._log((caller.f_code.co_filename, caller.f_lineno))
+
+    @property
+    def request_id(self) -> str:
+        if self._request_id is None:
+            self._request_id = str(uuid.uuid4())
+        return self._request_id
+
+    @property
+    def error_trace(self) -> Optional[Dict[str, Any]]:
+        if self.internal_error is None:
+            return None
+        if self._error_trace is None:
+            self._error_trace = {
+                'request_id': self.request_id,
+                'error_type': type(self.internal_error).__name__,
+                'message': str(self.internal_error),
+                'traceback': traceback.format_tb(self.internal_error.__traceback__),
+                'sys_info': _SYS_INFO,
+                'context': self.context
+            }
+        return self._error_trace
+
+    def format_traceback(self) -> Optional[str]:
+        if self.internal_error is None:
+            return None
+        error = self.internal_error
+        return "".join(traceback.format_exception(type(error), error, error.__traceback__))
+
+    def _log(self, call_site: Tuple[str, int]) -> None:
+        key = (self.status_code, type(self.internal_error), call_site)
+        should_log, suppressed = error_sampler.should_log(key)
+        if not should_log:
+            return
+        if self.status_code >= 500:
+            # lazy=True: the trace is only built if a sink accepts ERROR
+            logger.opt(lazy=True).error(
+                "Detailed error occurred: {detail}",
+                detail=lambda: self.detail,
+                error_trace=lambda: self.error_trace,
+                suppressed=lambda: suppressed
+            )
+        else:
+            logger.warning(
+                "Client error: {detail} ({error_type}: {error})",
+                detail=self.detail,
+                error_type=type(self.internal_error).__name__,
+                error=self.internal_error,
+                request_id=self.request_id,
+                suppressed=suppressed
+            )
+
+    def get_response(self, include_traceback: bool = False) -> dict:
+        response = {
             'status': 'error',
-            'detail': detail,
+            'detail': self.detail,
             'request_id': self.request_id
         }
-        if context:
-            self.error_response['context'] = context
-        super().__init__(status_code=status_code, detail=detail)
-
-    def get_response(self) -> dict:
-        return self.error_response
+        if self.context:
+            response['context'] = self.context
+        if include_traceback and self.internal_error is not None:
+            response['traceback'] = self.format_traceback()
+        return response
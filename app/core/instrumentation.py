@@ -0,0 +1,266 @@
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import get_settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Cumulative histogram per label set, rendered in the Prometheus text
+    exposition format. Labels are fixed at construction.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self, *label_values: str) -> Tuple[int, float]:
+        """Observation count and sum for one label set"""
+        with self._lock:
+            series = self._series.get(label_values)
+            return (sum(series[0]), series[1][0]) if series else (0, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        for label_values, counts, total in series:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its last body chunk",
+    ("method", "route", "status")
+)
+request_db_duration = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per request",
+    ("method", "route")
+)
+request_db_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS
+)
+request_validation_duration = Histogram(
+    "http_request_validation_seconds",
+    "Time spent in pydantic model_validate per request",
+    ("method", "route")
+)
+HISTOGRAMS = (request_duration, request_db_duration, request_db_queries, request_validation_duration)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more SQL statements than DB_QUERY_BUDGET_PER_REQUEST"""
+
+
+class RequestTimings:
+    """
+    Where one request's time went; filled in by the hooks below. statements
+    is only kept (as a list) when something will inspect it, e.g. the query
+    budget.
+    """
+
+    __slots__ = ("started", "db_seconds", "db_queries", "validation_seconds", "statements")
+
+    def __init__(self, record_statements: bool = False):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.validation_seconds = 0.0
+        self.statements: Optional[List[str]] = [] if record_statements else None
+
+    def check_query_budget(self, budget: int, label: str) -> None:
+        """Raise QueryBudgetExceeded naming the most repeated statement if over budget"""
+        if not budget or self.db_queries <= budget:
+            return
+        detail = ""
+        if self.statements:
+            statement, count = Counter(self.statements).most_common(1)[0]
+            detail = f"; most repeated ({count}x): {' '.join(statement.split())[:300]}"
+        raise QueryBudgetExceeded(f"{label} issued {self.db_queries} queries, budget is {budget}{detail}")
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f"app;dur={total_ms:.1f}, "
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries", '
+            f"validate;dur={self.validation_seconds * 1000:.1f}"
+        )
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside a request"""
+    return _current_timings.get()
+
+
+@contextmanager
+def timed_validation() -> Iterator[None]:
+    """Add the time spent in the block to the current request's validation time"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.validation_seconds += time.perf_counter() - started
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestTimings]:
+    """
+    Count statements run inside the block, for code outside a request:
+
+        with count_queries() as timings:
+            await service.search_responses(query)
+        assert timings.db_queries == 1
+    """
+    timings = RequestTimings(record_statements=True)
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._instrumentation_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    started = getattr(context, "_instrumentation_started", None)
+    if timings is None or started is None:
+        return
+    timings.db_seconds += time.perf_counter() - started
+    timings.db_queries += 1
+    if timings.statements is not None:
+        timings.statements.append(statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count statements and their execution time against the current request.
+    Takes the sync engine, i.e. AsyncEngine.sync_engine; idempotent.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentationMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, DB time, query count
+    and validation time, and adding a Server-Timing header when
+    SERVER_TIMING_ENABLED is set.
+
+    Routes are labelled by their path template, so ids in URLs don't
+    create new series; requests matching no route share one label.
+
+    With DB_QUERY_BUDGET_PER_REQUEST set, a request that ran more
+    statements raises QueryBudgetExceeded once it has finished, which fails
+    the test (or shows up in the server log) that made it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._server_timing: Optional[bool] = None
+        self._query_budget = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self._server_timing is None:
+            settings = get_settings()
+            self._server_timing = settings.SERVER_TIMING_ENABLED
+            self._query_budget = settings.DB_QUERY_BUDGET_PER_REQUEST
+
+        timings = RequestTimings(record_statements=bool(self._query_budget))
+        token = _current_timings.set(timings)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self._server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timings.server_timing().encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timings.reset(token)
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            request_duration.observe(time.perf_counter() - timings.started, method, route_label, str(status))
+            request_db_duration.observe(timings.db_seconds, method, route_label)
+            request_db_queries.observe(timings.db_queries, method, route_label)
+            request_validation_duration.observe(timings.validation_seconds, method, route_label)
+        timings.check_query_budget(self._query_budget, f"{scope['method']} {scope['path']}")
+
+
+def render_metrics() -> str:
+    """All request histograms in the Prometheus text format"""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.reset()
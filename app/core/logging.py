@@ -1,13 +1,295 @@
 from loguru import logger
 import sys
 import json
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
 from pathlib import Path
-from app.core.config import settings
+from typing import Any, Dict, List, Optional
+from app.core.config import get_settings
+
+import orjson
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    return orjson.dumps(
+        payload,
+        default=str,
+        option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _record_to_dict(record: Dict[str, Any]) -> Dict[str, Any]:
+    extra = record["extra"]
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "request_id": extra.get("request_id"),
+        "message": record["message"],
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "extra": extra,
+    }
+    exception = record["exception"]
+    if exception is not None:
+        payload["exception"] = "".join(
+            traceback.format_exception(exception.type, exception.value, exception.traceback)
+        )
+    return payload
+
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    """
+    Encode one record as a JSON line, never raising.
+
+    orjson rejects some values (e.g. integers beyond 64 bits); those fall back
+    to stdlib json, and anything still unencodable becomes a repr line.
+    """
+    try:
+        payload = _record_to_dict(record)
+    except Exception:
+        return _dumps({"level": "ERROR", "message": f"Unencodable log record: {record!r}"})
+    try:
+        return _dumps(payload)
+    except Exception:
+        pass
+    try:
+        return (json.dumps(payload, default=str) + "\n").encode("utf-8")
+    except Exception:
+        return _dumps({
+            "time": payload.get("time"),
+            "level": payload.get("level"),
+            "message": repr(payload),
+        })
+
+
+class StreamTarget:
+    """Writes log batches to a binary-capable text stream such as stdout"""
+
+    def __init__(self, stream):
+        self._stream = getattr(stream, "buffer", stream)
+
+    def write(self, data: bytes) -> None:
+        self._stream.write(data)
+        self._stream.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class RotatingFileTarget:
+    """
+    Appends log batches to a file, rotating once it exceeds max_bytes and
+    deleting rotated files older than retention_days.
+
+    The directory and file are only created by the first write, which runs
+    on the log writer thread, so configuring logging does no file I/O.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, retention_days: Optional[float] = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self._file = None
+        self._size = 0
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+
+    def write(self, data: bytes) -> None:
+        if self._file is None:
+            self._open()
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        index = 1
+        while rotated.exists():
+            rotated = self.path.with_name(f"{self.path.stem}.{stamp}.{index}{self.path.suffix}")
+            index += 1
+        self.path.rename(rotated)
+        self._file = None
+        if self.retention_days is not None:
+            cutoff = time.time() - self.retention_days * 86400
+            for old in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+                if old.stat().st_mtime < cutoff:
+                    old.unlink(missing_ok=True)
+        self._open()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class QueuedJsonSink:
+    """
+    Loguru sink that hands records to a background writer thread.
+
+    The calling thread only puts the record on a bounded queue; JSON encoding
+    and all I/O happen on the writer thread, which drains the queue in
+    batches. When the queue is full, overflow="drop" discards the record
+    (and counts it) while overflow="block" waits for space.
+    """
+
+    def __init__(
+        self,
+        targets: List[Any],
+        max_queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow: str = "drop"
+    ):
+        if overflow not in ("drop", "block"):
+            raise ValueError("overflow must be 'drop' or 'block'")
+        self.targets = targets
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._reported_dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message) -> None:
+        if self.overflow == "block":
+            self._queue.put(message.record)
+            return
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        """Flush everything still queued and stop the writer thread"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._thread.join()
+        for target in self.targets:
+            target.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch or self.dropped != self._reported_dropped:
+                try:
+                    self._write_batch(batch)
+                except Exception:
+                    # The writer must outlive any single bad batch
+                    traceback.print_exc(file=sys.stderr)
+            if not batch and self._stopped.is_set():
+                return
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        chunks = [_encode_record(record) for record in records]
+        dropped = self.dropped
+        if dropped != self._reported_dropped:
+            chunks.append(_dumps({
+                "time": datetime.now().astimezone().isoformat(),
+                "level": "WARNING",
+                "message": f"Log queue full, dropped {dropped - self._reported_dropped} records",
+                "extra": {"dropped_total": dropped},
+            }))
+            self._reported_dropped = dropped
+        data = b"".join(chunks)
+        for target in self.targets:
+            try:
+                target.write(data)
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+        self.written += len(records)
+        self.batches += 1
+
+
+_queued_sinks: List[QueuedJsonSink] = []
+_queued_handler_ids: List[int] = []
+
+
+def get_log_pipeline_stats() -> Dict[str, int]:
+    """Aggregate counters of the queued log sinks, e.g. dropped records"""
+    totals = {"queued": 0, "written": 0, "dropped": 0, "batches": 0}
+    for sink in _queued_sinks:
+        for key, value in sink.stats().items():
+            totals[key] += value
+    return totals
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the queued sinks installed by setup_logging"""
+    for handler_id in _queued_handler_ids:
+        try:
+            logger.remove(handler_id)
+        except ValueError:
+            pass  # Already removed, e.g. by a later logger.remove()
+    _queued_handler_ids.clear()
+    while _queued_sinks:
+        _queued_sinks.pop().stop()
+
 
 def setup_logging():
+    """
+    Install the configured sinks in place of loguru's default. Called from
+    the app lifespan and worker start-up, never at import.
+    """
+    settings = get_settings()
+    shutdown_logging()
     # Remove default logger
     logger.remove()
-    
+
+    log_path = Path(settings.LOG_FILE_PATH)
+    console_level = "DEBUG" if settings.DEBUG else "INFO"
+
+    if settings.LOG_MODE == "queued":
+        # Records are encoded and written off the event loop thread
+        for target, level in (
+            (StreamTarget(sys.stdout), console_level),
+            (RotatingFileTarget(
+                log_path,
+                max_bytes=settings.LOG_FILE_MAX_BYTES,
+                retention_days=settings.LOG_FILE_RETENTION_DAYS
+            ), "DEBUG"),
+        ):
+            sink = QueuedJsonSink(
+                [target],
+                max_queue_size=settings.LOG_QUEUE_MAX_SIZE,
+                batch_size=settings.LOG_BATCH_SIZE,
+                flush_interval=settings.LOG_FLUSH_INTERVAL_SECONDS,
+                overflow=settings.LOG_QUEUE_OVERFLOW
+            )
+            _queued_sinks.append(sink)
+            _queued_handler_ids.append(logger.add(sink, level=level, format="{message}", catch=True))
+        return logger
+
     # Configure JSON logging
     log_format = {
         "time": "{time:YYYY-MM-DD HH:mm:ss.SSS}",
@@ -16,26 +298,24 @@ def setup_logging():
         "message": "{message}",
         "extra": "{extra}"
     }
-    
+
     # Console handler for development
     logger.add(
         sys.stdout,
         format=lambda record: json.dumps(log_format),
-        level="DEBUG" if settings.DEBUG else "INFO",
+        level=console_level,
         serialize=True
     )
-    
-    # File handler for production
-    log_path = Path("logs/audiov4.log")
-    log_path.parent.mkdir(exist_ok=True)
-    
+
+    # File handler for production; loguru creates the file on first record
     logger.add(
         log_path,
-        rotation="500 MB",
-        retention="10 days",
+        delay=True,
+        rotation=settings.LOG_FILE_MAX_BYTES,
+        retention=f"{settings.LOG_FILE_RETENTION_DAYS} days",
         format=lambda record: json.dumps(log_format),
         level="DEBUG",
         serialize=True
     )
-    
+
     return logger
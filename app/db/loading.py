@@ -0,0 +1,15 @@
+"""
+Loader options for the common Template <-> QuestionnaireResponse read
+shapes. Both relationships are lazy="raise_on_sql", so a read that touches
+one without these options fails loudly instead of issuing a query per row.
+"""
+from sqlalchemy.orm import joinedload, selectinload
+from app.models.questionnaire import QuestionnaireResponse
+
+# Many responses with their templates: one extra SELECT ... WHERE id IN (...)
+# over the distinct templates, so a template's sections are fetched once
+# rather than repeated on every joined row
+RESPONSES_WITH_TEMPLATES = selectinload(QuestionnaireResponse.template)
+
+# A single response with its template, in the same round trip
+RESPONSE_WITH_TEMPLATE = joinedload(QuestionnaireResponse.template, innerjoin=True)
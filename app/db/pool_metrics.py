@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolMetrics:
+    """
+    Counters describing how long callers wait to check a connection out of
+    the pool. A growing wait time with checked_out == size + max_overflow
+    means pool starvation rather than a slow database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.last_wait_seconds = 0.0
+
+    def record_checkout(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.last_wait_seconds = wait_seconds
+            if wait_seconds > self.wait_seconds_max:
+                self.wait_seconds_max = wait_seconds
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_seconds_total,
+                'wait_seconds_avg': self.wait_seconds_total / attempts if attempts else 0.0,
+                'wait_seconds_max': self.wait_seconds_max,
+                'last_wait_seconds': self.last_wait_seconds,
+            }
+        if pool is not None and hasattr(pool, 'checkedout'):
+            data.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'max_overflow': getattr(pool, '_max_overflow', None),
+                'timeout': pool.timeout(),
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records the time each checkout spends waiting
+    for a free connection (including connect and pre-ping) in pool_metrics.
+    """
+
+    metrics = pool_metrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> type:
+    """An InstrumentedAsyncAdaptedQueuePool recording into its own metrics, e.g. one per replica"""
+    return type("InstrumentedAsyncAdaptedQueuePool", (InstrumentedAsyncAdaptedQueuePool,), {"metrics": metrics})
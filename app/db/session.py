@@ -1,25 +1,230 @@
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from loguru import logger
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.core.config import get_settings
+from app.core.instrumentation import instrument_engine
+from app.db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, PoolMetrics, instrumented_pool_class
 
-# Async SQLAlchemy setup
-async_engine: AsyncEngine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+_async_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[sessionmaker] = None
+
+
+def _create_engine(url: str, poolclass: type) -> AsyncEngine:
+    settings = get_settings()
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # asyncpg's own statement cache and SQLAlchemy's prepared statement
+            # cache; both must be 0 behind a transaction-mode pgbouncer
+            'statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+            'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """
+    The process-wide async engine, created on first use so importing models
+    or this module never touches settings or the database driver
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_engine(str(get_settings().DATABASE_URL), InstrumentedAsyncAdaptedQueuePool)
+    return _async_engine
+
+
+def get_session_factory() -> sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+    return _session_factory
+
+
+def _is_connection_failure(error: Exception) -> bool:
+    """Errors that say the server or the link to it failed, not the statement"""
+    if isinstance(error, exc.DBAPIError):
+        return error.connection_invalidated or isinstance(error, (exc.OperationalError, exc.InterfaceError))
+    return isinstance(error, (exc.TimeoutError, OSError))
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Read-only session on a replica. It connects on its first statement,
+    like any session, so requests that never reach the database (template
+    cache hits) cost the replica nothing. If a statement fails with a
+    connection error or OperationalError, the replica is marked down and
+    the statement, and every later one, runs on the fallback session
+    instead; reads are safe to re-run.
+    """
+
+    replica_set: Optional["ReplicaSet"] = None
+    replica_index: Optional[int] = None
+    fallback: Optional[AsyncSession] = None
+    failed_over = False
+
+    async def _run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if self.failed_over:
+            return await getattr(self.fallback, method)(*args, **kwargs)
+        try:
+            return await getattr(super(), method)(*args, **kwargs)
+        except Exception as e:
+            if self.fallback is None or not _is_connection_failure(e):
+                raise
+            self.replica_set.mark_down(self.replica_index, e)
+            self.failed_over = True
+            self.info.pop('replica', None)
+            await super().close()
+            return await getattr(self.fallback, method)(*args, **kwargs)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._run("execute", *args, **kwargs)
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._run("scalar", *args, **kwargs)
+
+    async def scalars(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._run("scalars", *args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._run("get", *args, **kwargs)
+
+
+def primary_session(session: AsyncSession) -> AsyncSession:
+    """The session reading from the primary: session itself, or a replica session's fallback"""
+    if isinstance(session, ReplicaSession) and session.fallback is not None:
+        return session.fallback
+    return session
+
+
+class ReplicaSet:
+    """
+    Read replicas, each with its own engine and pool. Sessions go to them
+    round-robin; a replica that fails is skipped for retry_seconds, then
+    tried again by the next read.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], retry_seconds: float = 30.0):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._next = 0
+        self._down_until: Dict[int, float] = {}
+        self._session_factory = sessionmaker(class_=ReplicaSession, expire_on_commit=False)
+
+    def _candidates(self) -> List[int]:
+        count = len(self.engines)
+        start, self._next = self._next, (self._next + 1) % max(count, 1)
+        now = time.monotonic()
+        order = [(start + i) % count for i in range(count)]
+        return [i for i in order if self._down_until.get(i, 0.0) <= now]
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning(
+            f"Read replica {index} unavailable; skipping it for {self.retry_seconds}s",
+            error=str(error)
+        )
+
+    def session(self, fallback: Optional[AsyncSession] = None) -> Optional[ReplicaSession]:
+        """
+        A session on the next available replica that moves to fallback if
+        the replica fails; None when no replica is configured or available
+        """
+        for index in self._candidates():
+            session = self._session_factory(bind=self.engines[index])
+            session.replica_set = self
+            session.replica_index = index
+            session.fallback = fallback
+            session.info['replica'] = index
+            return session
+        return None
+
+    def snapshots(self) -> List[dict]:
+        """Pool metrics and availability of each replica, for /internal/db/pool"""
+        now = time.monotonic()
+        snapshots = []
+        for index, engine in enumerate(self.engines):
+            metrics = getattr(engine.pool, 'metrics', None)
+            snapshots.append({
+                **(metrics.snapshot(engine.pool) if metrics is not None else {}),
+                'replica': index,
+                'available': self._down_until.get(index, 0.0) <= now,
+            })
+        return snapshots
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+_replicas: Optional[ReplicaSet] = None
+
+
+def get_replicas() -> ReplicaSet:
+    """The process-wide replica set; empty unless DATABASE_REPLICA_URLS is set"""
+    global _replicas
+    if _replicas is None:
+        settings = get_settings()
+        _replicas = ReplicaSet(
+            [
+                _create_engine(str(url), instrumented_pool_class(PoolMetrics()))
+                for url in settings.DATABASE_REPLICA_URLS
+            ],
+            retry_seconds=settings.DB_REPLICA_RETRY_SECONDS
+        )
+    return _replicas
+
+
+@asynccontextmanager
+async def replica_session(fallback: Optional[AsyncSession] = None) -> AsyncIterator[Optional[AsyncSession]]:
+    """
+    A read-only session on a replica that fails over to fallback (a primary
+    session), or None if there is no replica to use. Replicas lag the
+    primary, so anything that must see a write it just made should read
+    the primary.
+    """
+    session = get_replicas().session(fallback)
+    try:
+        yield session
+    finally:
+        if session is not None:
+            await session.close()
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections; the next get_engine() starts a new pool"""
+    global _async_engine, _session_factory, _replicas
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _replicas is not None:
+        await _replicas.dispose()
+    _async_engine = None
+    _session_factory = None
+    _replicas = None
 
-AsyncSessionLocal = sessionmaker(
-    async_engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
 
 async def get_async_session() -> AsyncSession:
     """
     Dependency to get an async database session
     """
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         try:
             yield session
         finally:
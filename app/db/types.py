@@ -0,0 +1,7 @@
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSON documents are stored as JSONB on Postgres, so they can be indexed
+# with GIN and filtered with @> / @?; other dialects (SQLite in tests)
+# keep the generic JSON type
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
@@ -1,25 +1,61 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.api.middleware import error_handler
+from app.api.middleware import (
+    CompressionMiddleware,
+    ErrorHandlerMiddleware,
+    SettingsCORSMiddleware,
+    detailed_exception_handler
+)
+from app.api.responses import ModelJSONResponse
+from app.core.errors import DetailedHTTPException
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.logging import setup_logging, shutdown_logging
+from app.db.session import dispose_engine
+from app.services.encoding import shutdown_encoding_executor
+from app.services.storage import close_storage_backend, get_storage_backend
+from app.api.routes import templates, questionnaires, outlines, audiobooks, jobs, internal, metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Settings, log sinks and the engine are created here or on first use,
+    # never at import, so importing the app stays cheap
+    setup_logging()
+    # One storage client and connection pool for the whole process
+    get_storage_backend()
+    try:
+        yield
+    finally:
+        await close_storage_backend()
+        await shutdown_encoding_executor()
+        await dispose_engine()
+        shutdown_logging()
 
 # Create FastAPI app
 app = FastAPI(
     title="AudioV4",
     description="AI-powered audiobook generation platform",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ModelJSONResponse
 )
 
-# Register the error handling middleware as a proper middleware class
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        return await error_handler(request, call_next)
+# Innermost: compresses what routes return, leaves error bodies alone
+app.add_middleware(CompressionMiddleware)
 
+# Pure ASGI error middleware; keeps streaming responses unbuffered
 app.add_middleware(ErrorHandlerMiddleware)
+app.add_middleware(SettingsCORSMiddleware)
+# Outermost, so its timings include error rendering and CORS
+app.add_middleware(InstrumentationMiddleware)
+app.add_exception_handler(DetailedHTTPException, detailed_exception_handler)
 
-# Import and include routers here when created
-# from app.api.routes import router as api_router
-# app.include_router(api_router, prefix="/api/v1")
+app.include_router(templates.router, prefix="/api/templates", tags=["templates"])
+app.include_router(questionnaires.router, prefix="/api/questionnaires", tags=["questionnaires"])
+app.include_router(outlines.router, prefix="/api/outlines", tags=["outlines"])
+app.include_router(audiobooks.router, prefix="/api/audiobooks", tags=["audiobooks"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(internal.router, prefix="/internal", include_in_schema=False)
+app.include_router(metrics.router, include_in_schema=False)
 
 @app.get("/health")
 async def health_check():
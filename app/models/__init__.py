@@ -0,0 +1,9 @@
+# Import every model so that string-based relationships resolve no matter
+# which model module is imported first.
+from app.models.template import Template
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.outline import BookOutline
+from app.models.audiobook import Audiobook
+from app.models.job import Job
+
+__all__ = ['Template', 'QuestionnaireResponse', 'BookOutline', 'Audiobook', 'Job']
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, JSON, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class Audiobook(Base):
+    __tablename__ = "audiobooks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    outline_id = Column(UUID(as_uuid=True), ForeignKey('book_outlines.id'))
+    chapter_files = Column(JSON, nullable=False)
+    total_duration = Column(Integer)
+    status = Column(String, default='generating',
+                    server_default='generating',
+                    nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, JSON, DateTime, Integer, Float, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    # Enqueueing twice with the same key returns the existing job
+    idempotency_key = Column(String, unique=True)
+    status = Column(String, default='queued',
+                    server_default='queued',
+                    nullable=False)
+    attempts = Column(Integer, default=0, server_default='0', nullable=False)
+    max_attempts = Column(Integer, default=3, server_default='3', nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String)
+    lease_expires_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    progress = Column(Float, default=0.0, server_default='0', nullable=False)
+    message = Column(String)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Claim query: oldest runnable job, and expired leases
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+        Index('ix_jobs_status_lease_expires_at', 'status', 'lease_expires_at'),
+    )
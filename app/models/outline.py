@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, JSON, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class BookOutline(Base):
+    __tablename__ = "book_outlines"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    questionnaire_id = Column(UUID(as_uuid=True), ForeignKey('questionnaire_responses.id'))
+    chapters = Column(JSON, nullable=False)
+    status = Column(String, default='draft',
+                    server_default='draft',
+                    nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
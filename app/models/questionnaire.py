@@ -1,22 +1,40 @@
-from sqlalchemy import Column, String, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import JSONDocument
 from app.models.template import Template
 
 class QuestionnaireResponse(Base):
     __tablename__ = "questionnaire_responses"
+    __table_args__ = (
+        # Dashboard listings: by template and status, newest first or in
+        # keyset order
+        Index(
+            "ix_questionnaire_responses_template_status_created",
+            "template_id", "status", "created_at"
+        ),
+        Index("ix_questionnaire_responses_status_created", "status", "created_at"),
+        # Answer filters: jsonb_path_ops serves @> containment and @? path
+        # queries with a smaller index than the default operator class
+        Index(
+            "ix_questionnaire_responses_responses_gin",
+            "responses",
+            postgresql_using="gin",
+            postgresql_ops={"responses": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     template_id = Column(UUID(as_uuid=True), ForeignKey('templates.id'), nullable=False)
-    responses = Column(JSON, nullable=False)
+    responses = Column(JSONDocument, nullable=False)
     status = Column(String, default='submitted', 
                     server_default='submitted', 
                     nullable=False)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationship to Template
-    template = relationship("Template", back_populates="questionnaire_responses")
+    # Relationship to Template; see Template.questionnaire_responses
+    template = relationship("Template", back_populates="questionnaire_responses", lazy="raise_on_sql")
@@ -1,17 +1,32 @@
-from sqlalchemy import Column, String, JSON, Boolean, DateTime, Integer
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import JSONDocument
 
 class Template(Base):
     __tablename__ = "templates"
+    __table_args__ = (
+        # Keyset pagination walks templates in (created_at, id) order
+        Index("ix_templates_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(String)
-    sections = Column(JSON, nullable=False)
+    sections = Column(JSONDocument, nullable=False)
     version = Column(Integer, default=1)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship to QuestionnaireResponse. Never loaded implicitly: an
+    # async session can't lazy-load, so reads that need it ask for it with
+    # the options in app.db.loading
+    questionnaire_responses = relationship(
+        "QuestionnaireResponse",
+        back_populates="template",
+        lazy="raise_on_sql"
+    )
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from typing import Dict, List, Literal, Optional
+from uuid import UUID
+from datetime import datetime
+
+class ChapterFile(BaseModel):
+    index: int
+    title: str
+    path: str  # Relative to AUDIO_OUTPUT_DIR
+    duration_seconds: float
+    chunk_count: int
+    # Of the chapter text and render settings; None on files rendered
+    # before fingerprints, which are never reused
+    fingerprint: Optional[str] = None
+
+class ChunkCacheReport(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0  # Audio bytes served from cache instead of the provider
+
+    @computed_field
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class AudiobookRenderResult(BaseModel):
+    chapter_files: List[ChapterFile]
+    total_duration: int  # Whole seconds, as stored on audiobooks.total_duration
+    cache: ChunkCacheReport = Field(default_factory=ChunkCacheReport)
+    # Chapter index -> path of the earlier file it reuses instead of rendering
+    reused: Dict[int, str] = Field(default_factory=dict)
+
+class AudiobookCreate(BaseModel):
+    outline_id: UUID
+
+class AudiobookResponse(BaseModel):
+    id: UUID
+    outline_id: UUID
+    chapter_files: List[ChapterFile]
+    total_duration: Optional[int] = None
+    status: Literal['generating', 'completed', 'failed']
+    created_at: datetime
+    updated_at: datetime
+    # Chunk cache usage of the render that produced this response; None
+    # when the audiobook is read back rather than rendered
+    cache: Optional[ChunkCacheReport] = None
+
+    model_config = ConfigDict(from_attributes=True)
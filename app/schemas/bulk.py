@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, Generic, List, TypeVar
+
+T = TypeVar("T")
+
+# Rows per multi-row INSERT ... RETURNING statement
+BULK_INSERT_BATCH_SIZE = 1000
+
+# Upper bound on items accepted by a single bulk request
+MAX_BULK_ITEMS = 10000
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+class BulkCreateResult(BaseModel, Generic[T]):
+    created: List[T]
+    errors: List[BulkItemError] = []
+
+def validate_bulk_items(schema, payloads: List[Any]):
+    """
+    Validate each payload against schema independently.
+
+    Returns (valid, errors) where valid is a list of (index, model) pairs, so
+    one bad item never rejects the rest of the batch.
+    """
+    valid = []
+    errors: List[BulkItemError] = []
+    for index, payload in enumerate(payloads):
+        if isinstance(payload, schema):
+            valid.append((index, payload))
+            continue
+        try:
+            valid.append((index, schema.model_validate(payload)))
+        except ValidationError as e:
+            errors.append(BulkItemError(
+                index=index,
+                errors=e.errors(include_url=False, include_context=False, include_input=False)
+            ))
+    return valid, errors
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Literal, Optional
+from uuid import UUID
+from datetime import datetime
+
+JobStatus = Literal['queued', 'running', 'succeeded', 'failed']
+
+TERMINAL_JOB_STATUSES = frozenset({'succeeded', 'failed'})
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    progress: float
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class JobEvent(BaseModel):
+    """Progress update pushed to subscribers; small enough for NOTIFY"""
+    job_id: UUID
+    status: JobStatus
+    progress: float
+    message: Optional[str] = None
@@ -0,0 +1,43 @@
+import hashlib
+import json
+from pydantic import BaseModel, ConfigDict, computed_field
+from app.schemas.bulk import BulkItemError
+from typing import List, Literal, Optional
+from uuid import UUID
+from datetime import datetime
+
+def chapter_fingerprint(title: str, content: str) -> str:
+    """Digest of the text a chapter is narrated from"""
+    text = json.dumps([title, content], ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+class ChapterSchema(BaseModel):
+    title: str
+    content: str
+
+    # Stored with the chapter in book_outlines.chapters, so an edit shows up
+    # as a changed fingerprint; always derived, never taken from input
+    @computed_field
+    @property
+    def fingerprint(self) -> str:
+        return chapter_fingerprint(self.title, self.content)
+
+class BookOutlineCreate(BaseModel):
+    questionnaire_id: Optional[UUID] = None
+    chapters: List[ChapterSchema]
+    status: Literal['draft', 'approved', 'generating_audio'] = 'draft'
+
+class BookOutlineResponse(BookOutlineCreate):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class OutlineGenerationRequest(BaseModel):
+    questionnaire_ids: List[UUID]
+
+class OutlineGenerationResult(BaseModel):
+    created: List[BookOutlineResponse]
+    skipped: List[UUID]  # Responses that already had an outline
+    errors: List[BulkItemError]
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Dict, Optional
+import math
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 from datetime import datetime
+from app.schemas.template import TemplateSummary
 
 class QuestionnaireResponseCreate(BaseModel):
     template_id: UUID
@@ -14,3 +16,58 @@ class QuestionnaireResponseResponse(QuestionnaireResponseCreate):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class QuestionnaireResponseWithTemplate(QuestionnaireResponseResponse):
+    template: TemplateSummary
+
+AnswerOperator = Literal['eq', 'ne', 'gt', 'ge', 'lt', 'le', 'exists']
+
+class AnswerFilter(BaseModel):
+    """Comparison of one answer with a scalar value, e.g. q3 >= 4"""
+    key: str = Field(min_length=1)
+    op: AnswerOperator = 'eq'
+    value: Optional[Any] = None
+
+    @field_validator('value')
+    @classmethod
+    def _scalar(cls, value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            raise ValueError("must be a scalar; use 'answers' to match lists and objects")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError("must be a finite number")
+        return value
+
+    @model_validator(mode='after')
+    def _value_required(self) -> 'AnswerFilter':
+        if self.op != 'exists' and self.value is None:
+            raise ValueError(f"operator '{self.op}' needs a value")
+        return self
+
+class ResponseQuery(BaseModel):
+    """
+    Filters over questionnaire responses. answers matches responses whose
+    answers contain the given ones (JSON containment: lists match if they
+    include every listed item); filters compare single answers.
+    """
+    template_id: Optional[UUID] = None
+    status: Optional[List[str]] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    answers: Dict[str, Any] = {}
+    filters: List[AnswerFilter] = []
+
+class QuestionnaireResponsePage(BaseModel):
+    items: List[QuestionnaireResponseResponse]
+    next_cursor: Optional[str] = None
+
+class QuestionnaireResponseWithTemplatePage(BaseModel):
+    items: List[QuestionnaireResponseWithTemplate]
+    next_cursor: Optional[str] = None
+
+class ResponseCountGroup(BaseModel):
+    value: Any
+    count: int
+
+class ResponseCounts(BaseModel):
+    total: int
+    groups: List[ResponseCountGroup] = []
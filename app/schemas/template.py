@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -20,3 +20,15 @@ class TemplateResponse(TemplateCreate):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class TemplateSummary(BaseModel):
+    """The template fields shown next to each of its responses"""
+    id: UUID
+    title: str
+    version: Optional[int] = 1
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TemplatePage(BaseModel):
+    items: List[TemplateResponse]
+    next_cursor: Optional[str] = None
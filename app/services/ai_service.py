@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import json
+import random
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+from loguru import logger
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import get_settings
+from app.core.instrumentation import timed_validation
+from app.core.errors import DetailedHTTPException
+from app.db.loading import RESPONSES_WITH_TEMPLATES
+from app.models.outline import BookOutline
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.template import Template
+from app.schemas.bulk import BulkItemError
+from app.schemas.outline import BookOutlineResponse, ChapterSchema, OutlineGenerationResult
+from app.services.llm_providers import LLMProvider, LLMProviderError, create_llm_provider
+from app.utils.ai_prompts import build_outline_messages, parse_outline
+from app.utils.cache import LRUCache
+from app.utils.rate_limit import TokenRateLimiter
+
+# Responses in these states still need an outline; 'processing' covers a
+# run that died midway and is being retried
+PENDING_RESPONSE_STATUSES = ('submitted', 'processing')
+
+
+class OutlineGenerator:
+    """
+    Turns outline prompts into chapters through an LLMProvider.
+
+    Calls run concurrently under a TokenRateLimiter (in-flight, requests and
+    tokens per minute). Identical prompts are memoized: finished results
+    come from an LRU cache, and a prompt already in flight is awaited
+    rather than sent twice: the completion runs in a task owned by the
+    generator, so a cancelled caller doesn't cancel it for the others; it is
+    only cancelled once every caller waiting on it has gone. Transient
+    failures and unparseable replies are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        limiter: TokenRateLimiter,
+        model: str = "gpt-4o-mini",
+        max_tokens: int = 2000,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0,
+        cache: Optional[LRUCache] = None
+    ):
+        self.provider = provider
+        self.limiter = limiter
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.cache = cache if cache is not None else LRUCache(max_size=1024)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.tokens_used = 0
+
+    def _key(self, messages: List[Dict[str, str]]) -> str:
+        payload = json.dumps([self.model, self.max_tokens, messages], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def generate(self, messages: List[Dict[str, str]]) -> List[ChapterSchema]:
+        key = self._key(messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._complete_and_cache(key, messages))
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            # Once done, the task has already been forgotten
+            if self._in_flight.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    # Nobody is left to use the result
+                    self._forget(key, task)
+                    task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            del self._waiters[key]
+
+    async def _complete_and_cache(self, key: str, messages: List[Dict[str, str]]) -> List[ChapterSchema]:
+        chapters = await self._complete(messages)
+        self.cache.set(key, chapters)
+        return chapters
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> List[ChapterSchema]:
+        # ~4 characters per token is close enough to reserve a budget;
+        # the reservation is settled with the real usage afterwards
+        estimate = sum(len(m["content"]) for m in messages) // 4 + self.max_tokens
+        attempt = 0
+        while True:
+            try:
+                async with self.limiter.reserve(estimate) as reservation:
+                    self.calls += 1
+                    completion = await self.provider.complete(messages, self.model, self.max_tokens)
+                    reservation.settle(completion.total_tokens)
+                self.tokens_used += completion.total_tokens
+                return parse_outline(completion.text)
+            except (LLMProviderError, ValueError) as e:
+                if getattr(e, "retryable", True) is False or attempt >= self.max_retries:
+                    raise
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                logger.warning(
+                    "Outline completion failed, retrying",
+                    attempt=attempt,
+                    delay=delay,
+                    error=str(e)
+                )
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'tokens_used': self.tokens_used,
+            'cache': self.cache.stats(),
+            **self.limiter.stats()
+        }
+
+
+_outline_generator: Optional[OutlineGenerator] = None
+
+
+def get_outline_generator() -> OutlineGenerator:
+    """
+    Process-wide generator, so the rate limits, the HTTP connection pool
+    and the prompt cache are shared by every request and job
+    """
+    global _outline_generator
+    if _outline_generator is None:
+        settings = get_settings()
+        _outline_generator = OutlineGenerator(
+            provider=create_llm_provider(
+                settings.LLM_PROVIDER,
+                api_key=settings.OPENAI_API_KEY.get_secret_value(),
+                max_connections=settings.LLM_MAX_CONNECTIONS
+            ),
+            limiter=TokenRateLimiter(
+                tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+                requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+                max_in_flight=settings.LLM_MAX_IN_FLIGHT
+            ),
+            model=settings.LLM_MODEL,
+            max_tokens=settings.LLM_MAX_TOKENS,
+            max_retries=settings.LLM_MAX_RETRIES,
+            cache=LRUCache(
+                max_size=settings.OUTLINE_CACHE_MAX_SIZE,
+                ttl_seconds=settings.OUTLINE_CACHE_TTL_SECONDS
+            )
+        )
+    return _outline_generator
+
+
+class OutlineService:
+    def __init__(self, session: AsyncSession, generator: Optional[OutlineGenerator] = None):
+        self.session = session
+        self._generator = generator
+
+    @property
+    def generator(self) -> OutlineGenerator:
+        if self._generator is None:
+            self._generator = get_outline_generator()
+        return self._generator
+
+    async def generate_outlines(
+        self,
+        response_ids: List[UUID],
+        write_batch_size: int = 50,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> OutlineGenerationResult:
+        """
+        Create a draft outline for each questionnaire response.
+
+        Responses are loaded with one query and their templates with one more
+        (each template once, however many responses share it), and all
+        prompts are generated concurrently (bounded by the generator's
+        limiter). Finished outlines are written in batches of
+        write_batch_size as they complete, so early results are committed
+        while later ones are still generating. Responses that already have
+        an outline are skipped, which makes a retried run safe; missing
+        responses and failed generations are reported by index.
+        """
+        index_of = {response_id: i for i, response_id in enumerate(response_ids)}
+        result = await self.session.execute(
+            select(QuestionnaireResponse)
+            .options(RESPONSES_WITH_TEMPLATES)
+            .where(QuestionnaireResponse.id.in_(index_of))
+        )
+        rows = [(response, response.template) for response in result.scalars()]
+        found = {response.id for response, _ in rows}
+        errors = [
+            BulkItemError(index=index_of[response_id], errors=[{
+                'type': 'not_found',
+                'loc': ['questionnaire_id'],
+                'msg': f"Questionnaire response {response_id} not found"
+            }])
+            for response_id in response_ids if response_id not in found
+        ]
+        pending = [(r, t) for r, t in rows if r.status in PENDING_RESPONSE_STATUSES]
+        skipped = [r.id for r, _ in rows if r.status not in PENDING_RESPONSE_STATUSES]
+
+        if pending:
+            await self._set_status([r.id for r, _ in pending], 'processing')
+            await self.session.commit()
+
+        async def generate(response: QuestionnaireResponse, template: Template):
+            messages = build_outline_messages(template.title, template.sections, response.responses)
+            try:
+                return response, await self.generator.generate(messages), None
+            except Exception as e:
+                return response, None, e
+
+        created: List[BookOutlineResponse] = []
+        batch: List[tuple] = []
+        done = 0
+        try:
+            for next_done in asyncio.as_completed([generate(r, t) for r, t in pending]):
+                response, chapters, error = await next_done
+                done += 1
+                if error is not None:
+                    logger.error(
+                        f"Outline generation failed for response {response.id}",
+                        error=str(error)
+                    )
+                    errors.append(BulkItemError(index=index_of[response.id], errors=[{
+                        'type': 'generation_failed',
+                        'loc': ['questionnaire_id'],
+                        'msg': str(error)
+                    }]))
+                    # Released for a later run; committed with the next batch
+                    await self._set_status([response.id], 'submitted')
+                else:
+                    batch.append((response.id, chapters))
+                if len(batch) >= write_batch_size or done == len(pending):
+                    created.extend(await self._write_outlines(batch))
+                    batch = []
+                    await self.session.commit()
+                if on_progress is not None:
+                    on_progress(done, len(pending))
+        except Exception as e:
+            logger.exception("Outline generation run failed")
+            await self.session.rollback()
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to generate outlines",
+                internal_error=e,
+                context={'response_count': len(response_ids)}
+            )
+
+        errors.sort(key=lambda e: e.index)
+        logger.info(
+            "Outline generation run finished",
+            created=len(created),
+            skipped=len(skipped),
+            failed=len(errors),
+            **{k: v for k, v in self.generator.stats().items() if k != 'cache'}
+        )
+        return OutlineGenerationResult(created=created, skipped=skipped, errors=errors)
+
+    async def _write_outlines(self, batch: List[tuple]) -> List[BookOutlineResponse]:
+        if not batch:
+            return []
+        result = await self.session.execute(
+            insert(BookOutline).returning(BookOutline, sort_by_parameter_order=True),
+            [
+                {
+                    'questionnaire_id': response_id,
+                    'chapters': [c.model_dump() for c in chapters],
+                    'status': 'draft'
+                }
+                for response_id, chapters in batch
+            ]
+        )
+        with timed_validation():
+            outlines = [BookOutlineResponse.model_validate(o) for o in result.scalars()]
+        await self._set_status([response_id for response_id, _ in batch], 'completed')
+        return outlines
+
+    async def _set_status(self, response_ids: List[UUID], status: str) -> None:
+        await self.session.execute(
+            update(QuestionnaireResponse)
+            .where(QuestionnaireResponse.id.in_(response_ids))
+            .values(status=status)
+        )
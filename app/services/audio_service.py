@@ -0,0 +1,559 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.instrumentation import timed_validation
+from app.core.errors import DetailedHTTPException
+from app.models.audiobook import Audiobook
+from app.models.outline import BookOutline
+from app.schemas.audiobook import AudiobookRenderResult, AudiobookResponse, ChapterFile
+from app.schemas.audiobook import ChunkCacheReport
+from app.schemas.outline import chapter_fingerprint
+from app.services.encoding import (
+    ENCODED_SUFFIXES,
+    EncodingExecutor,
+    assemble_chapter,
+    get_encoding_executor
+)
+from app.services.tts_cache import TTSChunkCache, tts_chunk_key
+from app.services.storage import StorageBackend, UploadItem, get_storage_backend
+from app.services.tts_providers import TTSProvider, TTSProviderError, create_tts_provider
+from app.utils.audio_processing import (
+    AUDIO_MEDIA_TYPES,
+    STREAMABLE_FORMATS,
+    split_text_into_chunks
+)
+from app.utils.loudness import LoudnessNormalizer
+
+
+class AudioGenerationPipeline:
+    """
+    Renders outline chapters to audio files.
+
+    Every chapter is split into sentence-aligned chunks and all chunks of a
+    book are synthesized concurrently, bounded by a per-book semaphore and a
+    process-wide semaphore shared by every book. A book therefore takes about
+    as long as its longest chapter rather than the sum of all chapters.
+    Failed chunks are retried with exponential backoff and jitter.
+
+    With a chunk cache, chunks whose text, voice, model and format were
+    synthesized before are read from disk instead, so regenerating a book
+    after an edit only re-synthesizes the paragraphs that changed.
+
+    Chunks are written to part files as they arrive and then streamed into
+    the chapter file block by block, so memory per book stays bounded by
+    the number of in-flight chunks however long the book is.
+
+    With a normalizer (WAV only), every chunk is brought to the same
+    loudness and stripped of leading and trailing silence while it is
+    streamed into the chapter file.
+
+    Assembling a chapter from its chunks is CPU-bound, so with an executor
+    it runs in a worker process; there, chapters can also be encoded from
+    wav to encode_format (mp3 or aac, with ffmpeg).
+
+    Given the chapter files of an earlier rendering, chapters whose text
+    and render settings are unchanged (same fingerprint) are hard-linked
+    from it instead of rendered, so re-rendering an edited outline costs
+    about as much as the edit.
+    """
+
+    def __init__(
+        self,
+        provider: TTSProvider,
+        output_dir: Path,
+        voice: str = "alloy",
+        model: str = "tts-1",
+        audio_format: str = "wav",
+        max_concurrency: int = 16,
+        max_concurrency_per_book: int = 8,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 10.0,
+        chunk_max_chars: int = 4000,
+        cache: Optional[TTSChunkCache] = None,
+        normalizer: Optional[LoudnessNormalizer] = None,
+        executor: Optional[EncodingExecutor] = None,
+        encode_format: Optional[str] = None,
+        encode_bitrate: str = "64k"
+    ):
+        if audio_format not in STREAMABLE_FORMATS:
+            raise ValueError(f"Unsupported audio format for assembly: {audio_format}")
+        if normalizer is not None and audio_format != "wav":
+            raise ValueError(f"Loudness normalization needs wav audio, not {audio_format}")
+        if encode_format is not None:
+            if encode_format not in ENCODED_SUFFIXES:
+                raise ValueError(f"Unsupported encoding format: {encode_format}")
+            if audio_format != "wav":
+                raise ValueError(f"Encoding to {encode_format} needs wav audio, not {audio_format}")
+            if shutil.which("ffmpeg") is None:
+                raise ValueError(f"Encoding to {encode_format} needs ffmpeg on the PATH")
+        self.provider = provider
+        self.output_dir = Path(output_dir)
+        self.voice = voice
+        self.model = model
+        self.audio_format = audio_format
+        self.max_concurrency_per_book = max_concurrency_per_book
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.chunk_max_chars = chunk_max_chars
+        self.cache = cache
+        self.normalizer = normalizer
+        self.executor = executor
+        self.encode_format = encode_format
+        self.encode_bitrate = encode_bitrate
+        # Suffix of chapter files: the encoded format's, or the TTS format's
+        self.file_format = ENCODED_SUFFIXES[encode_format] if encode_format else audio_format
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+
+    async def render_book(
+        self,
+        book_id: UUID,
+        chapters: List[Dict[str, Any]],
+        on_chapter_done: Optional[Callable[[int, int], None]] = None,
+        previous: Optional[List[ChapterFile]] = None
+    ) -> AudiobookRenderResult:
+        """
+        Render every chapter, reusing files from previous (an earlier
+        rendering of the outline) where the fingerprints match;
+        on_chapter_done(done, total) is called as chapters finish, for
+        progress reporting
+        """
+        book_limit = asyncio.Semaphore(self.max_concurrency_per_book)
+        report = ChunkCacheReport()
+        book_dir = self.output_dir / str(book_id)
+        book_dir.mkdir(parents=True, exist_ok=True)
+        # Matched by fingerprint, not index, so moved chapters are reused too
+        reusable = {c.fingerprint: c for c in previous or () if c.fingerprint}
+        reused: Dict[int, str] = {}
+
+        done = 0
+
+        async def render(index: int, chapter: Dict[str, Any]) -> ChapterFile:
+            nonlocal done
+            fingerprint = self.render_fingerprint(chapter)
+            chapter_file = None
+            earlier = reusable.get(fingerprint)
+            if earlier is not None:
+                chapter_file = await self._reuse_chapter(book_dir, index, chapter, earlier)
+                if chapter_file is not None:
+                    reused[index] = earlier.path
+            if chapter_file is None:
+                chapter_file = await self._render_chapter(
+                    book_dir, index, chapter, fingerprint, book_limit, report
+                )
+            done += 1
+            if on_chapter_done is not None:
+                on_chapter_done(done, len(chapters))
+            return chapter_file
+
+        chapter_files = await asyncio.gather(*(
+            render(index, chapter) for index, chapter in enumerate(chapters)
+        ))
+        total = sum(c.duration_seconds for c in chapter_files)
+        if self.cache is not None:
+            logger.info(
+                "TTS chunk cache usage",
+                book_id=str(book_id),
+                hits=report.hits,
+                misses=report.misses,
+                hit_ratio=report.hit_ratio,
+                bytes_saved=report.bytes_saved
+            )
+        return AudiobookRenderResult(
+            chapter_files=list(chapter_files),
+            total_duration=round(total),
+            cache=report,
+            reused=reused
+        )
+
+    def chapter_text(self, chapter: Dict[str, Any]) -> str:
+        return f"{chapter['title']}.\n\n{chapter['content']}"
+
+    def render_fingerprint(self, chapter: Dict[str, Any]) -> str:
+        """
+        Identifies a chapter's audio: its text plus everything else that
+        changes the rendered file. Recomputed from the text rather than
+        read from the outline, so a hand-edited row can't reuse stale audio.
+        """
+        parts = [
+            chapter_fingerprint(chapter['title'], chapter['content']),
+            self.provider.name,
+            self.voice,
+            self.model,
+            self.audio_format,
+            self.chunk_max_chars,
+        ]
+        if self.normalizer is not None:
+            # Only when set, so files rendered without it keep matching
+            parts.append(self.normalizer.settings_key())
+        if self.encode_format is not None:
+            parts.append(f"encode:{self.encode_format}:{self.encode_bitrate}")
+        key = json.dumps(parts)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    async def _reuse_chapter(
+        self,
+        book_dir: Path,
+        index: int,
+        chapter: Dict[str, Any],
+        earlier: ChapterFile
+    ) -> Optional[ChapterFile]:
+        source = self.output_dir / earlier.path
+        path = book_dir / f"chapter_{index:03d}.{self.file_format}"
+        try:
+            await asyncio.to_thread(_link_or_copy, source, path)
+        except FileNotFoundError:
+            logger.warning(f"Reusable chapter file {earlier.path} is gone, rendering it again")
+            return None
+        return earlier.model_copy(update={
+            'index': index,
+            'title': chapter['title'],
+            'path': str(path.relative_to(self.output_dir)),
+        })
+
+    async def _render_chapter(
+        self,
+        book_dir: Path,
+        index: int,
+        chapter: Dict[str, Any],
+        fingerprint: str,
+        book_limit: asyncio.Semaphore,
+        report: ChunkCacheReport
+    ) -> ChapterFile:
+        chunks = split_text_into_chunks(self.chapter_text(chapter), self.chunk_max_chars)
+        parts_dir = book_dir / f".chapter_{index:03d}.parts"
+        parts_dir.mkdir(exist_ok=True)
+        try:
+            parts = await asyncio.gather(*(
+                self._chunk_to_file(
+                    text,
+                    parts_dir / f"{n:05d}.{self.audio_format}",
+                    book_limit,
+                    report
+                )
+                for n, text in enumerate(chunks)
+            ))
+            path = book_dir / f"chapter_{index:03d}.{self.file_format}"
+            assemble = (
+                assemble_chapter, list(parts), path, self.audio_format,
+                self.normalizer, self.encode_format, self.encode_bitrate
+            )
+            if self.executor is not None:
+                duration = await self.executor.run(*assemble)
+            else:
+                duration = await asyncio.to_thread(*assemble)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, parts_dir, True)
+        return ChapterFile(
+            index=index,
+            title=chapter['title'],
+            path=str(path.relative_to(self.output_dir)),
+            duration_seconds=duration,
+            chunk_count=len(chunks),
+            fingerprint=fingerprint
+        )
+
+    async def _chunk_to_file(
+        self,
+        text: str,
+        dest: Path,
+        book_limit: asyncio.Semaphore,
+        report: ChunkCacheReport
+    ) -> Path:
+        key = None
+        if self.cache is not None:
+            key = tts_chunk_key(text, self.provider.name, self.voice, self.model, self.audio_format)
+            size = await asyncio.to_thread(self.cache.get, key, dest)
+            if size is not None:
+                report.hits += 1
+                report.bytes_saved += size
+                return dest
+            report.misses += 1
+        audio = await self._synthesize_chunk(text, book_limit)
+        await asyncio.to_thread(dest.write_bytes, audio)
+        if key is not None:
+            try:
+                await asyncio.to_thread(self.cache.put, key, dest)
+            except OSError:
+                # A full or read-only cache disk must not fail the book
+                logger.exception("Failed to store TTS chunk in cache")
+        return dest
+
+    async def _synthesize_chunk(self, text: str, book_limit: asyncio.Semaphore) -> bytes:
+        attempt = 0
+        while True:
+            try:
+                async with book_limit, self._global_limit:
+                    return await self.provider.synthesize(
+                        text, self.voice, self.model, self.audio_format
+                    )
+            except TTSProviderError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                logger.warning(
+                    "TTS chunk failed, retrying",
+                    attempt=attempt,
+                    delay=delay,
+                    error=str(e)
+                )
+                # Sleep outside the semaphores so waiting doesn't hold a slot
+                await asyncio.sleep(delay)
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    """Make dest the same file as source: a hard link, or a copy across devices"""
+    if dest.exists() and os.path.samefile(source, dest):
+        return
+    partial = dest.with_name(f".{dest.name}.link")
+    partial.unlink(missing_ok=True)
+    try:
+        os.link(source, partial)
+    except OSError:
+        # Different filesystem, or one without hard links
+        shutil.copyfile(source, partial)
+    os.replace(partial, dest)
+
+
+_audio_pipeline: Optional[AudioGenerationPipeline] = None
+
+
+def get_audio_pipeline() -> AudioGenerationPipeline:
+    """
+    Process-wide pipeline, so the global concurrency limit spans every book
+    """
+    global _audio_pipeline
+    if _audio_pipeline is None:
+        settings = get_settings()
+        cache = None
+        if settings.TTS_CACHE_ENABLED:
+            cache = TTSChunkCache(
+                Path(settings.TTS_CACHE_DIR),
+                max_bytes=settings.TTS_CACHE_MAX_BYTES
+            )
+        normalizer = None
+        if settings.AUDIO_NORMALIZE_ENABLED and settings.TTS_AUDIO_FORMAT == "wav":
+            normalizer = LoudnessNormalizer(
+                target_db=settings.AUDIO_TARGET_LOUDNESS_DB,
+                max_gain_db=settings.AUDIO_MAX_GAIN_DB,
+                silence_threshold_db=settings.AUDIO_SILENCE_THRESHOLD_DB,
+                keep_silence_seconds=settings.AUDIO_KEEP_SILENCE_SECONDS
+            )
+        _audio_pipeline = AudioGenerationPipeline(
+            provider=create_tts_provider(
+                settings.TTS_PROVIDER,
+                api_key=settings.OPENAI_API_KEY.get_secret_value()
+            ),
+            output_dir=Path(settings.AUDIO_OUTPUT_DIR),
+            voice=settings.TTS_VOICE,
+            model=settings.TTS_MODEL,
+            audio_format=settings.TTS_AUDIO_FORMAT,
+            max_concurrency=settings.TTS_MAX_CONCURRENCY,
+            max_concurrency_per_book=settings.TTS_MAX_CONCURRENCY_PER_BOOK,
+            max_retries=settings.TTS_MAX_RETRIES,
+            retry_base_delay=settings.TTS_RETRY_BASE_DELAY_SECONDS,
+            chunk_max_chars=settings.TTS_CHUNK_MAX_CHARS,
+            cache=cache,
+            normalizer=normalizer,
+            executor=get_encoding_executor(),
+            encode_format=settings.AUDIO_ENCODE_FORMAT,
+            encode_bitrate=settings.AUDIO_ENCODE_BITRATE
+        )
+    return _audio_pipeline
+
+
+class AudioService:
+    def __init__(
+        self,
+        session: AsyncSession,
+        pipeline: Optional[AudioGenerationPipeline] = None,
+        storage: Optional[StorageBackend] = None
+    ):
+        self.session = session
+        self._pipeline = pipeline
+        self._storage = storage
+
+    @property
+    def pipeline(self) -> AudioGenerationPipeline:
+        # Resolved on first render, so queueing work needs no TTS provider
+        if self._pipeline is None:
+            self._pipeline = get_audio_pipeline()
+        return self._pipeline
+
+    @property
+    def storage(self) -> StorageBackend:
+        if self._storage is None:
+            self._storage = get_storage_backend()
+        return self._storage
+
+    async def generate_audiobook(self, outline_id: UUID) -> AudiobookResponse:
+        """
+        Render an approved outline into an audiobooks row with one file per
+        chapter
+        """
+        audiobook = await self.start_audiobook(outline_id)
+        await self.session.commit()
+        return await self.render_audiobook(audiobook.id)
+
+    async def get_chapter_file(self, audiobook_id: UUID, index: int) -> Path:
+        """
+        Absolute path of a rendered chapter file; 404 if the audiobook or
+        chapter doesn't exist
+        """
+        settings = get_settings()
+        audiobook = await self.session.get(Audiobook, audiobook_id)
+        if audiobook is None:
+            raise DetailedHTTPException(
+                status_code=404,
+                detail=f"Audiobook {audiobook_id} not found"
+            )
+        chapter = next((c for c in audiobook.chapter_files if c['index'] == index), None)
+        if chapter is None:
+            raise DetailedHTTPException(
+                status_code=404,
+                detail=f"Chapter {index} of audiobook {audiobook_id} not found",
+                context={'status': audiobook.status}
+            )
+        output_dir = Path(settings.AUDIO_OUTPUT_DIR).resolve()
+        path = (output_dir / chapter['path']).resolve()
+        if output_dir not in path.parents:
+            raise DetailedHTTPException(
+                status_code=404,
+                detail=f"Chapter {index} of audiobook {audiobook_id} not found",
+                context={'path': chapter['path']}
+            )
+        return path
+
+    async def publish_chapters(self, result: AudiobookRenderResult) -> None:
+        """
+        Put chapter files in storage, keyed by their relative path. Reused
+        chapters are copied from their earlier object within storage rather
+        than uploaded again.
+        """
+        output_dir = self.pipeline.output_dir
+        uploads = [
+            UploadItem(
+                key=chapter.path,
+                path=output_dir / chapter.path,
+                content_type=AUDIO_MEDIA_TYPES.get(Path(chapter.path).suffix.lstrip('.'), 'application/octet-stream')
+            )
+            for chapter in result.chapter_files
+            if chapter.index not in result.reused
+        ]
+        copies = [
+            self.storage.copy(result.reused[chapter.index], chapter.path)
+            for chapter in result.chapter_files
+            if chapter.index in result.reused
+        ]
+        await asyncio.gather(self.storage.upload_many(uploads), *copies)
+
+    async def _previous_chapter_files(self, audiobook: Audiobook) -> List[ChapterFile]:
+        """Chapter files of the outline's latest completed audiobook, if any"""
+        result = await self.session.execute(
+            select(Audiobook.chapter_files)
+            .where(
+                Audiobook.outline_id == audiobook.outline_id,
+                Audiobook.status == 'completed',
+                Audiobook.id != audiobook.id
+            )
+            .order_by(Audiobook.created_at.desc())
+            .limit(1)
+        )
+        chapter_files = result.scalar_one_or_none() or []
+        return [ChapterFile.model_validate(c) for c in chapter_files]
+
+    async def start_audiobook(self, outline_id: UUID) -> Audiobook:
+        """
+        Add a generating audiobooks row for an approved outline and flush it;
+        the caller commits (e.g. together with the job that renders it)
+        """
+        outline = await self.session.get(BookOutline, outline_id)
+        if outline is None:
+            raise DetailedHTTPException(
+                status_code=404,
+                detail=f"Outline {outline_id} not found"
+            )
+        if outline.status != 'approved':
+            raise DetailedHTTPException(
+                status_code=409,
+                detail="Only approved outlines can be turned into audiobooks",
+                context={'status': outline.status}
+            )
+
+        audiobook = Audiobook(outline_id=outline.id, chapter_files=[], status='generating')
+        outline.status = 'generating_audio'
+        self.session.add(audiobook)
+        await self.session.flush()
+        return audiobook
+
+    async def render_audiobook(
+        self,
+        audiobook_id: UUID,
+        on_chapter_done: Optional[Callable[[int, int], None]] = None
+    ) -> AudiobookResponse:
+        """
+        Render the chapters of a started audiobook. Safe to call again after
+        a failure: chapter files are overwritten in place, and an audiobook
+        that already completed is returned as is.
+        """
+        audiobook = await self.session.get(Audiobook, audiobook_id)
+        if audiobook is None:
+            raise DetailedHTTPException(
+                status_code=404,
+                detail=f"Audiobook {audiobook_id} not found"
+            )
+        if audiobook.status == 'completed':
+            with timed_validation():
+                return AudiobookResponse.model_validate(audiobook)
+        outline = await self.session.get(BookOutline, audiobook.outline_id)
+        previous = await self._previous_chapter_files(audiobook)
+        audiobook.status = 'generating'
+        outline.status = 'generating_audio'
+        await self.session.commit()
+
+        try:
+            result = await self.pipeline.render_book(
+                audiobook.id, outline.chapters, on_chapter_done=on_chapter_done, previous=previous
+            )
+            await self.publish_chapters(result)
+        except Exception as e:
+            logger.exception(f"Audiobook generation failed for outline {outline.id}")
+            audiobook.status = 'failed'
+            outline.status = 'approved'
+            await self.session.commit()
+            raise DetailedHTTPException(
+                status_code=502,
+                detail="Failed to generate audiobook",
+                internal_error=e,
+                context={'outline_id': str(outline.id), 'audiobook_id': str(audiobook.id)}
+            )
+
+        audiobook.chapter_files = [c.model_dump() for c in result.chapter_files]
+        audiobook.total_duration = result.total_duration
+        audiobook.status = 'completed'
+        logger.info(
+            f"Audiobook {audiobook.id} rendered",
+            cache_hit_ratio=result.cache.hit_ratio,
+            cache_bytes_saved=result.cache.bytes_saved,
+            chapters_reused=len(result.reused)
+        )
+        outline.status = 'approved'
+        await self.session.commit()
+        await self.session.refresh(audiobook)
+        with timed_validation():
+            response = AudiobookResponse.model_validate(audiobook)
+        response.cache = result.cache
+        return response
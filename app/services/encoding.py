@@ -0,0 +1,189 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import get_settings
+from app.utils.audio_processing import concatenate_audio_files
+from app.utils.loudness import LoudnessNormalizer
+
+# Chapter file suffix for each encoded format
+ENCODED_SUFFIXES = {"mp3": "mp3", "aac": "m4a"}
+_FFMPEG_CODECS = {
+    "mp3": ["-c:a", "libmp3lame"],
+    "aac": ["-c:a", "aac", "-movflags", "+faststart"],
+}
+
+
+class EncodingError(Exception):
+    """
+    Raised when a chapter can't be assembled or encoded. retryable=True
+    marks failures of the pool itself (a worker process died), not of the
+    audio.
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def available_cores() -> int:
+    """CPUs this process may run on, which can be fewer than the machine has"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def encode_wav(source: Path, dest: Path, encode_format: str, bitrate: str = "64k") -> None:
+    """Encode a WAV file with ffmpeg, replacing dest atomically"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise EncodingError(f"ffmpeg is needed to encode {encode_format} audio")
+    # ffmpeg picks the container from the extension, so keep it last
+    partial = dest.with_name(f".{dest.stem}.part{dest.suffix}")
+    result = subprocess.run(
+        [
+            ffmpeg, "-nostdin", "-loglevel", "error", "-y",
+            "-i", str(source),
+            *_FFMPEG_CODECS[encode_format], "-b:a", bitrate,
+            str(partial)
+        ],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        partial.unlink(missing_ok=True)
+        raise EncodingError(f"ffmpeg failed: {result.stderr.decode(errors='replace')[-500:]}")
+    os.replace(partial, dest)
+
+
+def assemble_chapter(
+    parts: List[Path],
+    dest: Path,
+    audio_format: str,
+    normalizer: Optional[LoudnessNormalizer] = None,
+    encode_format: Optional[str] = None,
+    bitrate: str = "64k"
+) -> float:
+    """
+    Join a chapter's chunk files into dest, leveling them with normalizer
+    and encoding the result to encode_format when set. Returns the duration
+    in seconds, taken from the PCM before encoding.
+
+    Meant to run in an EncodingExecutor process: arguments and result are
+    paths, settings and a float, and the audio itself stays in files.
+    """
+    if encode_format is None:
+        return concatenate_audio_files(parts, dest, audio_format, normalizer)
+    pcm = dest.with_name(f".{dest.stem}.wav")
+    try:
+        duration = concatenate_audio_files(parts, pcm, audio_format, normalizer)
+        encode_wav(pcm, dest, encode_format, bitrate)
+    finally:
+        pcm.unlink(missing_ok=True)
+    return duration
+
+
+class EncodingExecutor:
+    """
+    Process pool for CPU-bound audio work (assembling, leveling, encoding,
+    measuring chapters), so it runs on every core instead of contending for
+    the GIL with the event loop and its default thread pool.
+
+    Worker processes are spawned on first use. Jobs should pass file paths
+    rather than audio: everything crossing the pool is pickled. stats()
+    reports how many jobs are waiting for a free worker.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or available_cores()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process with an event loop and logging
+                # threads can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in a worker process; fn must be importable by name"""
+        pool = self._executor()
+        with self._lock:
+            self._pending += 1
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            failed = False
+            return result
+        except BrokenProcessPool as e:
+            # A worker died (OOM kill, segfault); the pool can't be reused
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise EncodingError(f"Encoding worker process died: {e}", retryable=True) from e
+        finally:
+            with self._lock:
+                self._pending -= 1
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'pending': self._pending,
+                'running': min(self._pending, self.max_workers),
+                'queued': max(0, self._pending - self.max_workers),
+                'completed': self._completed,
+                'failed': self._failed,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, abandoning queued jobs"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_encoding_executor: Optional[EncodingExecutor] = None
+
+
+def default_encode_workers() -> int:
+    """
+    Pool size for AUDIO_ENCODE_WORKERS=0: the cores shared out between the
+    JOB_WORKER_PROCESSES on the machine, so they don't oversubscribe it
+    """
+    return max(1, available_cores() // max(1, get_settings().JOB_WORKER_PROCESSES))
+
+
+def get_encoding_executor() -> EncodingExecutor:
+    """Process-wide encoding pool, AUDIO_ENCODE_WORKERS processes or default_encode_workers()"""
+    global _encoding_executor
+    if _encoding_executor is None:
+        _encoding_executor = EncodingExecutor(get_settings().AUDIO_ENCODE_WORKERS or default_encode_workers())
+    return _encoding_executor
+
+
+async def shutdown_encoding_executor() -> None:
+    global _encoding_executor
+    if _encoding_executor is not None:
+        await asyncio.to_thread(_encoding_executor.shutdown)
+    _encoding_executor = None
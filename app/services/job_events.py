@@ -0,0 +1,142 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+from uuid import UUID
+from loguru import logger
+from app.schemas.job import JobEvent
+from app.core.config import get_settings
+
+# Postgres NOTIFY channel carrying JobEvent JSON between processes
+JOB_EVENTS_CHANNEL = "job_events"
+
+
+class JobEventBroker:
+    """
+    Fans job events out to in-process subscribers (SSE connections).
+
+    Workers run in other processes, so in production events arrive through
+    Postgres LISTEN on JOB_EVENTS_CHANNEL: the first subscription starts a
+    single listener connection for the whole process. If that connection
+    fails or drops it is reopened in the background with exponential
+    backoff; until then listening is False and subscribers should poll.
+    Without a listener DSN (tests, SQLite) events are published in-process
+    only.
+    """
+
+    def __init__(
+        self,
+        listen_dsn: Optional[str] = None,
+        queue_size: int = 100,
+        reconnect_base_delay: float = 1.0,
+        reconnect_max_delay: float = 30.0
+    ):
+        self.listen_dsn = listen_dsn
+        self.queue_size = queue_size
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self._subscribers: Dict[UUID, Set[asyncio.Queue]] = {}
+        self._listener = None
+        self._listener_lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def listening(self) -> bool:
+        """Whether events published by other processes reach subscribers"""
+        return self.listen_dsn is None or self._listener is not None
+
+    def publish(self, event: JobEvent) -> None:
+        for queue in self._subscribers.get(event.job_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow client only needs the latest state
+                queue.get_nowait()
+                queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: UUID) -> AsyncIterator[asyncio.Queue]:
+        await self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    async def _ensure_listener(self) -> None:
+        if self.listen_dsn is None or self._listener is not None or self._reconnect_task is not None:
+            return
+        async with self._listener_lock:
+            if self._listener is not None or self._reconnect_task is not None:
+                return
+            try:
+                await self._connect()
+            except Exception as e:
+                # Subscribers poll meanwhile; don't fail their streams
+                logger.warning("Job event listener failed to connect", error=str(e))
+                self._start_reconnect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+        connection = await asyncpg.connect(self.listen_dsn)
+        await connection.add_listener(JOB_EVENTS_CHANNEL, self._on_notify)
+        connection.add_termination_listener(self._on_terminate)
+        self._listener = connection
+
+    def _on_terminate(self, connection) -> None:
+        # Also called by close(), which forgets the connection first
+        if connection is self._listener:
+            self._listener = None
+            logger.warning("Job event listener connection lost")
+            self._start_reconnect()
+
+    def _start_reconnect(self) -> None:
+        if self._reconnect_task is None:
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_base_delay
+        try:
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                except Exception as e:
+                    delay = min(delay * 2, self.reconnect_max_delay)
+                    logger.warning(f"Job event listener reconnect failed; retrying in {delay}s", error=str(e))
+                    continue
+                logger.info("Job event listener reconnected")
+                return
+        finally:
+            self._reconnect_task = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            self.publish(JobEvent.model_validate_json(payload))
+        except Exception:
+            logger.exception("Malformed job event notification")
+
+    async def close(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            await listener.close()
+
+
+_job_event_broker: Optional[JobEventBroker] = None
+
+
+def get_job_event_broker() -> JobEventBroker:
+    global _job_event_broker
+    if _job_event_broker is None:
+        settings = get_settings()
+        dsn = str(settings.DATABASE_URL)
+        listen_dsn = dsn.replace("+asyncpg", "") if dsn.startswith("postgresql") else None
+        _job_event_broker = JobEventBroker(listen_dsn=listen_dsn)
+    return _job_event_broker
@@ -0,0 +1,60 @@
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.errors import DetailedHTTPException
+from app.core.config import get_settings
+from app.services.ai_service import OutlineGenerator, OutlineService
+from app.services.audio_service import AudioGenerationPipeline, AudioService
+from app.services.job_worker import JobContext, JobHandler, PermanentJobError
+from app.services.storage import StorageBackend
+
+
+def build_job_handlers(
+    session_factory: Callable[[], AsyncSession],
+    pipeline: Optional[AudioGenerationPipeline] = None,
+    generator: Optional[OutlineGenerator] = None,
+    storage: Optional[StorageBackend] = None
+) -> Dict[str, JobHandler]:
+    """Handlers for every job kind, each opening its own session per attempt"""
+
+    async def render_audiobook(context: JobContext) -> Dict[str, Any]:
+        audiobook_id = UUID(context.job.payload['audiobook_id'])
+        async with session_factory() as session:
+            service = AudioService(session, pipeline=pipeline, storage=storage)
+            try:
+                audiobook = await service.render_audiobook(
+                    audiobook_id,
+                    on_chapter_done=lambda done, total: context.report(
+                        done / total, f"Rendered chapter {done} of {total}"
+                    )
+                )
+            except DetailedHTTPException as e:
+                if e.status_code < 500:
+                    raise PermanentJobError(e.detail) from e
+                raise
+        return {
+            'audiobook_id': str(audiobook.id),
+            'total_duration': audiobook.total_duration,
+            'cache': audiobook.cache.model_dump() if audiobook.cache is not None else None
+        }
+
+    async def generate_outlines(context: JobContext) -> Dict[str, Any]:
+        response_ids = [UUID(i) for i in context.job.payload['questionnaire_ids']]
+        async with session_factory() as session:
+            result = await OutlineService(session, generator=generator).generate_outlines(
+                response_ids,
+                write_batch_size=get_settings().OUTLINE_WRITE_BATCH_SIZE,
+                on_progress=lambda done, total: context.report(
+                    done / total, f"Generated {done} of {total} outlines"
+                )
+            )
+        return {
+            'outline_ids': [str(o.id) for o in result.created],
+            'skipped': [str(i) for i in result.skipped],
+            'errors': [e.model_dump() for e in result.errors]
+        }
+
+    return {
+        'audiobook': render_audiobook,
+        'outlines': generate_outlines,
+    }
@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+from loguru import logger
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.models.job import Job
+from app.schemas.job import JobEvent
+from app.services.job_events import JOB_EVENTS_CHANNEL, JobEventBroker
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """
+    Durable job queue on the jobs table.
+
+    Workers claim the oldest runnable job with SELECT ... FOR UPDATE SKIP
+    LOCKED, so any number of worker processes can poll the same table
+    without blocking on or double-claiming each other's rows. A claim is a
+    lease: the worker must heartbeat before lease_expires_at, and a job
+    whose lease expired (crashed or stuck worker) is claimed again by
+    someone else. Every write after the claim is fenced on locked_by, so a
+    worker that lost its lease cannot overwrite the new owner's state.
+    Failed attempts are retried with exponential backoff until
+    max_attempts, which is why job handlers must be idempotent.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        broker: Optional[JobEventBroker] = None,
+        lease_seconds: float = 60.0,
+        retry_base_delay: float = 5.0,
+        retry_max_delay: float = 300.0
+    ):
+        self.session_factory = session_factory
+        self.broker = broker
+        self.lease = timedelta(seconds=lease_seconds)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+    async def enqueue(
+        self,
+        session: AsyncSession,
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 3
+    ) -> Job:
+        """
+        Add a job in the caller's session and commit. With an idempotency
+        key, a job already enqueued under that key is returned instead.
+        """
+        if idempotency_key is not None:
+            existing = await self.get_by_idempotency_key(session, idempotency_key)
+            if existing is not None:
+                return existing
+        job = Job(
+            kind=kind,
+            payload=payload,
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts,
+            run_after=_now()
+        )
+        session.add(job)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent enqueue under the same key
+            await session.rollback()
+            existing = await self.get_by_idempotency_key(session, idempotency_key)
+            if existing is None:
+                raise
+            return existing
+        return job
+
+    async def get_by_idempotency_key(self, session: AsyncSession, key: str) -> Optional[Job]:
+        result = await session.execute(select(Job).where(Job.idempotency_key == key))
+        return result.scalar_one_or_none()
+
+    async def get(self, job_id: UUID) -> Optional[Job]:
+        async with self.session_factory() as session:
+            return await session.get(Job, job_id)
+
+    async def claim(self, worker_id: str) -> Optional[Job]:
+        """Lease the next runnable job to worker_id, or return None"""
+        while True:
+            async with self.session_factory() as session:
+                now = _now()
+                result = await session.execute(
+                    select(Job)
+                    .where(or_(
+                        and_(Job.status == 'queued', Job.run_after <= now),
+                        and_(Job.status == 'running', Job.lease_expires_at < now)
+                    ))
+                    .order_by(Job.run_after)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                job = result.scalar_one_or_none()
+                if job is None:
+                    return None
+                if job.status == 'running' and job.attempts >= job.max_attempts:
+                    # The last attempt's worker died; don't start another
+                    logger.warning(f"Job {job.id} lease expired on its final attempt")
+                    job.status = 'failed'
+                    job.error = "Lease expired"
+                    job.locked_by = None
+                    await self._notify(session, job)
+                    await session.commit()
+                    self._publish(job)
+                    continue
+                if job.status == 'running':
+                    logger.warning(f"Reclaiming job {job.id} from {job.locked_by}: lease expired")
+                job.status = 'running'
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.heartbeat_at = now
+                job.lease_expires_at = now + self.lease
+                await self._notify(session, job)
+                await session.commit()
+                self._publish(job)
+                return job
+
+    async def heartbeat(
+        self,
+        job_id: UUID,
+        worker_id: str,
+        progress: Optional[float] = None,
+        message: Optional[str] = None
+    ) -> bool:
+        """
+        Extend the lease and record progress. Returns False if worker_id no
+        longer holds the job, in which case it must stop working on it.
+        """
+        now = _now()
+        values: Dict[str, Any] = {'heartbeat_at': now, 'lease_expires_at': now + self.lease}
+        if progress is not None:
+            values['progress'] = progress
+        if message is not None:
+            values['message'] = message
+        return await self._fenced_update(job_id, worker_id, values)
+
+    async def complete(self, job_id: UUID, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        return await self._fenced_update(job_id, worker_id, {
+            'status': 'succeeded',
+            'progress': 1.0,
+            'result': result,
+            'error': None,
+            'locked_by': None,
+            'lease_expires_at': None
+        })
+
+    async def fail(self, job_id: UUID, worker_id: str, error: str, retryable: bool = True) -> bool:
+        """Record a failed attempt; requeue with backoff if attempts remain"""
+        async with self.session_factory() as session:
+            job = await session.get(Job, job_id)
+            if job is None or job.locked_by != worker_id or job.status != 'running':
+                return False
+            values: Dict[str, Any] = {'error': error, 'locked_by': None, 'lease_expires_at': None}
+            if retryable and job.attempts < job.max_attempts:
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (job.attempts - 1))
+                values.update(status='queued', run_after=_now() + timedelta(seconds=delay))
+            else:
+                values['status'] = 'failed'
+        return await self._fenced_update(job_id, worker_id, values)
+
+    async def _fenced_update(self, job_id: UUID, worker_id: str, values: Dict[str, Any]) -> bool:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == 'running')
+                .values(updated_at=func.now(), **values)
+                .returning(Job)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                await session.rollback()
+                return False
+            await self._notify(session, job)
+            await session.commit()
+            self._publish(job)
+            return True
+
+    async def _notify(self, session: AsyncSession, job: Job) -> None:
+        # Delivered to LISTENers when the transaction commits
+        if session.bind.dialect.name == 'postgresql':
+            await session.execute(
+                select(func.pg_notify(JOB_EVENTS_CHANNEL, self._event(job).model_dump_json()))
+            )
+
+    def _publish(self, job: Job) -> None:
+        if self.broker is not None and self.broker.listen_dsn is None:
+            self.broker.publish(self._event(job))
+
+    @staticmethod
+    def _event(job: Job) -> JobEvent:
+        return JobEvent(job_id=job.id, status=job.status, progress=job.progress, message=job.message)
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        from app.db.session import get_session_factory
+        from app.services.job_events import get_job_event_broker
+        settings = get_settings()
+        _job_queue = JobQueue(
+            get_session_factory(),
+            broker=get_job_event_broker(),
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            retry_base_delay=settings.JOB_RETRY_BASE_DELAY_SECONDS
+        )
+    return _job_queue
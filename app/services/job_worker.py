@@ -0,0 +1,167 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+from app.models.job import Job
+from app.services.job_queue import JobQueue
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed"""
+
+
+class JobContext:
+    """Handed to job handlers to report progress"""
+
+    def __init__(self, job: Job):
+        self.job = job
+        self.progress = job.progress
+        self.message: Optional[str] = None
+        self._changed = asyncio.Event()
+
+    def report(self, progress: float, message: Optional[str] = None) -> None:
+        self.progress = max(0.0, min(1.0, progress))
+        self.message = message
+        self._changed.set()
+
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobWorker:
+    """
+    Claims jobs from a JobQueue and runs their handlers.
+
+    Up to concurrency jobs run at once. While a job runs, a heartbeat task
+    extends its lease every heartbeat_interval seconds and pushes progress
+    as soon as the handler reports it (at most every progress_interval
+    seconds). If a heartbeat finds the lease lost to another worker, the
+    handler is cancelled.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 10.0,
+        progress_interval: float = 0.5,
+        worker_id: Optional[str] = None
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.progress_interval = progress_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._slots = asyncio.Semaphore(concurrency)
+        self._stopping = asyncio.Event()
+        self._tasks: set = set()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Claim and run jobs until stop() is called, then drain"""
+        logger.info(f"Job worker {self.worker_id} started", concurrency=self.concurrency)
+        try:
+            while not self._stopping.is_set():
+                await self._slots.acquire()
+                job = None
+                try:
+                    job = await self.queue.claim(self.worker_id)
+                except Exception:
+                    logger.exception("Failed to claim a job")
+                if job is None:
+                    self._slots.release()
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                task = asyncio.create_task(self._run_job(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def run_once(self) -> bool:
+        """Claim and run a single job; returns False if none was runnable"""
+        await self._slots.acquire()
+        job = await self.queue.claim(self.worker_id)
+        if job is None:
+            self._slots.release()
+            return False
+        await self._run_job(job)
+        return True
+
+    async def _run_job(self, job: Job) -> None:
+        context = JobContext(job)
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                await self.queue.fail(job.id, self.worker_id, f"No handler for job kind {job.kind}", retryable=False)
+                return
+            work = asyncio.create_task(handler(context))
+            heartbeat = asyncio.create_task(self._heartbeat(job, context, work))
+            try:
+                result = await work
+            except asyncio.CancelledError:
+                if self._lost_lease(heartbeat):
+                    logger.warning(f"Job {job.id} abandoned: lease lost")
+                    return
+                raise
+            except PermanentJobError as e:
+                await self.queue.fail(job.id, self.worker_id, str(e), retryable=False)
+                return
+            except Exception as e:
+                logger.exception(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed")
+                await self.queue.fail(job.id, self.worker_id, f"{type(e).__name__}: {e}")
+                return
+            finally:
+                # Let an in-flight heartbeat finish rolling back before the
+                # final write, so the two never contend for the row
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            await self.queue.complete(job.id, self.worker_id, result)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _lost_lease(heartbeat: asyncio.Task) -> bool:
+        return (
+            heartbeat.done()
+            and not heartbeat.cancelled()
+            and heartbeat.exception() is None
+            and heartbeat.result() is False
+        )
+
+    async def _heartbeat(self, job: Job, context: JobContext, work: asyncio.Task) -> bool:
+        loop = asyncio.get_running_loop()
+        last_beat = loop.time()
+        while True:
+            timeout = max(0.0, self.heartbeat_interval - (loop.time() - last_beat))
+            try:
+                await asyncio.wait_for(context._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            context._changed.clear()
+            last_beat = loop.time()
+            try:
+                held = await self.queue.heartbeat(
+                    job.id, self.worker_id, context.progress, context.message
+                )
+            except Exception:
+                # Retried next interval; the lease only lapses if this persists
+                logger.exception(f"Heartbeat for job {job.id} failed")
+                continue
+            if not held:
+                work.cancel()
+                return False
+            await asyncio.sleep(self.progress_interval)
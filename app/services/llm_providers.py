@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional
+
+
+class LLMProviderError(Exception):
+    """
+    Raised by providers when a completion fails. retryable=False marks
+    errors that will not go away on retry (bad request, auth).
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMCompletion(NamedTuple):
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class LLMProvider(ABC):
+    """Chat completion backend used by outline generation"""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int
+    ) -> LLMCompletion:
+        """Return the assistant reply to messages"""
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Offline provider returning a deterministic outline for the prompt, with
+    optional latency to simulate a remote API. Counts calls so tests can
+    check batching and memoization.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_seconds: float = 0.0, chapters: int = 5):
+        self.latency_seconds = latency_seconds
+        self.chapters = chapters
+        self.calls = 0
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int
+    ) -> LLMCompletion:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        prompt = "\n".join(m["content"] for m in messages)
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        text = json.dumps({
+            "chapters": [
+                {
+                    "title": f"Chapter {i + 1}",
+                    "content": f"Outline {seed}, part {i + 1}."
+                }
+                for i in range(self.chapters)
+            ]
+        })
+        return LLMCompletion(text, len(prompt) // 4, len(text) // 4)
+
+
+class OpenAILLMProvider(LLMProvider):
+    """
+    Provider backed by OpenAI chat completions. All calls share one pooled
+    HTTP client, so connections are kept alive across outlines.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: str, max_connections: int = 32, timeout: float = 120.0):
+        import httpx
+        from openai import AsyncOpenAI
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=timeout
+        )
+        # max_retries=0: retries are handled by the generator's own backoff
+        self._client = AsyncOpenAI(api_key=api_key, http_client=self._http, max_retries=0)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int
+    ) -> LLMCompletion:
+        import openai
+        try:
+            response = await self._client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            raise LLMProviderError(str(e)) from e
+        except openai.APIError as e:
+            raise LLMProviderError(str(e), retryable=False) from e
+        usage = response.usage
+        return LLMCompletion(
+            response.choices[0].message.content or "",
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0
+        )
+
+    async def close(self) -> None:
+        await self._client.close()
+        await self._http.aclose()
+
+
+def create_llm_provider(
+    name: str,
+    api_key: Optional[str] = None,
+    max_connections: int = 32
+) -> LLMProvider:
+    if name == "fake":
+        return FakeLLMProvider()
+    if name == "openai":
+        if not api_key:
+            raise ValueError("OpenAI LLM provider requires an API key")
+        return OpenAILLMProvider(api_key=api_key, max_connections=max_connections)
+    raise ValueError(f"Unknown LLM provider: {name}")
@@ -0,0 +1,259 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, tuple_
+from sqlalchemy.future import select
+from pydantic import ValidationError
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.template import Template
+from app.db.loading import RESPONSE_WITH_TEMPLATE, RESPONSES_WITH_TEMPLATES
+from app.schemas.questionnaire import (
+    QuestionnaireResponseCreate,
+    QuestionnaireResponsePage,
+    QuestionnaireResponseResponse,
+    QuestionnaireResponseWithTemplate,
+    QuestionnaireResponseWithTemplatePage,
+    ResponseCountGroup,
+    ResponseCounts,
+    ResponseQuery
+)
+from app.schemas.bulk import (
+    BULK_INSERT_BATCH_SIZE,
+    BulkCreateResult,
+    BulkItemError,
+    validate_bulk_items
+)
+from app.services.response_query import count_statement, group_by_column, response_filter_clauses
+from app.services.response_validator import ResponseValidators, get_response_validators
+from app.core.instrumentation import timed_validation
+from app.core.errors import DetailedHTTPException
+from app.utils.pagination import encode_cursor, decode_cursor
+from loguru import logger
+from typing import Any, List, Optional, Union
+from uuid import UUID
+
+class QuestionnaireService:
+    def __init__(self, session: AsyncSession, validators: Optional[ResponseValidators] = None):
+        self.session = session
+        self.validators = validators if validators is not None else get_response_validators()
+
+    async def bulk_create_responses(
+        self,
+        payloads: List[Any],
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+        atomic: bool = False
+    ) -> BulkCreateResult[QuestionnaireResponseResponse]:
+        """
+        Validate and insert many questionnaire responses in a single
+        transaction.
+
+        Referenced templates are loaded with one query for the whole batch,
+        and each item's answers are validated against its template's
+        compiled response model. Items with invalid payloads, unknown
+        templates or invalid answers are reported by index. With
+        atomic=True nothing is inserted if any item fails.
+        """
+        with timed_validation():
+            valid, errors = validate_bulk_items(QuestionnaireResponseCreate, payloads)
+
+        template_ids = {item.template_id for _, item in valid}
+        templates = {}
+        if template_ids:
+            try:
+                result = await self.session.execute(
+                    select(Template.id, Template.version, Template.sections)
+                    .where(Template.id.in_(template_ids))
+                )
+                templates = {row.id: row for row in result}
+            except Exception as e:
+                logger.exception("Template lookup for bulk questionnaire responses failed")
+                await self.session.rollback()
+                raise DetailedHTTPException(
+                    status_code=500,
+                    detail="Failed to create questionnaire responses",
+                    internal_error=e,
+                    context={'item_count': len(valid)}
+                )
+
+        rows = []
+        for index, item in valid:
+            template = templates.get(item.template_id)
+            if template is None:
+                errors.append(BulkItemError(
+                    index=index,
+                    errors=[{
+                        'type': 'not_found',
+                        'loc': ['template_id'],
+                        'msg': f"Template {item.template_id} not found"
+                    }]
+                ))
+                continue
+            try:
+                with timed_validation():
+                    item.responses = self.validators.validate(
+                        template.id, template.version, template.sections, item.responses
+                    )
+            except ValidationError as e:
+                errors.append(BulkItemError(
+                    index=index,
+                    errors=[
+                        {**error, 'loc': ('responses', *error['loc'])}
+                        for error in e.errors(include_url=False, include_context=False, include_input=False)
+                    ]
+                ))
+                continue
+            rows.append(item.model_dump())
+        errors.sort(key=lambda e: e.index)
+
+        if not rows or (atomic and errors):
+            return BulkCreateResult[QuestionnaireResponseResponse](created=[], errors=errors)
+
+        created: List[QuestionnaireResponseResponse] = []
+        try:
+            for start in range(0, len(rows), batch_size):
+                result = await self.session.execute(
+                    insert(QuestionnaireResponse).returning(
+                        QuestionnaireResponse, sort_by_parameter_order=True
+                    ),
+                    rows[start:start + batch_size]
+                )
+                with timed_validation():
+                    created.extend(
+                        QuestionnaireResponseResponse.model_validate(r) for r in result.scalars()
+                    )
+            await self.session.commit()
+        except Exception as e:
+            logger.exception("Bulk questionnaire response creation failed")
+            await self.session.rollback()
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to create questionnaire responses",
+                internal_error=e,
+                context={'item_count': len(rows)}
+            )
+        return BulkCreateResult[QuestionnaireResponseResponse](created=created, errors=errors)
+
+    def _filter_clauses(self, query: ResponseQuery):
+        return response_filter_clauses(query, self.session.get_bind().dialect.name)
+
+    async def search_responses(
+        self,
+        query: ResponseQuery,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        include_template: bool = False
+    ) -> Union[QuestionnaireResponsePage, QuestionnaireResponseWithTemplatePage]:
+        """
+        Responses matching query, keyset-paginated in (created_at, id) order.
+
+        All filtering, answer filters included, runs in the database. With
+        include_template each item carries its template's summary; the
+        templates are loaded with one more query, however long the page.
+        """
+        statement = (
+            select(QuestionnaireResponse)
+            .where(*self._filter_clauses(query))
+            .order_by(QuestionnaireResponse.created_at, QuestionnaireResponse.id)
+        )
+        if include_template:
+            statement = statement.options(RESPONSES_WITH_TEMPLATES)
+        if cursor:
+            try:
+                created_at, response_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise DetailedHTTPException(
+                    status_code=400,
+                    detail="Invalid pagination cursor",
+                    internal_error=e,
+                    context={'cursor': cursor}
+                )
+            statement = statement.where(
+                tuple_(QuestionnaireResponse.created_at, QuestionnaireResponse.id)
+                > tuple_(created_at, response_id)
+            )
+
+        try:
+            # Fetch one extra row to find out whether another page exists
+            result = await self.session.execute(statement.limit(limit + 1))
+            responses = result.scalars().all()
+        except Exception as e:
+            logger.exception("Failed to search questionnaire responses")
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to search questionnaire responses",
+                internal_error=e
+            )
+
+        item_schema, page_schema = (
+            (QuestionnaireResponseWithTemplate, QuestionnaireResponseWithTemplatePage)
+            if include_template
+            else (QuestionnaireResponseResponse, QuestionnaireResponsePage)
+        )
+        with timed_validation():
+            items = [item_schema.model_validate(r) for r in responses[:limit]]
+        next_cursor = None
+        if len(responses) > limit:
+            last = responses[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return page_schema(items=items, next_cursor=next_cursor)
+
+    async def get_response(
+        self,
+        response_id: UUID,
+        include_template: bool = False
+    ) -> Optional[Union[QuestionnaireResponseResponse, QuestionnaireResponseWithTemplate]]:
+        """A single response, with its template joined in when include_template is set"""
+        statement = select(QuestionnaireResponse).where(QuestionnaireResponse.id == response_id)
+        if include_template:
+            statement = statement.options(RESPONSE_WITH_TEMPLATE)
+        try:
+            result = await self.session.execute(statement)
+            response = result.scalar_one_or_none()
+        except Exception as e:
+            logger.exception(f"Failed to retrieve questionnaire response {response_id}")
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to retrieve questionnaire response",
+                internal_error=e
+            )
+        if response is None:
+            return None
+        schema = QuestionnaireResponseWithTemplate if include_template else QuestionnaireResponseResponse
+        with timed_validation():
+            return schema.model_validate(response)
+
+    async def count_responses(
+        self,
+        query: ResponseQuery,
+        group_by: Optional[str] = None
+    ) -> ResponseCounts:
+        """
+        Count responses matching query with one aggregate query, optionally
+        grouped by "status", "template_id" or an answer ("answers.<key>")
+        """
+        group_column = None
+        if group_by is not None:
+            try:
+                group_column = group_by_column(group_by)
+            except ValueError as e:
+                raise DetailedHTTPException(
+                    status_code=400,
+                    detail=str(e),
+                    internal_error=e,
+                    context={'group_by': group_by}
+                )
+
+        try:
+            result = await self.session.execute(
+                count_statement(self._filter_clauses(query), group_column)
+            )
+            if group_column is None:
+                return ResponseCounts(total=result.scalar_one())
+            groups = [ResponseCountGroup(value=row.value, count=row.count) for row in result]
+        except Exception as e:
+            logger.exception("Failed to count questionnaire responses")
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to count questionnaire responses",
+                internal_error=e,
+                context={'group_by': group_by}
+            )
+        return ResponseCounts(total=sum(g.count for g in groups), groups=groups)
@@ -0,0 +1,128 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import cast, exists, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
+from sqlalchemy.sql.elements import ColumnElement
+from app.models.questionnaire import QuestionnaireResponse
+from app.schemas.questionnaire import AnswerFilter, ResponseQuery
+
+_JSONPATH_OPERATORS = {'eq': '==', 'ne': '!=', 'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<='}
+_SQL_OPERATORS = {'eq': '=', 'ne': '!=', 'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<='}
+
+
+def answer_jsonpath(answer_filter: AnswerFilter) -> str:
+    """
+    The filter as a Postgres jsonpath, e.g. $."q3" ? (@ >= 4).
+
+    Key and value are written as JSON literals, which jsonpath accepts
+    verbatim, so user input can't change the expression. In lax mode a list
+    answer matches when any of its items does.
+    """
+    path = f"$.{json.dumps(answer_filter.key)}"
+    if answer_filter.op == 'exists':
+        return path
+    operator = _JSONPATH_OPERATORS[answer_filter.op]
+    return f"{path} ? (@ {operator} {json.dumps(answer_filter.value)})"
+
+
+def _typed(element: ColumnElement, value: Any) -> ColumnElement:
+    # Compare an extracted answer as the value's own type
+    if isinstance(value, bool):
+        return element.as_boolean()
+    if isinstance(value, int):
+        return element.as_integer()
+    if isinstance(value, float):
+        return element.as_float()
+    return element.as_string()
+
+
+def _generic_contains(path: Tuple[str, ...], value: Any) -> List[ColumnElement]:
+    """
+    Containment without JSONB operators, for SQLite and other dialects:
+    objects recurse per key, lists need each item among the answer's items
+    """
+    responses = QuestionnaireResponse.responses
+    if isinstance(value, dict):
+        return [
+            clause
+            for key, item in value.items()
+            for clause in _generic_contains(path + (key,), item)
+        ]
+    if isinstance(value, list):
+        json_path = "$" + "".join(f".{json.dumps(key)}" for key in path)
+        clauses = []
+        for item in value:
+            items = func.json_each(responses, json_path).table_valued("value").alias()
+            clauses.append(exists(select(1).select_from(items).where(items.c.value == item)))
+        return clauses
+    element = responses[path if len(path) > 1 else path[0]]
+    if value is None:
+        return [element.as_string().is_(None)]
+    return [_typed(element, value) == value]
+
+
+def response_filter_clauses(query: ResponseQuery, dialect_name: str) -> List[ColumnElement]:
+    """
+    WHERE clauses for a ResponseQuery.
+
+    On Postgres answer filters become JSONB @> containment and @? jsonpath
+    tests, both served by the jsonb_path_ops GIN index on responses; column
+    filters use the (template_id, status, created_at) B-tree. Other
+    dialects get equivalent clauses built from JSON path extraction.
+    """
+    clauses: List[ColumnElement] = []
+    if query.template_id is not None:
+        clauses.append(QuestionnaireResponse.template_id == query.template_id)
+    if query.status:
+        clauses.append(QuestionnaireResponse.status.in_(query.status))
+    if query.created_after is not None:
+        clauses.append(QuestionnaireResponse.created_at >= query.created_after)
+    if query.created_before is not None:
+        clauses.append(QuestionnaireResponse.created_at < query.created_before)
+
+    if dialect_name == "postgresql":
+        responses = type_coerce(QuestionnaireResponse.responses, JSONB)
+        if query.answers:
+            clauses.append(responses.contains(query.answers))
+        for answer_filter in query.filters:
+            clauses.append(responses.op('@?')(cast(answer_jsonpath(answer_filter), JSONPATH)))
+        return clauses
+
+    if query.answers:
+        clauses.extend(_generic_contains((), query.answers))
+    for answer_filter in query.filters:
+        element = QuestionnaireResponse.responses[answer_filter.key]
+        if answer_filter.op == 'exists':
+            clauses.append(element.as_string().is_not(None))
+        else:
+            operator = _SQL_OPERATORS[answer_filter.op]
+            clauses.append(_typed(element, answer_filter.value).op(operator)(answer_filter.value))
+    return clauses
+
+
+def group_by_column(group_by: str) -> ColumnElement:
+    """
+    Column to count by: "status", "template_id" or "answers.<key>".
+
+    Raises ValueError for anything else.
+    """
+    if group_by == "status":
+        return QuestionnaireResponse.status
+    if group_by == "template_id":
+        return QuestionnaireResponse.template_id
+    prefix, _, key = group_by.partition(".")
+    if prefix == "answers" and key:
+        return QuestionnaireResponse.responses[key].as_string()
+    raise ValueError(f"Cannot group responses by {group_by!r}")
+
+
+def count_statement(clauses: Sequence[ColumnElement], group_by: Optional[ColumnElement] = None):
+    if group_by is None:
+        return select(func.count()).select_from(QuestionnaireResponse).where(*clauses)
+    count = func.count().label("count")
+    return (
+        select(group_by.label("value"), count)
+        .where(*clauses)
+        .group_by(group_by)
+        .order_by(count.desc())
+    )
@@ -0,0 +1,125 @@
+from datetime import date
+from typing import Annotated, Any, Dict, Hashable, List, Literal, Optional, Tuple, Type
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from app.core.config import get_settings
+from app.utils.cache import LRUCache
+
+_TEXT_TYPES = {"text", "textarea", "long_text", "short_text", "string", "email"}
+_SINGLE_CHOICE_TYPES = {"choice", "select", "radio", "single_choice", "dropdown"}
+_MULTI_CHOICE_TYPES = {"multiple_choice", "multi_select", "checkbox", "checkboxes"}
+
+
+def question_key(question: Dict[str, Any], position: int) -> str:
+    """
+    Key of a question's answer in QuestionnaireResponse.responses: its "id"
+    if the template gives one, else q1, q2, ... numbered across sections
+    """
+    return str(question.get("id") or f"q{position}")
+
+
+def _options(question: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(
+        option.get("value", option.get("label")) if isinstance(option, dict) else option
+        for option in question.get("options") or ()
+    )
+
+
+def _answer_type(question: Dict[str, Any]) -> Any:
+    kind = str(question.get("type", "text")).lower()
+    if kind in _TEXT_TYPES:
+        return Annotated[str, Field(min_length=question.get("min_length"), max_length=question.get("max_length"))]
+    if kind in ("number", "float", "decimal"):
+        return Annotated[float, Field(ge=question.get("min"), le=question.get("max"))]
+    if kind == "integer":
+        return Annotated[int, Field(ge=question.get("min"), le=question.get("max"))]
+    if kind in ("scale", "rating"):
+        return Annotated[int, Field(ge=question.get("min", 1), le=question.get("max", 5))]
+    if kind in ("boolean", "yes_no"):
+        return bool
+    if kind == "date":
+        return date
+    options = _options(question)
+    if kind in _SINGLE_CHOICE_TYPES and options:
+        return Literal[options]
+    if kind in _MULTI_CHOICE_TYPES and options:
+        min_items = 1 if question.get("required", True) else 0
+        return Annotated[List[Literal[options]], Field(min_length=min_items)]
+    # Unknown question types accept any JSON value
+    return Any
+
+
+def compile_response_model(sections: List[Dict[str, Any]], name: str = "Responses") -> Type[BaseModel]:
+    """
+    Build a pydantic model for the answers to a template's questions.
+
+    Each question becomes one field, aliased to its question_key, typed by
+    its "type" (with options, min/max and length limits) and required
+    unless "required" is false. Unknown answer keys are rejected. The
+    model validates a whole submission in a single pydantic-core pass,
+    with errors located by answer key.
+    """
+    fields: Dict[str, Any] = {}
+    position = 0
+    for section in sections:
+        for question in section.get("questions") or ():
+            position += 1
+            key = question_key(question, position)
+            answer = _answer_type(question)
+            # Field names are positional so any answer key works as an alias
+            if question.get("required", True):
+                fields[f"f{position}"] = (answer, Field(alias=key))
+            else:
+                fields[f"f{position}"] = (Optional[answer], Field(None, alias=key))
+    return create_model(name, __config__=ConfigDict(extra="forbid"), **fields)
+
+
+class ResponseValidators:
+    """
+    Compiled response models, cached by (template_id, version).
+
+    A template's questions only change together with its version, so a
+    cached model never needs invalidating; old versions age out of the LRU.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._models: LRUCache[Type[BaseModel]] = LRUCache(max_size=max_size)
+
+    def model_for(self, template_id: UUID, version: Optional[int], sections: List[Dict[str, Any]]) -> Type[BaseModel]:
+        key: Hashable = (template_id, version)
+        model = self._models.get(key)
+        if model is None:
+            model = compile_response_model(sections, name=f"Responses_{template_id.hex}_v{version}")
+            self._models.set(key, model)
+        return model
+
+    def validate(
+        self,
+        template_id: UUID,
+        version: Optional[int],
+        sections: List[Dict[str, Any]],
+        responses: Any
+    ) -> Dict[str, Any]:
+        """
+        Validate answers and return them normalized (e.g. "3" -> 3 for a
+        rating); raises pydantic.ValidationError with per-answer errors
+        """
+        model = self.model_for(template_id, version, sections)
+        return model.model_validate(responses).model_dump(mode="json", by_alias=True, exclude_unset=True)
+
+    def clear(self) -> None:
+        self._models.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._models.stats()
+
+
+_response_validators: Optional[ResponseValidators] = None
+
+
+def get_response_validators() -> ResponseValidators:
+    global _response_validators
+    if _response_validators is None:
+        settings = get_settings()
+        _response_validators = ResponseValidators(max_size=settings.TEMPLATE_CACHE_MAX_SIZE)
+    return _response_validators
@@ -0,0 +1,326 @@
+import asyncio
+import base64
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+from urllib.parse import quote
+from loguru import logger
+from app.core.config import get_settings
+
+# Supabase's resumable upload endpoint only accepts 6 MiB chunks
+SUPABASE_UPLOAD_CHUNK_BYTES = 6 * 1024 * 1024
+
+
+class StorageError(Exception):
+    """
+    Raised by backends when an object operation fails. retryable=False
+    marks errors that will not go away on retry (auth, missing bucket).
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class UploadItem(NamedTuple):
+    key: str  # Object key, '/'-separated and relative to the bucket or root
+    path: Path
+    content_type: str = "application/octet-stream"
+
+
+class StorageBackend(ABC):
+    """Object storage for rendered audio"""
+
+    name: str = "base"
+
+    def __init__(self, upload_concurrency: int = 4):
+        self.upload_concurrency = upload_concurrency
+
+    @abstractmethod
+    async def upload(self, item: UploadItem) -> None:
+        """Store the file at item.path under item.key, replacing any object there"""
+
+    @abstractmethod
+    async def download(self, key: str, destination: Path) -> None:
+        """Write the object to destination; StorageError(retryable=False) if missing"""
+
+    @abstractmethod
+    async def copy(self, source_key: str, key: str) -> None:
+        """Copy an object within storage, replacing any object at key"""
+
+    @abstractmethod
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Remove objects; keys that don't exist are ignored"""
+
+    async def upload_many(self, items: Iterable[UploadItem]) -> None:
+        """Upload files concurrently, at most upload_concurrency at a time"""
+        limit = asyncio.Semaphore(self.upload_concurrency)
+
+        async def upload(item: UploadItem) -> None:
+            async with limit:
+                await self.upload(item)
+
+        await asyncio.gather(*(upload(item) for item in items))
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores objects as files under a root directory, for tests and
+    deployments without Supabase. Writes go through a temporary file and a
+    rename, so readers never see a partial object. Uploading a file that
+    already is the object (root == AUDIO_OUTPUT_DIR) is a no-op.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Path, upload_concurrency: int = 4):
+        super().__init__(upload_concurrency)
+        self.root = Path(root)
+
+    def path_for(self, key: str) -> Path:
+        root = self.root.resolve()
+        path = (root / key).resolve()
+        if root not in path.parents:
+            raise StorageError(f"Invalid object key: {key!r}", retryable=False)
+        return path
+
+    async def upload(self, item: UploadItem) -> None:
+        target = self.path_for(item.key)
+        if target == Path(item.path).resolve():
+            return
+        await asyncio.to_thread(self._copy, Path(item.path), target)
+
+    async def download(self, key: str, destination: Path) -> None:
+        source = self.path_for(key)
+        try:
+            await asyncio.to_thread(self._copy, source, Path(destination))
+        except FileNotFoundError as e:
+            raise StorageError(f"Object {key} not found", retryable=False) from e
+
+    async def copy(self, source_key: str, key: str) -> None:
+        source, target = self.path_for(source_key), self.path_for(key)
+        if target.exists() and os.path.samefile(source, target):
+            return
+        try:
+            await asyncio.to_thread(self._copy, source, target)
+        except FileNotFoundError as e:
+            raise StorageError(f"Object {source_key} not found", retryable=False) from e
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.path_for(key).unlink(missing_ok=True)
+
+    @staticmethod
+    def _copy(source: Path, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.{os.getpid()}.part")
+        try:
+            shutil.copyfile(source, partial)
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """
+    Supabase Storage over one pooled, keep-alive HTTP client shared by every
+    request and job in the process.
+
+    Files up to multipart_threshold go up in a single request; larger ones
+    through the resumable (TUS) endpoint in 6 MiB parts, so a dropped
+    connection only costs one part and memory stays bounded.
+    """
+
+    name = "supabase"
+
+    def __init__(
+        self,
+        url: str,
+        service_key: str,
+        bucket: str,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        upload_concurrency: int = 4,
+        multipart_threshold: int = SUPABASE_UPLOAD_CHUNK_BYTES,
+        chunk_size: int = SUPABASE_UPLOAD_CHUNK_BYTES,
+        transport=None
+    ):
+        import httpx
+        super().__init__(upload_concurrency)
+        self.bucket = bucket
+        self.multipart_threshold = multipart_threshold
+        self.chunk_size = chunk_size
+        self._http = httpx.AsyncClient(
+            base_url=f"{url.rstrip('/')}/storage/v1",
+            headers={"Authorization": f"Bearer {service_key}", "apikey": service_key},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=timeout,
+            transport=transport
+        )
+
+    def _object_path(self, key: str) -> str:
+        return f"{quote(self.bucket)}/{quote(key.lstrip('/'))}"
+
+    async def _request(self, method: str, url: str, expected=(200,), **kwargs):
+        import httpx
+        try:
+            response = await self._http.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            raise StorageError(f"{method} {url}: {e!r}") from e
+        if response.status_code not in expected:
+            raise StorageError(
+                f"{method} {url}: HTTP {response.status_code} {response.text[:200]}",
+                retryable=response.status_code == 429 or response.status_code >= 500
+            )
+        return response
+
+    async def upload(self, item: UploadItem) -> None:
+        size = Path(item.path).stat().st_size
+        if size <= self.multipart_threshold:
+            body = await asyncio.to_thread(Path(item.path).read_bytes)
+            await self._request(
+                "POST",
+                f"/object/{self._object_path(item.key)}",
+                content=body,
+                headers={"Content-Type": item.content_type, "x-upsert": "true"}
+            )
+            return
+        await self._upload_resumable(item, size)
+
+    async def _upload_resumable(self, item: UploadItem, size: int) -> None:
+        metadata = ",".join(
+            f"{name} {base64.b64encode(value.encode()).decode()}"
+            for name, value in (
+                ("bucketName", self.bucket),
+                ("objectName", item.key.lstrip("/")),
+                ("contentType", item.content_type),
+            )
+        )
+        created = await self._request(
+            "POST",
+            "/upload/resumable",
+            expected=(201,),
+            headers={
+                "Tus-Resumable": "1.0.0",
+                "Upload-Length": str(size),
+                "Upload-Metadata": metadata,
+                "x-upsert": "true",
+            }
+        )
+        location = created.headers["location"]
+        offset = 0
+        with open(item.path, "rb") as file:
+            while offset < size:
+                chunk = await asyncio.to_thread(file.read, self.chunk_size)
+                response = await self._request(
+                    "PATCH",
+                    location,
+                    expected=(204,),
+                    content=chunk,
+                    headers={
+                        "Tus-Resumable": "1.0.0",
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream",
+                    }
+                )
+                offset = int(response.headers.get("upload-offset", offset + len(chunk)))
+        logger.debug(f"Uploaded {item.key} in parts", size=size)
+
+    async def download(self, key: str, destination: Path) -> None:
+        import httpx
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(f".{destination.name}.part")
+        url = f"/object/authenticated/{self._object_path(key)}"
+        try:
+            async with self._http.stream("GET", url) as response:
+                if response.status_code == 404 or response.status_code == 400:
+                    raise StorageError(f"Object {key} not found", retryable=False)
+                if response.status_code != 200:
+                    raise StorageError(
+                        f"GET {url}: HTTP {response.status_code}",
+                        retryable=response.status_code == 429 or response.status_code >= 500
+                    )
+                with open(partial, "wb") as file:
+                    async for chunk in response.aiter_bytes():
+                        await asyncio.to_thread(file.write, chunk)
+            os.replace(partial, destination)
+        except httpx.TransportError as e:
+            raise StorageError(f"GET {url}: {e!r}") from e
+        finally:
+            partial.unlink(missing_ok=True)
+
+    async def copy(self, source_key: str, key: str) -> None:
+        await self._request(
+            "POST",
+            "/object/copy",
+            json={
+                "bucketId": self.bucket,
+                "sourceKey": source_key.lstrip("/"),
+                "destinationKey": key.lstrip("/"),
+            },
+            headers={"x-upsert": "true"}
+        )
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        prefixes = [key.lstrip("/") for key in keys]
+        if prefixes:
+            await self._request("DELETE", f"/object/{quote(self.bucket)}", json={"prefixes": prefixes})
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+
+def create_storage_backend(name: str) -> StorageBackend:
+    settings = get_settings()
+    if name == "local":
+        return LocalStorageBackend(
+            Path(settings.STORAGE_LOCAL_DIR or settings.AUDIO_OUTPUT_DIR),
+            upload_concurrency=settings.STORAGE_UPLOAD_CONCURRENCY
+        )
+    if name == "supabase":
+        return SupabaseStorageBackend(
+            str(settings.SUPABASE_URL),
+            settings.SUPABASE_SERVICE_ROLE_KEY.get_secret_value(),
+            settings.STORAGE_BUCKET,
+            max_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.STORAGE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.STORAGE_KEEPALIVE_EXPIRY_SECONDS,
+            timeout=settings.STORAGE_TIMEOUT_SECONDS,
+            upload_concurrency=settings.STORAGE_UPLOAD_CONCURRENCY,
+            multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD_BYTES
+        )
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+_storage_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Process-wide storage backend, so every request and job shares one
+    connection pool. The API creates it in its lifespan; workers on first use.
+    """
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = create_storage_backend(get_settings().STORAGE_BACKEND)
+    return _storage_backend
+
+
+async def close_storage_backend() -> None:
+    """Close the shared backend's connections; the next call creates a new one"""
+    global _storage_backend
+    if _storage_backend is not None:
+        await _storage_backend.close()
+    _storage_backend = None
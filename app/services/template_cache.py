@@ -0,0 +1,80 @@
+import threading
+from typing import Any, Dict, Optional
+from uuid import UUID
+from app.core.config import get_settings
+from app.schemas.template import TemplateResponse
+from app.utils.cache import LRUCache
+
+
+class TemplateCache:
+    """
+    Cache of validated TemplateResponse objects, one entry per template id
+    tagged with the version it was built from.
+
+    A put() carrying an older version than the cached one is ignored, and a
+    put() is dropped if the template was invalidated after the caller took
+    its generation token, so a reader racing with an update can't reinsert
+    the old row. Entries expire after ttl_seconds, which bounds staleness for
+    updates made by other processes.
+
+    Cached objects are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 300.0):
+        self._cache: LRUCache = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._generations: Dict[UUID, int] = {}
+        self.invalidations = 0
+
+    def get(self, template_id: UUID) -> Optional[TemplateResponse]:
+        entry = self._cache.get(template_id)
+        return entry[1] if entry is not None else None
+
+    def generation(self, template_id: UUID) -> int:
+        """
+        Token to take before reading a template from the database and pass
+        back to put()
+        """
+        with self._lock:
+            return self._generations.get(template_id, 0)
+
+    def put(self, template: TemplateResponse, generation: Optional[int] = None) -> None:
+        version = template.version or 0
+        with self._lock:
+            if generation is not None and self._generations.get(template.id, 0) != generation:
+                return
+            current = self._cache.pop(template.id)
+            if current is not None and current[0] > version:
+                version, template = current
+            self._cache.set(template.id, (version, template))
+
+    def invalidate(self, template_id: UUID) -> None:
+        with self._lock:
+            self._generations[template_id] = self._generations.get(template_id, 0) + 1
+            if self._cache.pop(template_id) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._generations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), 'invalidations': self.invalidations}
+
+
+_template_cache: Optional[TemplateCache] = None
+
+
+def get_template_cache() -> TemplateCache:
+    """
+    Process-wide template cache, built on first use from settings
+    """
+    global _template_cache
+    if _template_cache is None:
+        settings = get_settings()
+        _template_cache = TemplateCache(
+            max_size=settings.TEMPLATE_CACHE_MAX_SIZE,
+            ttl_seconds=settings.TEMPLATE_CACHE_TTL_SECONDS
+        )
+    return _template_cache
@@ -1,22 +1,58 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, insert, tuple_
 from sqlalchemy.future import select
+from sqlalchemy.orm import Session, object_session
 from app.models.template import Template
-from app.schemas.template import TemplateCreate, TemplateResponse
-from app.api.errors import DetailedHTTPException
+from app.schemas.template import TemplateCreate, TemplateResponse, TemplatePage
+from app.schemas.bulk import BULK_INSERT_BATCH_SIZE, BulkCreateResult, validate_bulk_items
+from app.core.instrumentation import timed_validation
+from app.core.errors import DetailedHTTPException
+from app.db.session import primary_session
+from app.services.template_cache import TemplateCache, get_template_cache
+from app.utils.pagination import encode_cursor, decode_cursor
 from loguru import logger
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional
+from uuid import UUID
+
+_PENDING_INVALIDATIONS = "template_cache_invalidations"
+
+@event.listens_for(Template, "after_update")
+@event.listens_for(Template, "after_delete")
+def _invalidate_cached_template(mapper, connection, target):
+    # Evict at flush time, and remember the id so it is evicted again once
+    # the transaction commits: a concurrent reader may still re-cache the
+    # old, committed row in between.
+    get_template_cache().invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_templates(session):
+    cache = get_template_cache()
+    for template_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        cache.invalidate(template_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_invalidations(session, previous_transaction):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
 
 class TemplateService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: Optional[TemplateCache] = None):
         self.session = session
-        
+        self.cache = cache if cache is not None else get_template_cache()
+
     async def create_template(self, template: TemplateCreate) -> TemplateResponse:
         try:
             db_template = Template(**template.model_dump())
             self.session.add(db_template)
             await self.session.commit()
             await self.session.refresh(db_template)
-            return TemplateResponse.model_validate(db_template)
+            with timed_validation():
+                created = TemplateResponse.model_validate(db_template)
+            self.cache.put(created)
+            return created
         except Exception as e:
             logger.exception("Template creation failed")
             await self.session.rollback()
@@ -26,13 +62,65 @@ class TemplateService:
                 internal_error=e
             )
     
+    async def bulk_create_templates(
+        self,
+        payloads: List[Any],
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+        atomic: bool = False
+    ) -> BulkCreateResult[TemplateResponse]:
+        """
+        Validate and insert many templates in a single transaction.
+
+        Items that fail validation are reported by index in the result's
+        errors; the rest are inserted with one multi-row
+        INSERT ... RETURNING per batch. With atomic=True nothing is inserted
+        if any item is invalid.
+        """
+        with timed_validation():
+            valid, errors = validate_bulk_items(TemplateCreate, payloads)
+        if not valid or (atomic and errors):
+            return BulkCreateResult[TemplateResponse](created=[], errors=errors)
+
+        rows = [template.model_dump() for _, template in valid]
+        created: List[TemplateResponse] = []
+        try:
+            for start in range(0, len(rows), batch_size):
+                result = await self.session.execute(
+                    insert(Template).returning(Template, sort_by_parameter_order=True),
+                    rows[start:start + batch_size]
+                )
+                with timed_validation():
+                    created.extend(TemplateResponse.model_validate(t) for t in result.scalars())
+            await self.session.commit()
+        except Exception as e:
+            logger.exception("Bulk template creation failed")
+            await self.session.rollback()
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to create templates",
+                internal_error=e,
+                context={'item_count': len(rows)}
+            )
+        return BulkCreateResult[TemplateResponse](created=created, errors=errors)
+
     async def get_template_by_id(self, template_id: UUID) -> Optional[TemplateResponse]:
+        cached = self.cache.get(template_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation(template_id)
         try:
-            result = await self.session.execute(
+            # Misses are read from the primary: a lagging replica could
+            # cache the version an update has just invalidated
+            result = await primary_session(self.session).execute(
                 select(Template).where(Template.id == template_id)
             )
             template = result.scalar_one_or_none()
-            return TemplateResponse.model_validate(template) if template else None
+            if template is None:
+                return None
+            with timed_validation():
+                response = TemplateResponse.model_validate(template)
+            self.cache.put(response, generation)
+            return response
         except Exception as e:
             logger.exception(f"Failed to retrieve template {template_id}")
             raise DetailedHTTPException(
@@ -51,7 +139,46 @@ class TemplateService:
                 select(Template).offset(skip).limit(limit)
             )
             templates = result.scalars().all()
-            return [TemplateResponse.model_validate(t) for t in templates]
+            with timed_validation():
+                return [TemplateResponse.model_validate(t) for t in templates]
+        except Exception as e:
+            logger.exception("Failed to list templates")
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to retrieve templates",
+                internal_error=e
+            )
+
+    async def list_templates_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> TemplatePage:
+        """
+        Keyset-paginated listing ordered by (created_at, id).
+
+        Unlike OFFSET, each page is an index range scan starting right after
+        the cursor, so page N costs the same as page 1.
+        """
+        query = select(Template).order_by(Template.created_at, Template.id)
+        if cursor:
+            try:
+                created_at, template_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise DetailedHTTPException(
+                    status_code=400,
+                    detail="Invalid pagination cursor",
+                    internal_error=e,
+                    context={'cursor': cursor}
+                )
+            query = query.where(
+                tuple_(Template.created_at, Template.id) > tuple_(created_at, template_id)
+            )
+
+        try:
+            # Fetch one extra row to find out whether another page exists
+            result = await self.session.execute(query.limit(limit + 1))
+            templates = result.scalars().all()
         except Exception as e:
             logger.exception("Failed to list templates")
             raise DetailedHTTPException(
@@ -59,3 +186,46 @@ class TemplateService:
                 detail="Failed to retrieve templates",
                 internal_error=e
             )
+
+        with timed_validation():
+            items = [TemplateResponse.model_validate(t) for t in templates[:limit]]
+        next_cursor = None
+        if len(templates) > limit:
+            last = templates[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return TemplatePage(items=items, next_cursor=next_cursor)
+
+    async def stream_templates(
+        self,
+        chunk_size: int = 500
+    ) -> AsyncIterator[List[TemplateResponse]]:
+        """
+        Stream every template in (created_at, id) order, yielding validated
+        chunks of at most chunk_size items.
+
+        Rows are fetched through a server-side cursor, so memory stays bounded
+        by chunk_size regardless of table size. The cursor is closed as soon
+        as the consumer stops iterating, including on break or aclose().
+        """
+        query = (
+            select(Template)
+            .order_by(Template.created_at, Template.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = None
+        try:
+            result = await self.session.stream(query)
+            async for partition in result.scalars().partitions(chunk_size):
+                with timed_validation():
+                    batch = [TemplateResponse.model_validate(t) for t in partition]
+                yield batch
+        except Exception as e:
+            logger.exception("Failed to stream templates")
+            raise DetailedHTTPException(
+                status_code=500,
+                detail="Failed to stream templates",
+                internal_error=e
+            )
+        finally:
+            if result is not None:
+                await result.close()
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_tts_text(text: str) -> str:
+    """Canonical form of chunk text; whitespace-only edits don't change it"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def tts_chunk_key(text: str, provider: str, voice: str, model: str, audio_format: str) -> str:
+    """
+    Content address of a synthesized chunk. The provider is part of it:
+    two providers can share voice and model names but not their audio.
+    """
+    digest = hashlib.sha256()
+    for part in (normalize_tts_text(text), provider, voice, model, audio_format):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    # A hard link shares the blob without copying it and keeps the data
+    # alive for dest even if the cache evicts it; copy across filesystems
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class TTSChunkCache:
+    """
+    Content-addressed store of synthesized audio chunks on local disk.
+
+    Blobs live under root/<key[:2]>/<key>. The total size is capped at
+    max_bytes; the least recently used blobs are deleted first. Recency is
+    kept in memory and mirrored to file mtimes, so the LRU order survives a
+    restart. Blobs move in and out as files (hard-linked where possible), so
+    audio is never held in memory. Methods do blocking file I/O; call them
+    from a worker thread.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.root.glob("*/*"):
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str, dest: Path) -> Optional[int]:
+        """Place the blob for key at dest; return its size, or None on a miss"""
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            path = self._path(key)
+            try:
+                _link_or_copy(path, Path(dest))
+                os.utime(path)
+            except FileNotFoundError:
+                # Deleted behind our back; forget it
+                self.total_bytes -= self._index.pop(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._index[key]
+
+    def put(self, key: str, src: Path) -> None:
+        """Store the file at src under key"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        tmp.unlink(missing_ok=True)
+        _link_or_copy(Path(src), tmp)
+        size = tmp.stat().st_size
+        with self._lock:
+            os.replace(tmp, path)
+            os.utime(path)
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous
+            self._index[key] = size
+            self.total_bytes += size
+            self._evict(keep=key)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        # Caller must hold self._lock
+        while self.total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            if key == keep:
+                if len(self._index) == 1:
+                    break
+                self._index.move_to_end(key)
+                continue
+            self.total_bytes -= self._index.pop(key)
+            self._path(key).unlink(missing_ok=True)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._index),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
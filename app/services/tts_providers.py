@@ -0,0 +1,114 @@
+import asyncio
+import io
+import math
+import struct
+import wave
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class TTSProviderError(Exception):
+    """
+    Raised by providers when synthesis fails. retryable=False marks errors
+    that will not go away on retry (bad voice, text too long, auth).
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TTSProvider(ABC):
+    """Text-to-speech backend used by the audiobook pipeline"""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def synthesize(self, text: str, voice: str, model: str, audio_format: str) -> bytes:
+        """Return the encoded audio for text"""
+
+    async def close(self) -> None:
+        pass
+
+
+class StubTTSProvider(TTSProvider):
+    """
+    Offline provider producing a quiet tone whose length is proportional to
+    the text, as 16-bit mono WAV. Optional latency simulates a remote API.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        seconds_per_char: float = 0.02,
+        latency_seconds: float = 0.0
+    ):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.latency_seconds = latency_seconds
+
+    async def synthesize(self, text: str, voice: str, model: str, audio_format: str) -> bytes:
+        if audio_format != "wav":
+            raise TTSProviderError(
+                f"Stub provider only produces wav, not {audio_format}",
+                retryable=False
+            )
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        frames = max(1, int(len(text) * self.seconds_per_char * self.sample_rate))
+        return self._tone(frames)
+
+    def _tone(self, frames: int) -> bytes:
+        period = self.sample_rate / 220.0
+        samples = struct.pack(
+            f"<{frames}h",
+            *(int(1000 * math.sin(2 * math.pi * i / period)) for i in range(frames))
+        )
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(samples)
+        return buffer.getvalue()
+
+
+class OpenAITTSProvider(TTSProvider):
+    """Provider backed by the OpenAI speech endpoint"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, timeout: float = 60.0):
+        from openai import AsyncOpenAI
+        # max_retries=0: retries are handled by the pipeline's own backoff
+        self._client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+
+    async def synthesize(self, text: str, voice: str, model: str, audio_format: str) -> bytes:
+        import openai
+        try:
+            response = await self._client.audio.speech.create(
+                model=model,
+                voice=voice,
+                input=text,
+                response_format=audio_format
+            )
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            raise TTSProviderError(str(e)) from e
+        except openai.APIError as e:
+            raise TTSProviderError(str(e), retryable=False) from e
+        return response.content
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def create_tts_provider(name: str, api_key: Optional[str] = None) -> TTSProvider:
+    if name == "stub":
+        return StubTTSProvider()
+    if name == "openai":
+        if not api_key:
+            raise ValueError("OpenAI TTS provider requires an API key")
+        return OpenAITTSProvider(api_key=api_key)
+    raise ValueError(f"Unknown TTS provider: {name}")
@@ -0,0 +1,53 @@
+import json
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ValidationError
+from app.schemas.outline import ChapterSchema
+
+OUTLINE_SYSTEM_PROMPT = (
+    "You plan nonfiction audiobooks. From the author's questionnaire answers, "
+    "write a book outline as JSON: {\"chapters\": [{\"title\": str, \"content\": str}]}. "
+    "Each content is a paragraph describing what the chapter covers. "
+    "Reply with the JSON object only."
+)
+
+
+def build_outline_messages(
+    template_title: str,
+    sections: List[Dict[str, Any]],
+    responses: Dict[str, Any],
+    chapter_count: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """
+    Chat messages asking for an outline. The user message is canonical JSON
+    (sorted keys, no whitespace), so equal inputs give byte-identical
+    prompts and can be memoized.
+    """
+    request: Dict[str, Any] = {
+        "questionnaire": template_title,
+        "sections": sections,
+        "answers": responses,
+    }
+    if chapter_count is not None:
+        request["chapter_count"] = chapter_count
+    return [
+        {"role": "system", "content": OUTLINE_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        },
+    ]
+
+
+class _OutlineReply(BaseModel):
+    chapters: List[ChapterSchema]
+
+
+def parse_outline(text: str) -> List[ChapterSchema]:
+    """Chapters from a model reply; raises ValueError if it isn't an outline"""
+    try:
+        chapters = _OutlineReply.model_validate_json(text).chapters
+    except ValidationError as e:
+        raise ValueError(f"Model reply is not a valid outline: {e.error_count()} errors") from e
+    if not chapters:
+        raise ValueError("Model reply has no chapters")
+    return chapters
@@ -0,0 +1,271 @@
+import re
+import wave
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+from app.utils.loudness import LoudnessNormalizer
+
+# Split after sentence-ending punctuation (optionally followed by a closing
+# quote or bracket) when whitespace follows
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+
+def split_into_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def split_text_into_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most max_chars characters.
+
+    Paragraph breaks always start a new chunk, so editing one paragraph only
+    changes the chunks of that paragraph. A sentence longer than max_chars is
+    split on whitespace (or hard-split if it has none).
+    """
+    chunks: List[str] = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        current = ""
+        for sentence in split_into_sentences(paragraph):
+            for piece in _split_long(sentence, max_chars):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces: List[str] = []
+    current = ""
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+# Bytes copied per read while assembling; bounds memory per assembly job
+COPY_BLOCK_BYTES = 1024 * 1024
+
+
+def concatenate_wav_files(
+    parts: List[Path],
+    dest: Path,
+    normalizer: Optional[LoudnessNormalizer] = None
+) -> float:
+    """
+    Stream WAV files that share the same format into one WAV file at dest.
+
+    Sample data is copied in COPY_BLOCK_BYTES blocks, so memory use does not
+    depend on the length of the audio; with a normalizer each part is
+    leveled and trimmed on the way through, in blocks as well. Returns the
+    duration in seconds, read from the header of the written file.
+    """
+    if not parts:
+        raise ValueError("No audio chunks to concatenate")
+    params = None
+    with wave.open(str(dest), "wb") as out:
+        for part in parts:
+            with wave.open(str(part), "rb") as wav:
+                part_params = wav.getparams()
+                if params is None:
+                    params = part_params
+                    out.setnchannels(params.nchannels)
+                    out.setsampwidth(params.sampwidth)
+                    out.setframerate(params.framerate)
+                elif part_params[:3] != params[:3]:
+                    raise ValueError("Audio chunks have mismatched WAV formats")
+                if normalizer is not None:
+                    normalizer.process(part, out)
+                    continue
+                block_frames = max(1, COPY_BLOCK_BYTES // (params.nchannels * params.sampwidth))
+                # Streamed responses may carry a placeholder data size, so
+                # read until the data runs out rather than trusting nframes
+                while True:
+                    frames = wav.readframes(block_frames)
+                    if not frames:
+                        break
+                    out.writeframes(frames)
+    return wav_duration(dest)
+
+
+def wav_duration(path: Path) -> float:
+    with wave.open(str(path), "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+_MP3_BITRATES_KBPS = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    25: (11025, 12000, 8000),
+}
+
+
+class Mp3Frame(NamedTuple):
+    offset: int
+    length: int
+    samples: int
+    sample_rate: int
+
+    @property
+    def seconds(self) -> float:
+        return self.samples / self.sample_rate
+
+
+def _parse_mp3_header(header: bytes, offset: int) -> Optional[Mp3Frame]:
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = {0: 25, 2: 2, 3: 1}.get((header[1] >> 3) & 0x03)
+    layer = {1: 3, 2: 2, 3: 1}.get((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES_KBPS[(min(version, 2), layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    if layer == 1:
+        return Mp3Frame(offset, (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate)
+    samples = 576 if layer == 3 and version != 1 else 1152
+    return Mp3Frame(offset, samples // 8 * bitrate // sample_rate + padding, samples, sample_rate)
+
+
+def _id3v2_size(f: BinaryIO) -> int:
+    f.seek(0)
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def iter_mp3_frames(f: BinaryIO) -> Iterator[Mp3Frame]:
+    """
+    Yield the audio frames of an MP3 stream by walking frame headers.
+
+    Only the 4-byte header of each frame is read; nothing is decoded. ID3
+    tags are skipped, as is a leading Xing/Info frame, which carries encoder
+    metadata rather than audio.
+    """
+    f.seek(0, 2)
+    end = f.tell()
+    offset = _id3v2_size(f)
+    first = True
+    while offset + 4 <= end:
+        f.seek(offset)
+        header = f.read(4)
+        if header[:3] == b"TAG":
+            break
+        frame = _parse_mp3_header(header, offset)
+        if frame is None:
+            # Resynchronise on the next plausible frame header
+            offset += 1
+            continue
+        if first:
+            first = False
+            side_info = f.read(min(frame.length - 4, 64))
+            if b"Xing" in side_info or b"Info" in side_info:
+                offset += frame.length
+                continue
+        if offset + frame.length > end:
+            break
+        yield frame
+        offset += frame.length
+
+
+def mp3_duration(path: Path) -> float:
+    with open(path, "rb") as f:
+        return sum(frame.seconds for frame in iter_mp3_frames(f))
+
+
+def concatenate_mp3_files(parts: List[Path], dest: Path) -> float:
+    """
+    Join MP3 files at the container level by appending their audio frames.
+
+    Tags and Xing/Info frames of the parts are dropped; frames are copied
+    in COPY_BLOCK_BYTES blocks without decoding. Returns the duration in
+    seconds, summed from the frame headers.
+    """
+    if not parts:
+        raise ValueError("No audio chunks to concatenate")
+    duration = 0.0
+    with open(dest, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as f:
+                start = stop = None
+                for frame in iter_mp3_frames(f):
+                    if start is None:
+                        start = frame.offset
+                    stop = frame.offset + frame.length
+                    duration += frame.seconds
+                if start is None:
+                    continue
+                f.seek(start)
+                remaining = stop - start
+                while remaining:
+                    block = f.read(min(COPY_BLOCK_BYTES, remaining))
+                    if not block:
+                        break
+                    out.write(block)
+                    remaining -= len(block)
+    return duration
+
+
+_CONCATENATORS = {
+    "wav": concatenate_wav_files,
+    "mp3": concatenate_mp3_files,
+}
+
+STREAMABLE_FORMATS = frozenset(_CONCATENATORS)
+
+AUDIO_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "m4a": "audio/mp4",
+}
+
+
+def concatenate_audio_files(
+    parts: List[Path],
+    dest: Path,
+    audio_format: str,
+    normalizer: Optional[LoudnessNormalizer] = None
+) -> float:
+    """
+    Stream parts into dest, through normalizer if given (WAV only); returns
+    the duration in seconds
+    """
+    try:
+        concatenate = _CONCATENATORS[audio_format]
+    except KeyError:
+        raise ValueError(f"Cannot assemble {audio_format} audio as a stream") from None
+    if normalizer is not None:
+        if audio_format != "wav":
+            raise ValueError(f"Cannot normalize {audio_format} audio without decoding it")
+        return concatenate_wav_files(parts, dest, normalizer)
+    return concatenate(parts, dest)
@@ -0,0 +1,65 @@
+import os
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(ValueError):
+    """A Range header whose first byte lies beyond the end of the file"""
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """
+    Strong ETag for a file's current contents. Rendered audio is only ever
+    replaced, never edited in place, so size and mtime identify a version.
+    """
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def _opaque_tags(header: str):
+    for tag in header.split(","):
+        tag = tag.strip()
+        yield tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match check; uses weak comparison as RFC 9110 requires"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in _opaque_tags(header)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    First and last byte (inclusive) requested by a Range header.
+
+    Returns None when the header should be ignored and the whole file
+    served: missing, not in bytes, malformed, or asking for several ranges
+    (RFC 9110 lets a server answer those with 200). Raises
+    RangeNotSatisfiable when the range starts past the end of the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes
+        if last == "":
+            return None
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
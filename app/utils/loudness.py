@@ -0,0 +1,146 @@
+import math
+import wave
+from pathlib import Path
+from typing import NamedTuple
+
+# Loudness and silence are judged per window of this length, as in the
+# gated measurement of ITU-R BS.1770 (which uses 400 ms; shorter windows
+# trim silence more precisely)
+WINDOW_SECONDS = 0.1
+# Windows read and processed per NumPy block; bounds memory per chunk
+WINDOWS_PER_BLOCK = 64
+ABSOLUTE_GATE_DB = -70.0
+RELATIVE_GATE_DB = -10.0
+PEAK_CEILING = 10 ** (-1.0 / 20)  # -1 dBFS
+
+
+class LoudnessStats(NamedTuple):
+    loudness_db: float  # Gated RMS in dBFS; -inf for digital silence
+    peak: float  # Largest absolute sample, 1.0 = full scale
+    start_frame: int  # First frame kept after trimming leading silence
+    end_frame: int  # One past the last frame kept
+    frames: int
+
+
+class LoudnessNormalizer:
+    """
+    Brings 16-bit PCM WAV audio to a common loudness and trims its leading
+    and trailing silence, for chunks from a TTS provider that come back at
+    different levels and with pauses of their own.
+
+    Loudness is the gated RMS of WINDOW_SECONDS windows: windows below
+    ABSOLUTE_GATE_DB are ignored, then those more than RELATIVE_GATE_DB
+    under the mean of the rest, like the BS.1770 (LUFS) gating without
+    its K-weighting filter. Gain is capped by max_gain_db and so that the
+    peak stays under -1 dBFS.
+
+    Both passes read the file in blocks of WINDOWS_PER_BLOCK windows and
+    work on whole NumPy arrays, so memory does not grow with the length of
+    the audio and no Python code runs per sample.
+    """
+
+    def __init__(
+        self,
+        target_db: float = -18.0,
+        max_gain_db: float = 20.0,
+        silence_threshold_db: float = -50.0,
+        keep_silence_seconds: float = 0.25
+    ):
+        self.target_db = target_db
+        self.max_gain_db = max_gain_db
+        self.silence_threshold_db = silence_threshold_db
+        self.keep_silence_seconds = keep_silence_seconds
+
+    def settings_key(self) -> str:
+        """Identifies the processing, for fingerprints of the audio it produces"""
+        return (
+            f"loudness:{self.target_db}:{self.max_gain_db}:"
+            f"{self.silence_threshold_db}:{self.keep_silence_seconds}"
+        )
+
+    def measure(self, path: Path) -> LoudnessStats:
+        import numpy as np
+        with wave.open(str(path), "rb") as wav:
+            _check_pcm16(wav)
+            channels = wav.getnchannels()
+            window = max(1, int(wav.getframerate() * WINDOW_SECONDS))
+            levels = []
+            peak = 0.0
+            frames = 0
+            while True:
+                data = wav.readframes(window * WINDOWS_PER_BLOCK)
+                if not data:
+                    break
+                samples = _to_float(np, data)
+                count = len(samples) // channels
+                frames += count
+                peak = max(peak, float(np.abs(samples).max()))
+                # Mean square per window; a short last window is padded
+                # with zeros, which only ever makes it quieter
+                windows = -(-count // window)
+                padded = np.zeros(windows * window * channels, dtype=np.float32)
+                padded[:len(samples)] = samples
+                levels.append(np.square(padded).reshape(windows, -1).mean(axis=1))
+        if not levels:
+            return LoudnessStats(-math.inf, 0.0, 0, 0, 0)
+
+        mean_squares = np.concatenate(levels)
+        with np.errstate(divide="ignore"):
+            window_db = 10 * np.log10(mean_squares)
+        gated = mean_squares[window_db > ABSOLUTE_GATE_DB]
+        loudness_db = -math.inf
+        if gated.size:
+            relative_gate = 10 * math.log10(gated.mean()) + RELATIVE_GATE_DB
+            gated = gated[10 * np.log10(gated) > relative_gate]
+            loudness_db = 10 * math.log10(gated.mean())
+
+        audible = np.flatnonzero(window_db > self.silence_threshold_db)
+        if not audible.size:
+            return LoudnessStats(loudness_db, peak, 0, frames, frames)
+        keep = int(self.keep_silence_seconds / WINDOW_SECONDS * window)
+        start = max(0, int(audible[0]) * window - keep)
+        end = min(frames, (int(audible[-1]) + 1) * window + keep)
+        return LoudnessStats(loudness_db, peak, start, end, frames)
+
+    def gain_for(self, stats: LoudnessStats) -> float:
+        """Linear gain taking stats.loudness_db to the target, within the caps"""
+        if stats.loudness_db == -math.inf or stats.peak == 0.0:
+            return 1.0
+        gain_db = min(self.target_db - stats.loudness_db, self.max_gain_db)
+        return min(10 ** (gain_db / 20), PEAK_CEILING / stats.peak)
+
+    def process(self, path: Path, out: wave.Wave_write) -> LoudnessStats:
+        """
+        Append path's audio, trimmed and at the target loudness, to out.
+        out's format must already match path's.
+        """
+        import numpy as np
+        stats = self.measure(path)
+        gain = self.gain_for(stats)
+        with wave.open(str(path), "rb") as wav:
+            channels = wav.getnchannels()
+            block = max(1, int(wav.getframerate() * WINDOW_SECONDS)) * WINDOWS_PER_BLOCK
+            wav.setpos(stats.start_frame)
+            remaining = stats.end_frame - stats.start_frame
+            while remaining > 0:
+                data = wav.readframes(min(block, remaining))
+                if not data:
+                    break
+                remaining -= len(data) // (2 * channels)
+                if gain == 1.0:
+                    out.writeframes(data)
+                    continue
+                samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+                samples *= gain
+                np.clip(np.rint(samples, out=samples), -32768, 32767, out=samples)
+                out.writeframes(samples.astype("<i2").tobytes())
+        return stats
+
+
+def _check_pcm16(wav: wave.Wave_read) -> None:
+    if wav.getsampwidth() != 2:
+        raise ValueError(f"Loudness normalization needs 16-bit PCM, not {8 * wav.getsampwidth()}-bit")
+
+
+def _to_float(np, data: bytes):
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
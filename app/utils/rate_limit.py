@@ -0,0 +1,96 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+
+
+class _Bucket:
+    """Token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self.refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class TokenRateLimiter:
+    """
+    Caps LLM calls by in-flight count, requests per minute and tokens per
+    minute, matching how providers meter usage.
+
+    Each call reserves its estimated tokens (prompt plus max completion)
+    before it starts; settle() afterwards refunds or charges the difference
+    from the actual usage, so the budget tracks what the provider counts.
+    Waiters are served in arrival order, so a large request is not starved
+    by a stream of small ones.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        max_in_flight: int = 16,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._tokens = _Bucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self._requests = _Bucket(requests_per_minute, clock) if requests_per_minute else None
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._turn = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    @asynccontextmanager
+    async def reserve(self, estimated_tokens: int) -> AsyncIterator["Reservation"]:
+        async with self._in_flight:
+            async with self._turn:
+                while True:
+                    delay = max(
+                        self._tokens.wait_time(estimated_tokens) if self._tokens else 0.0,
+                        self._requests.wait_time(1) if self._requests else 0.0
+                    )
+                    if delay <= 0:
+                        break
+                    self.waited_seconds += delay
+                    await asyncio.sleep(delay)
+                if self._tokens:
+                    self._tokens.level -= estimated_tokens
+                if self._requests:
+                    self._requests.level -= 1
+            reservation = Reservation(self, estimated_tokens)
+            yield reservation
+
+    def _adjust(self, tokens: int) -> None:
+        if self._tokens:
+            self._tokens.refill()
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + tokens)
+
+    def stats(self) -> Dict[str, float]:
+        stats = {'waited_seconds': self.waited_seconds}
+        if self._tokens:
+            self._tokens.refill()
+            stats['tokens_available'] = self._tokens.level
+        return stats
+
+
+class Reservation:
+    def __init__(self, limiter: TokenRateLimiter, estimated_tokens: int):
+        self._limiter = limiter
+        self.estimated_tokens = estimated_tokens
+
+    def settle(self, actual_tokens: int) -> None:
+        """Correct the reservation once the provider reports real usage"""
+        self._limiter._adjust(self.estimated_tokens - actual_tokens)
+        self.estimated_tokens = actual_tokens
@@ -0,0 +1,82 @@
+"""
+Background job worker.
+
+    python -m app.worker [--processes N]
+
+Starts N worker processes (JOB_WORKER_PROCESSES by default), each claiming
+jobs from the jobs table and running up to JOB_WORKER_CONCURRENCY of them at
+once. Scale generation throughput by adding processes or machines; the API
+only enqueues. SIGINT/SIGTERM stop claiming and let running jobs finish.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+from loguru import logger
+from app.core.config import get_settings
+
+
+async def _run_worker() -> None:
+    from app.db.session import dispose_engine, get_session_factory
+    from app.services.job_handlers import build_job_handlers
+    from app.services.job_queue import get_job_queue
+    from app.services.job_worker import JobWorker
+    from app.services.encoding import shutdown_encoding_executor
+    from app.services.storage import close_storage_backend
+
+    settings = get_settings()
+
+    worker = JobWorker(
+        get_job_queue(),
+        build_job_handlers(get_session_factory()),
+        concurrency=settings.JOB_WORKER_CONCURRENCY,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+        heartbeat_interval=settings.JOB_HEARTBEAT_SECONDS
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await close_storage_backend()
+        await shutdown_encoding_executor()
+        await dispose_engine()
+
+
+def _worker_process() -> None:
+    from app.core.logging import setup_logging
+    setup_logging()
+    asyncio.run(_run_worker())
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    # Children size their encoding pools from it (default_encode_workers)
+    os.environ["JOB_WORKER_PROCESSES"] = str(max(1, args.processes))
+    get_settings.cache_clear()
+    if args.processes <= 1:
+        _worker_process()
+        return
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, name=f"job-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Children get the terminal's SIGINT themselves; forward SIGTERM
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes])
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+    logger.info("All job workers exited")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure loudness normalization and silence trimming throughput, in seconds
+of audio processed per second of CPU.
+
+    python -m benchmarks.audio_normalization --minutes 60 --chunk-seconds 240 --sample-rate 24000
+
+Writes a synthetic book of TTS-sized chunks (tone bursts at a different
+level per chunk, with pauses at both ends) and assembles it three ways:
+a plain copy, through LoudnessNormalizer, and, on the first --python-seconds
+of one chunk, a per-sample Python loop doing the same gain and trim.
+"""
+import argparse
+import math
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+from app.utils.audio_processing import concatenate_audio_files
+from app.utils.loudness import LoudnessNormalizer
+
+
+def write_chunks(directory: Path, minutes: float, chunk_seconds: float, sample_rate: int) -> List[Path]:
+    rng = np.random.default_rng(0)
+    chunks = []
+    for n in range(max(1, int(minutes * 60 // chunk_seconds))):
+        frames = int(chunk_seconds * sample_rate)
+        t = np.arange(frames) / sample_rate
+        # Syllable-rate envelope over a tone, at a level that varies by chunk
+        envelope = (np.sin(2 * np.pi * 3 * t) > -0.3).astype(np.float32)
+        level = 10 ** (rng.uniform(-35, -12) / 20) * 32767
+        samples = level * envelope * np.sin(2 * np.pi * 180 * t)
+        pause = int(rng.uniform(0.3, 1.5) * sample_rate)
+        samples[:pause] = 0
+        samples[-pause:] = 0
+        path = directory / f"{n:05d}.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(samples.astype("<i2").tobytes())
+        chunks.append(path)
+    return chunks
+
+
+def python_normalize(path: Path, dest: Path, normalizer: LoudnessNormalizer, seconds: float) -> float:
+    """The same measurement, gain and trim, one sample at a time"""
+    with wave.open(str(path), "rb") as wav:
+        rate = wav.getframerate()
+        frames = min(wav.getnframes(), int(seconds * rate))
+        data = wav.readframes(frames)
+    samples = [int.from_bytes(data[i:i + 2], "little", signed=True) / 32768 for i in range(0, len(data), 2)]
+    window = int(rate * 0.1)
+    levels = [
+        sum(s * s for s in samples[i:i + window]) / window
+        for i in range(0, len(samples), window)
+    ]
+    loud = [m for m in levels if m > 1e-7]
+    loudness_db = 10 * math.log10(sum(loud) / len(loud)) if loud else -math.inf
+    threshold = 10 ** (normalizer.silence_threshold_db / 10)
+    audible = [i for i, m in enumerate(levels) if m > threshold]
+    gain = 10 ** ((normalizer.target_db - loudness_db) / 20) if loud else 1.0
+    start, end = (audible[0] * window, (audible[-1] + 1) * window) if audible else (0, len(samples))
+    out = bytearray()
+    for s in samples[start:end]:
+        out += max(-32768, min(32767, round(s * gain * 32768))).to_bytes(2, "little", signed=True)
+    dest.write_bytes(bytes(out))
+    return frames / rate
+
+
+def cpu_seconds(fn: Callable[[], object]) -> float:
+    started = time.process_time()
+    fn()
+    return time.process_time() - started
+
+
+def main(minutes: float, chunk_seconds: float, sample_rate: int, python_seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        chunks = write_chunks(directory, minutes, chunk_seconds, sample_rate)
+        audio_seconds = len(chunks) * chunk_seconds
+        normalizer = LoudnessNormalizer()
+        print(f"{len(chunks)} chunks, {audio_seconds / 60:.0f} min of {sample_rate} Hz mono audio")
+        print(f"{'path':<28}{'audio s':>10}{'cpu s':>10}{'audio s / cpu s':>18}")
+
+        rows = [
+            ("copy", audio_seconds, cpu_seconds(
+                lambda: concatenate_audio_files(chunks, directory / "copy.wav", "wav")
+            )),
+            ("LoudnessNormalizer", audio_seconds, cpu_seconds(
+                lambda: concatenate_audio_files(chunks, directory / "leveled.wav", "wav", normalizer)
+            )),
+        ]
+        processed = []
+        python_cpu = cpu_seconds(lambda: processed.append(
+            python_normalize(chunks[0], directory / "python.raw", normalizer, python_seconds)
+        ))
+        rows.append(("per-sample Python", processed[0], python_cpu))
+        for name, seconds, cpu in rows:
+            print(f"{name:<28}{seconds:>10.0f}{cpu:>10.2f}{seconds / max(cpu, 1e-9):>18.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--chunk-seconds", type=float, default=240, help="Length of one TTS chunk")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--python-seconds", type=float, default=20, help="Audio run through the Python loop")
+    args = parser.parse_args()
+    main(args.minutes, args.chunk_seconds, args.sample_rate, args.python_seconds)
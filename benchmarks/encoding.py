@@ -0,0 +1,77 @@
+"""
+Measure chapter assembly throughput of the encoding process pool as the
+number of worker processes grows.
+
+    python -m benchmarks.encoding --chapters 16 --chunks 4 --chunk-seconds 120 --format mp3
+
+Each chapter is leveled (LoudnessNormalizer), joined and, with --format
+mp3 or aac, encoded with ffmpeg. All chapters are submitted at once, like
+render_book does. With enough chapters, audio seconds per wall second
+should grow about linearly up to the number of cores.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.audio_normalization import write_chunks
+from app.services.encoding import ENCODED_SUFFIXES, EncodingExecutor, assemble_chapter, available_cores
+from app.utils.loudness import LoudnessNormalizer
+
+
+async def run(
+    executor: EncodingExecutor,
+    chapters: List[List[Path]],
+    out_dir: Path,
+    encode_format: Optional[str]
+) -> float:
+    # Start the worker processes first, so spawning isn't timed
+    await asyncio.gather(*(executor.run(abs, 0) for _ in range(executor.max_workers)))
+    suffix = ENCODED_SUFFIXES[encode_format] if encode_format else "wav"
+    started = time.perf_counter()
+    durations = await asyncio.gather(*(
+        executor.run(
+            assemble_chapter, parts, out_dir / f"chapter_{n:03d}.{suffix}", "wav",
+            LoudnessNormalizer(), encode_format
+        )
+        for n, parts in enumerate(chapters)
+    ))
+    elapsed = time.perf_counter() - started
+    return sum(durations) / elapsed
+
+
+def main(chapters: int, chunks: int, chunk_seconds: float, encode_format: Optional[str], max_workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        # Chapters share their chunk files; assembly only reads them
+        parts = write_chunks(directory, chunks * chunk_seconds / 60, chunk_seconds, 24000)
+        book = [parts for _ in range(chapters)]
+        print(
+            f"{chapters} chapters x {chunks} chunks x {chunk_seconds:.0f} s, "
+            f"format {encode_format or 'wav'}, {available_cores()} cores available"
+        )
+        print(f"{'workers':>8}{'audio s / wall s':>20}{'speedup':>10}")
+        workers = 1
+        baseline = None
+        while workers <= max_workers:
+            executor = EncodingExecutor(workers)
+            try:
+                rate = asyncio.run(run(executor, book, directory, encode_format))
+            finally:
+                executor.shutdown()
+            baseline = baseline or rate
+            print(f"{workers:>8}{rate:>20.0f}{rate / baseline:>9.2f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chapters", type=int, default=16)
+    parser.add_argument("--chunks", type=int, default=4, help="Chunks per chapter")
+    parser.add_argument("--chunk-seconds", type=float, default=120)
+    parser.add_argument("--format", choices=sorted(ENCODED_SUFFIXES), default=None, help="Needs ffmpeg")
+    parser.add_argument("--max-workers", type=int, default=available_cores())
+    args = parser.parse_args()
+    main(args.chapters, args.chunks, args.chunk_seconds, args.format, args.max_workers)
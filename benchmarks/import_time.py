@@ -0,0 +1,99 @@
+"""
+Measure the cold import time of the API application with python -X importtime.
+
+    python -m benchmarks.import_time --runs 5
+
+Each run imports app.main in a fresh interpreter with no application
+settings in the environment, so importing must not need them. Reports the
+median total import time, the share spent in app.* modules themselves and
+the slowest imports, and exits with status 1 when a budget is exceeded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Whole import of app.main, third-party packages included
+TOTAL_BUDGET_MS = 2500
+# Time spent in the app's own module bodies
+APP_SELF_BUDGET_MS = 300
+# Heavy or I/O-bound packages that must only load when first used
+LAZY_MODULES = ("asyncpg", "openai", "supabase", "numpy", "httpx")
+
+
+class ImportProfile(NamedTuple):
+    total_ms: float
+    app_self_ms: float
+    modules: Dict[str, float]  # Cumulative milliseconds per module
+    eager: List[str]  # LAZY_MODULES that were imported anyway
+
+
+def measure_import(module: str = "app.main", cwd: str = None) -> ImportProfile:
+    """Import module in a fresh interpreter and parse its -X importtime report"""
+    code = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    # Only what the interpreter needs: no settings, no .env next to cwd
+    env = {key: os.environ[key] for key in ("PATH", "HOME", "SYSTEMROOT") if key in os.environ}
+    env["PYTHONPATH"] = str(ROOT)
+    with tempfile.TemporaryDirectory() as scratch:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=cwd or scratch,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules: Dict[str, float] = {}
+    app_self_us = 0
+    for line in result.stderr.splitlines():
+        fields = line.partition(":")[2].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2].strip()
+        modules[name] = cumulative_us / 1000
+        if name == "app" or name.startswith("app."):
+            app_self_us += self_us
+    return ImportProfile(
+        total_ms=modules[module],
+        app_self_ms=app_self_us / 1000,
+        modules=modules,
+        eager=json.loads(result.stdout.strip().splitlines()[-1])
+    )
+
+
+def main(runs: int, total_budget: float, app_budget: float, top: int) -> int:
+    profiles = [measure_import() for _ in range(runs)]
+    total = statistics.median(p.total_ms for p in profiles)
+    app_self = statistics.median(p.app_self_ms for p in profiles)
+
+    slowest = sorted(profiles[-1].modules.items(), key=lambda item: item[1], reverse=True)
+    print(f"{'module':<48}{'cumulative ms':>14}")
+    for name, ms in slowest[:top]:
+        print(f"{name:<48}{ms:>14.1f}")
+    print()
+    print(f"app.main import (median of {runs}): {total:.0f} ms (budget {total_budget:.0f})")
+    print(f"app.* module bodies:              {app_self:.0f} ms (budget {app_budget:.0f})")
+    print(f"eagerly imported lazy modules:    {', '.join(profiles[-1].eager) or 'none'}")
+    return int(total > total_budget or app_self > app_budget or bool(profiles[-1].eager))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--total-budget-ms", type=float, default=TOTAL_BUDGET_MS)
+    parser.add_argument("--app-budget-ms", type=float, default=APP_SELF_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.total_budget_ms, args.app_budget_ms, args.top))
@@ -0,0 +1,310 @@
+"""
+Load-test the API and report latency percentiles and throughput per endpoint.
+
+    python -m benchmarks.load_test --mode both --concurrency 1,16,64 --requests 500 --output load.json
+
+Runs each scenario (health, template reads and writes, error paths) at
+every concurrency level with a closed loop of that many clients. --mode
+asgi drives the app in-process through httpx's ASGITransport; --mode
+uvicorn starts it under uvicorn on a local port. Both use
+benchmarks.load_app, the real app over a SQLite file standing in for
+Postgres. Results are printed and, with --output, written as JSON;
+--baseline compares p95 and req/s against an earlier JSON file.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from uuid import uuid4
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TEMPLATE = {
+    "title": "Load test template",
+    "description": "Seeded by benchmarks.load_test",
+    "sections": [
+        {"title": "About you", "questions": [
+            {"id": "name", "text": "Your name", "type": "text"},
+            {"id": "tone", "text": "Tone", "type": "choice", "options": ["warm", "formal"]},
+        ]},
+    ],
+}
+
+
+class Scenario(NamedTuple):
+    method: str
+    path: Callable[[random.Random, List[str]], str]
+    body: Optional[Dict[str, Any]]
+    expected_status: int
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "health": Scenario("GET", lambda rng, ids: "/health", None, 200),
+    "template_get": Scenario("GET", lambda rng, ids: f"/api/templates/{rng.choice(ids)}", None, 200),
+    "template_list": Scenario("GET", lambda rng, ids: "/api/templates/?limit=20", None, 200),
+    "template_create": Scenario("POST", lambda rng, ids: "/api/templates/", TEMPLATE, 201),
+    "error_not_found": Scenario("GET", lambda rng, ids: f"/api/templates/{uuid4()}", None, 404),
+    "error_validation": Scenario("POST", lambda rng, ids: "/api/templates/", {"title": 1}, 422),
+    "error_bad_cursor": Scenario("GET", lambda rng, ids: "/api/templates/?cursor=not-a-cursor", None, 400),
+}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    template_ids: List[str],
+    requests: int,
+    concurrency: int,
+    warmup: int = 20
+) -> Dict[str, Any]:
+    """
+    Send `requests` requests for a scenario from `concurrency` concurrent
+    clients, each issuing its next request as soon as the last completes
+    """
+    scenario = SCENARIOS[name]
+    rng = random.Random(0)
+    latencies: List[float] = []
+    errors = 0
+    sent = 0
+
+    async def one(record: bool) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                scenario.method, scenario.path(rng, template_ids), json=scenario.body
+            )
+            ok = response.status_code == scenario.expected_status
+        except httpx.HTTPError:
+            ok = False
+        if record:
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    async def worker() -> None:
+        nonlocal sent
+        while sent < requests:
+            sent += 1
+            await one(record=True)
+
+    for _ in range(warmup):
+        await one(record=False)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+async def seed_templates(client: httpx.AsyncClient, count: int) -> List[str]:
+    ids = []
+    for _ in range(count):
+        response = await client.post("/api/templates/", json=TEMPLATE)
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+
+async def run_suite(
+    client: httpx.AsyncClient,
+    mode: str,
+    scenarios: List[str],
+    concurrency_levels: List[int],
+    requests: int,
+    seed: int
+) -> List[Dict[str, Any]]:
+    template_ids = await seed_templates(client, seed)
+    results = []
+    for name in scenarios:
+        for concurrency in concurrency_levels:
+            result = await run_scenario(client, name, template_ids, requests, concurrency)
+            result["mode"] = mode
+            results.append(result)
+            _print_row(result)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_asgi(database: Path, **suite) -> List[Dict[str, Any]]:
+    os.environ["LOAD_TEST_DATABASE"] = str(database)
+    from benchmarks.load_app import app, engine
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            return await run_suite(client, "asgi", **suite)
+    finally:
+        await engine.dispose()
+
+
+async def run_uvicorn(database: Path, workers: int, **suite) -> List[Dict[str, Any]]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "LOAD_TEST_DATABASE": str(database),
+        "LOG_FILE_PATH": str(database.with_suffix(".log")),
+        "DEBUG": "false",
+        "PYTHONPATH": str(ROOT),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.load_app:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=ROOT,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    concurrency = max(suite["concurrency_levels"])
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.1)
+            return await run_suite(client, "uvicorn", **suite)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _print_row(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['mode']:<8}{result['scenario']:<18}{result['concurrency']:>6}"
+        f"{result['rps']:>10.0f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+        f"{result['p99_ms']:>9.2f}{result['errors']:>7}",
+        flush=True
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    """Print p95 and req/s changes against a previous run's JSON"""
+    previous = {(r["mode"], r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\nvs baseline {baseline['meta'].get('commit') or ''} ({baseline['meta']['timestamp']})")
+    print(f"{'mode':<8}{'scenario':<18}{'conc':>6}{'p95 change':>12}{'req/s change':>14}")
+    for result in results:
+        before = previous.get((result["mode"], result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        p95 = (result["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        rps = (result["rps"] / before["rps"] - 1) * 100 if before["rps"] else 0.0
+        print(
+            f"{result['mode']:<8}{result['scenario']:<18}{result['concurrency']:>6}"
+            f"{p95:>+11.1f}%{rps:>+13.1f}%"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    suite = {
+        "scenarios": args.scenarios,
+        "concurrency_levels": args.concurrency,
+        "requests": args.requests,
+        "seed": args.seed_templates,
+    }
+    print(f"{'mode':<8}{'scenario':<18}{'conc':>6}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>7}")
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.mode in ("asgi", "both"):
+            results += await run_asgi(Path(scratch) / "asgi.db", **suite)
+        if args.mode in ("uvicorn", "both"):
+            results += await run_uvicorn(Path(scratch) / "uvicorn.db", args.workers, **suite)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nwrote {args.output}")
+    if args.baseline:
+        compare(results, json.loads(Path(args.baseline).read_text()))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _scenario_list(value: str) -> List[str]:
+    names = [v for v in value.split(",") if v]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["asgi", "uvicorn", "both"], default="asgi")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 16, 64], help="Comma-separated levels")
+    parser.add_argument("--requests", type=int, default=500, help="Per scenario and concurrency level")
+    parser.add_argument("--scenarios", type=_scenario_list, default=list(SCENARIOS))
+    parser.add_argument("--seed-templates", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,163 @@
+import os
+from uuid import uuid4
+import pytest
+from httpx import AsyncClient
+from app.api.responses import ZEROCOPY_EXTENSION, RangeFileResponse
+from app.core.config import settings
+from app.db.session import get_async_session
+from app.main import app
+from app.models.audiobook import Audiobook
+from app.utils.http_ranges import RangeNotSatisfiable, etag_matches, parse_range
+
+AUDIO = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 10239)),
+    ("bytes=-100", (10140, 10239)),
+    ("bytes=10000-99999", (10000, 10239)),
+    ("bytes=-99999", (0, 10239)),
+    ("bytes=5-1", None),
+    ("bytes=0-1,5-9", None),
+    ("items=0-1", None),
+    ("bytes=abc", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, len(AUDIO)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10240-", "bytes=-0"])
+def test_parse_range_past_the_end(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, len(AUDIO))
+
+
+def test_etag_matches_lists_and_weak_tags():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+
+
+@pytest.fixture
+async def client(db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_OUTPUT_DIR", str(tmp_path))
+    book_id = uuid4()
+    (tmp_path / str(book_id)).mkdir()
+    (tmp_path / str(book_id) / "chapter_000.mp3").write_bytes(AUDIO)
+    audiobook = Audiobook(
+        id=book_id,
+        outline_id=uuid4(),
+        status='completed',
+        chapter_files=[{
+            'index': 0, 'title': "One", 'path': f"{book_id}/chapter_000.mp3",
+            'duration_seconds': 1.0, 'chunk_count': 1
+        }, {
+            'index': 1, 'title': "Escape", 'path': "../secrets.mp3",
+            'duration_seconds': 1.0, 'chunk_count': 1
+        }]
+    )
+    db_session.add(audiobook)
+    await db_session.commit()
+
+    async def override_session():
+        yield db_session
+
+    app.dependency_overrides[get_async_session] = override_session
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        client.chapter_url = f"/api/audiobooks/{book_id}/chapters/0"
+        client.book_id = book_id
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def test_full_download_has_validators(client):
+    response = await client.get(client.chapter_url)
+
+    assert response.status_code == 200
+    assert response.content == AUDIO
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.headers["content-length"] == str(len(AUDIO))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"]
+
+
+async def test_range_request_returns_partial_content(client):
+    response = await client.get(client.chapter_url, headers={"Range": "bytes=1000-1999"})
+
+    assert response.status_code == 206
+    assert response.content == AUDIO[1000:2000]
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(AUDIO)}"
+    assert response.headers["content-length"] == "1000"
+
+
+async def test_unsatisfiable_range(client):
+    response = await client.get(client.chapter_url, headers={"Range": "bytes=20000-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(AUDIO)}"
+
+
+async def test_conditional_requests(client):
+    etag = (await client.head(client.chapter_url)).headers["etag"]
+
+    not_modified = await client.get(client.chapter_url, headers={"If-None-Match": etag})
+    stale_range = await client.get(
+        client.chapter_url, headers={"Range": "bytes=0-9", "If-Range": '"other"'}
+    )
+    fresh_range = await client.get(client.chapter_url, headers={"Range": "bytes=0-9", "If-Range": etag})
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert stale_range.status_code == 200
+    assert fresh_range.status_code == 206
+
+
+async def test_head_sends_no_body(client):
+    response = await client.head(client.chapter_url, headers={"Range": "bytes=0-9"})
+
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "10"
+    assert response.content == b""
+
+
+async def test_unknown_or_escaping_chapter_is_not_found(client):
+    missing = await client.get(f"/api/audiobooks/{client.book_id}/chapters/7")
+    escaping = await client.get(f"/api/audiobooks/{client.book_id}/chapters/1")
+
+    assert missing.status_code == 404
+    assert escaping.status_code == 404
+
+
+async def _send_file(tmp_path, extensions):
+    path = tmp_path / "audio.bin"
+    path.write_bytes(AUDIO)
+    messages = []
+
+    async def send(message):
+        if message["type"] == ZEROCOPY_EXTENSION:
+            file = message["file"]
+            message = {**message, "data": os.pread(file.fileno(), message["count"], message["offset"])}
+        messages.append(message)
+
+    response = RangeFileResponse(path, (100, 1099), status_code=206, chunk_size=300)
+    await response({"type": "http", "extensions": extensions}, None, send)
+    return messages
+
+
+async def test_body_is_sent_in_fixed_size_chunks(tmp_path):
+    messages = await _send_file(tmp_path, {})
+
+    bodies = [m for m in messages if m["type"] == "http.response.body"]
+    assert [len(m["body"]) for m in bodies] == [300, 300, 300, 100]
+    assert [m["more_body"] for m in bodies] == [True, True, True, False]
+    assert b"".join(m["body"] for m in bodies) == AUDIO[100:1100]
+
+
+async def test_zero_copy_send_hands_over_the_file(tmp_path):
+    messages = await _send_file(tmp_path, {ZEROCOPY_EXTENSION: {}})
+
+    assert [m["type"] for m in messages] == ["http.response.start", ZEROCOPY_EXTENSION]
+    assert messages[1]["offset"] == 100 and messages[1]["count"] == 1000
+    assert messages[1]["data"] == AUDIO[100:1100]
@@ -0,0 +1,351 @@
+import asyncio
+import time
+import tracemalloc
+import wave
+import pytest
+from uuid import uuid4
+from app.core.errors import DetailedHTTPException
+from app.models.outline import BookOutline
+from app.schemas.outline import ChapterSchema, chapter_fingerprint
+from app.services.audio_service import AudioGenerationPipeline, AudioService
+from app.services.storage import LocalStorageBackend
+from app.services.tts_cache import TTSChunkCache, tts_chunk_key
+from app.services.tts_providers import StubTTSProvider, TTSProviderError
+from app.utils.audio_processing import (
+    COPY_BLOCK_BYTES,
+    concatenate_audio_files,
+    mp3_duration,
+    split_text_into_chunks
+)
+
+
+class RecordingProvider(StubTTSProvider):
+    """Stub provider that tracks how many calls run at once"""
+
+    def __init__(self, latency_seconds=0.0, failures=0, retryable=True):
+        super().__init__(sample_rate=8000, latency_seconds=latency_seconds)
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.failures = failures
+        self.retryable = retryable
+
+    async def synthesize(self, text, voice, model, audio_format):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.failures:
+                self.failures -= 1
+                raise TTSProviderError("flaky", retryable=self.retryable)
+            return await super().synthesize(text, voice, model, audio_format)
+        finally:
+            self.in_flight -= 1
+
+
+def _chapters(count, sentences=4):
+    return [
+        {"title": f"Chapter {i}", "content": " ".join(f"Sentence {j} of chapter {i}." for j in range(sentences))}
+        for i in range(count)
+    ]
+
+
+def _pipeline(provider, tmp_path, **kwargs):
+    kwargs.setdefault("chunk_max_chars", 60)
+    kwargs.setdefault("retry_base_delay", 0.001)
+    return AudioGenerationPipeline(provider=provider, output_dir=tmp_path, **kwargs)
+
+
+def test_chunks_are_sentence_aligned_and_bounded():
+    text = "First sentence here. Second one! Third? " + "word " * 30 + "\n\nNew paragraph."
+    chunks = split_text_into_chunks(text, max_chars=40)
+
+    assert chunks[0] == "First sentence here. Second one! Third?"
+    assert chunks[-1] == "New paragraph."
+    assert all(len(c) <= 40 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+async def test_book_renders_in_about_the_time_of_one_chapter(tmp_path):
+    provider = RecordingProvider(latency_seconds=0.05)
+    pipeline = _pipeline(provider, tmp_path, max_concurrency=200, max_concurrency_per_book=200)
+
+    start = time.perf_counter()
+    result = await pipeline.render_book(uuid4(), _chapters(20))
+    elapsed = time.perf_counter() - start
+
+    assert len(result.chapter_files) == 20
+    # Sequential rendering would take 20 chapters x >=2 chunks x 50ms = 2s;
+    # the margin covers writing and assembling the part files
+    assert elapsed < 1.0
+    assert provider.peak > 20
+
+
+async def test_global_and_per_book_limits(tmp_path):
+    provider = RecordingProvider(latency_seconds=0.01)
+    pipeline = _pipeline(provider, tmp_path, max_concurrency=5, max_concurrency_per_book=3)
+
+    await pipeline.render_book(uuid4(), _chapters(6))
+    assert provider.peak == 3
+
+    provider.peak = 0
+    await asyncio.gather(*(pipeline.render_book(uuid4(), _chapters(6)) for _ in range(3)))
+    assert provider.peak == 5
+
+
+async def test_chapter_files_are_valid_wav(tmp_path):
+    pipeline = _pipeline(RecordingProvider(), tmp_path)
+
+    result = await pipeline.render_book(uuid4(), _chapters(2))
+
+    chapter = result.chapter_files[1]
+    with wave.open(str(tmp_path / chapter.path), "rb") as wav:
+        assert wav.getnframes() / wav.getframerate() == pytest.approx(chapter.duration_seconds)
+    assert chapter.chunk_count >= 2
+    assert result.total_duration == round(sum(c.duration_seconds for c in result.chapter_files))
+
+
+async def test_retryable_failures_are_retried(tmp_path):
+    provider = RecordingProvider(failures=2)
+    pipeline = _pipeline(provider, tmp_path, max_retries=3)
+
+    result = await pipeline.render_book(uuid4(), _chapters(1, sentences=1))
+
+    # Title and body chunk, plus one extra call per failure
+    assert result.chapter_files[0].chunk_count == 2
+    assert provider.calls == 4
+
+
+async def test_permanent_failures_are_not_retried(tmp_path):
+    provider = RecordingProvider(failures=1, retryable=False)
+    pipeline = _pipeline(provider, tmp_path, max_retries=3)
+
+    with pytest.raises(TTSProviderError):
+        await pipeline.render_book(uuid4(), _chapters(1, sentences=1))
+    # One call per chunk, none repeated
+    assert provider.calls == 2
+
+
+async def test_generate_audiobook_stores_chapter_files(db_session, tmp_path):
+    outline = BookOutline(chapters=_chapters(3), status='approved')
+    db_session.add(outline)
+    await db_session.commit()
+    storage = LocalStorageBackend(tmp_path / "published")
+    service = AudioService(db_session, pipeline=_pipeline(RecordingProvider(), tmp_path), storage=storage)
+
+    audiobook = await service.generate_audiobook(outline.id)
+
+    assert audiobook.status == 'completed'
+    assert [c.index for c in audiobook.chapter_files] == [0, 1, 2]
+    assert audiobook.total_duration is not None
+    for chapter in audiobook.chapter_files:
+        assert storage.path_for(chapter.path).read_bytes() == (tmp_path / chapter.path).read_bytes()
+
+
+async def test_generate_audiobook_requires_approved_outline(db_session, tmp_path):
+    outline = BookOutline(chapters=_chapters(1), status='draft')
+    db_session.add(outline)
+    await db_session.commit()
+    service = AudioService(
+        db_session,
+        pipeline=_pipeline(RecordingProvider(), tmp_path),
+        storage=LocalStorageBackend(tmp_path)
+    )
+
+    with pytest.raises(DetailedHTTPException) as exc_info:
+        await service.generate_audiobook(outline.id)
+    assert exc_info.value.status_code == 409
+
+
+async def test_rerender_only_renders_changed_chapters(tmp_path):
+    provider = RecordingProvider()
+    pipeline = _pipeline(provider, tmp_path)
+    chapters = _chapters(4)
+    first = await pipeline.render_book(uuid4(), chapters)
+    calls_for_book = provider.calls
+
+    edited = [dict(c) for c in chapters]
+    edited[2]["content"] = "A rewritten chapter."
+    # Moved chapters are matched by fingerprint, not position
+    edited[0], edited[1] = edited[1], edited[0]
+    provider.calls = 0
+    second = await pipeline.render_book(uuid4(), edited, previous=first.chapter_files)
+
+    # Title and one body chunk for the edited chapter only
+    assert provider.calls == 2 < calls_for_book
+    assert second.reused == {
+        0: first.chapter_files[1].path,
+        1: first.chapter_files[0].path,
+        3: first.chapter_files[3].path,
+    }
+    for index, earlier in ((0, 1), (1, 0), (3, 3)):
+        chapter = second.chapter_files[index]
+        assert chapter.duration_seconds == first.chapter_files[earlier].duration_seconds
+        assert chapter.fingerprint == first.chapter_files[earlier].fingerprint
+        assert (tmp_path / chapter.path).read_bytes() == (tmp_path / first.chapter_files[earlier].path).read_bytes()
+    assert second.chapter_files[2].fingerprint != first.chapter_files[2].fingerprint
+
+
+async def test_rerender_with_other_voice_or_missing_file_renders_again(tmp_path):
+    first = await _pipeline(RecordingProvider(), tmp_path).render_book(uuid4(), _chapters(2))
+    (tmp_path / first.chapter_files[1].path).unlink()
+
+    provider = RecordingProvider()
+    same_voice = await _pipeline(provider, tmp_path).render_book(
+        uuid4(), _chapters(2), previous=first.chapter_files
+    )
+    other_voice = await _pipeline(RecordingProvider(), tmp_path, voice="echo").render_book(
+        uuid4(), _chapters(2), previous=first.chapter_files
+    )
+
+    assert list(same_voice.reused) == [0]
+    assert provider.calls == first.chapter_files[1].chunk_count
+    assert other_voice.reused == {}
+
+
+async def test_regenerating_an_edited_outline_reuses_the_last_audiobook(db_session, tmp_path):
+    outline = BookOutline(chapters=_chapters(3), status='approved')
+    db_session.add(outline)
+    await db_session.commit()
+    provider = RecordingProvider()
+    storage = LocalStorageBackend(tmp_path / "published")
+    service = AudioService(db_session, pipeline=_pipeline(provider, tmp_path), storage=storage)
+    first = await service.generate_audiobook(outline.id)
+
+    chapters = [dict(c) for c in outline.chapters]
+    chapters[1]["content"] = "Only this changed."
+    outline.chapters = chapters
+    await db_session.commit()
+    provider.calls = 0
+    second = await service.generate_audiobook(outline.id)
+
+    assert provider.calls == 2
+    assert second.id != first.id
+    assert [c.duration_seconds for c in second.chapter_files][::2] == [
+        c.duration_seconds for c in first.chapter_files
+    ][::2]
+    for chapter in second.chapter_files:
+        assert storage.path_for(chapter.path).read_bytes() == (tmp_path / chapter.path).read_bytes()
+
+
+def test_outline_chapters_carry_a_fingerprint_of_their_text():
+    chapter = ChapterSchema(title="One", content="Text", fingerprint="ignored")
+
+    assert chapter.model_dump()["fingerprint"] == chapter_fingerprint("One", "Text")
+    assert chapter_fingerprint("One", "Text") != chapter_fingerprint("One", "Text!")
+    assert chapter_fingerprint("One", "Text") != chapter_fingerprint("OneText", "")
+
+
+def test_chunk_key_ignores_whitespace_but_not_voice_or_provider():
+    key = tts_chunk_key("Hello  world.\n", "openai", "alloy", "tts-1", "wav")
+
+    assert key == tts_chunk_key("Hello world.", "openai", "alloy", "tts-1", "wav")
+    assert key != tts_chunk_key("Hello world.", "openai", "echo", "tts-1", "wav")
+    assert key != tts_chunk_key("Hello world.", "openai", "alloy", "tts-1", "mp3")
+    assert key != tts_chunk_key("Hello world.", "stub", "alloy", "tts-1", "wav")
+
+
+def _blob(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def test_chunk_cache_evicts_least_recently_used(tmp_path):
+    cache = TTSChunkCache(tmp_path / "cache", max_bytes=30)
+    blob = _blob(tmp_path, "blob", b"x" * 10)
+    cache.put("aa1", blob)
+    cache.put("bb2", blob)
+    cache.put("cc3", blob)
+    assert cache.get("aa1", tmp_path / "out1") == 10
+
+    cache.put("dd4", blob)
+
+    assert cache.get("bb2", tmp_path / "out2") is None
+    assert cache.get("aa1", tmp_path / "out3") == 10
+    assert cache.total_bytes == 30
+    assert cache.evictions == 1
+
+
+def test_chunk_cache_index_survives_restart(tmp_path):
+    cache = TTSChunkCache(tmp_path / "cache", max_bytes=100)
+    cache.put("aa1", _blob(tmp_path, "blob", b"audio"))
+
+    reopened = TTSChunkCache(tmp_path / "cache", max_bytes=100)
+
+    assert reopened.get("aa1", tmp_path / "out") == 5
+    assert (tmp_path / "out").read_bytes() == b"audio"
+    assert reopened.total_bytes == 5
+
+
+async def test_regeneration_only_synthesizes_changed_paragraphs(tmp_path):
+    provider = RecordingProvider()
+    cache = TTSChunkCache(tmp_path / "cache", max_bytes=10 * 1024 ** 2)
+    pipeline = _pipeline(provider, tmp_path / "audio", cache=cache)
+    chapters = _chapters(3)
+
+    first = await pipeline.render_book(uuid4(), chapters)
+    assert first.cache.hits == 0
+    calls = provider.calls
+
+    chapters[1]["content"] = "A rewritten paragraph."
+    second = await pipeline.render_book(uuid4(), chapters)
+
+    # Only the rewritten body is new; titles and other chapters are reused
+    assert provider.calls - calls == 1
+    assert second.cache.misses == 1
+    assert second.cache.hit_ratio > 0.8
+    assert second.cache.bytes_saved > 0
+    assert second.total_duration <= first.total_duration
+
+
+def _write_tone(path, seconds, sample_rate=8000):
+    frames = int(seconds * sample_rate)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x01\x00" * frames)
+    return path
+
+
+def test_wav_assembly_memory_does_not_grow_with_length(tmp_path):
+    # 40 parts of 60 s each: ~38 MB of PCM in total
+    parts = [_write_tone(tmp_path / f"{i}.wav", 60) for i in range(40)]
+    dest = tmp_path / "chapter.wav"
+
+    tracemalloc.start()
+    try:
+        duration = concatenate_audio_files(parts, dest, "wav")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert duration == pytest.approx(40 * 60)
+    assert peak < 4 * COPY_BLOCK_BYTES
+
+
+def _mp3_frame(padding=0):
+    # MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417 bytes (+1 when padded)
+    header = bytes([0xFF, 0xFB, 0x90 | (padding << 1), 0x00])
+    return header + b"\x00" * (413 + padding)
+
+
+def test_mp3_assembly_uses_frame_headers(tmp_path):
+    id3 = b"ID3\x03\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10
+    xing = bytes([0xFF, 0xFB, 0x90, 0x00]) + b"\x00" * 32 + b"Xing" + b"\x00" * 377
+    first = _blob(tmp_path, "a.mp3", id3 + xing + _mp3_frame() * 50)
+    second = _blob(tmp_path, "b.mp3", (_mp3_frame() + _mp3_frame(padding=1)) * 25 + b"TAG" + b"\x00" * 125)
+    dest = tmp_path / "chapter.mp3"
+
+    duration = concatenate_audio_files([first, second], dest, "mp3")
+
+    assert duration == pytest.approx(100 * 1152 / 44100)
+    assert mp3_duration(dest) == pytest.approx(duration)
+    # Only audio frames are copied; tags and the Xing frame are dropped
+    assert dest.stat().st_size == 75 * 417 + 25 * 418
+
+
+def test_pipeline_rejects_formats_it_cannot_stream(tmp_path):
+    with pytest.raises(ValueError):
+        _pipeline(RecordingProvider(), tmp_path, audio_format="opus")
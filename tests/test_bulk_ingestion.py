@@ -0,0 +1,71 @@
+from uuid import uuid4
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from app.db.session import get_async_session
+from app.main import app
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.template import Template
+from app.services.questionnaire_service import QuestionnaireService
+from app.services.template_service import TemplateService
+
+
+async def test_bulk_create_templates_batches_and_reports_errors(db_session, test_template):
+    payloads = [test_template] * 5 + [{"title": "missing sections"}] + [test_template] * 2
+
+    result = await TemplateService(db_session).bulk_create_templates(payloads, batch_size=3)
+
+    assert len(result.created) == 7
+    assert [e.index for e in result.errors] == [5]
+    assert result.errors[0].errors[0]['loc'] == ('sections',)
+    count = await db_session.scalar(select(func.count()).select_from(Template))
+    assert count == 7
+
+
+async def test_bulk_create_templates_atomic_inserts_nothing_on_error(db_session, test_template):
+    payloads = [test_template, {"title": 1}]
+
+    result = await TemplateService(db_session).bulk_create_templates(payloads, atomic=True)
+
+    assert result.created == []
+    assert len(result.errors) == 1
+    count = await db_session.scalar(select(func.count()).select_from(Template))
+    assert count == 0
+
+
+async def test_bulk_create_responses_checks_templates_once(db_session, test_template):
+    templates = await TemplateService(db_session).bulk_create_templates([test_template])
+    template_id = templates.created[0].id
+    payloads = [
+        {"template_id": str(template_id), "responses": {"q1": "a"}},
+        {"template_id": str(uuid4()), "responses": {"q1": "b"}},
+        {"template_id": str(template_id)},
+        {"template_id": str(template_id), "responses": {"q1": "c"}},
+    ]
+
+    result = await QuestionnaireService(db_session).bulk_create_responses(payloads)
+
+    assert [r.responses for r in result.created] == [{"q1": "a"}, {"q1": "c"}]
+    assert [e.index for e in result.errors] == [1, 2]
+    assert result.errors[0].errors[0]['type'] == 'not_found'
+    count = await db_session.scalar(select(func.count()).select_from(QuestionnaireResponse))
+    assert count == 2
+
+
+async def test_bulk_templates_endpoint(db_session, test_template):
+    async def override_session():
+        yield db_session
+
+    app.dependency_overrides[get_async_session] = override_session
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/api/templates/bulk",
+                json=[test_template, {"title": "bad"}, "not an object", 42]
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data['created']) == 1
+    assert [e["index"] for e in data["errors"]] == [1, 2, 3]
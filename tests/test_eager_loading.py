@@ -0,0 +1,99 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.instrumentation import InstrumentationMiddleware, QueryBudgetExceeded, count_queries
+from app.db.session import get_async_session
+from app.main import app
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.template import Template
+from app.schemas.questionnaire import ResponseQuery
+from app.services.questionnaire_service import QuestionnaireService
+from app.services.response_validator import ResponseValidators
+
+
+async def _seed(db_session, templates: int = 3, per_template: int = 10):
+    rows = [Template(title=f"Template {i}", sections=[{"title": "Life", "questions": []}]) for i in range(templates)]
+    db_session.add_all(rows)
+    await db_session.flush()
+    db_session.add_all([
+        QuestionnaireResponse(template_id=template.id, responses={"n": n})
+        for template in rows for n in range(per_template)
+    ])
+    await db_session.commit()
+    db_session.expunge_all()
+    return rows
+
+
+def _service(db_session):
+    return QuestionnaireService(db_session, validators=ResponseValidators())
+
+
+async def test_search_with_templates_takes_two_queries_for_any_page_size(db_session):
+    templates = await _seed(db_session)
+
+    with count_queries() as timings:
+        page = await _service(db_session).search_responses(ResponseQuery(), include_template=True)
+
+    assert len(page.items) == 30
+    assert timings.db_queries == 2
+    assert {item.template.title for item in page.items} == {t.title for t in templates}
+    assert all(item.template.id == item.template_id for item in page.items)
+
+
+async def test_unloaded_relationship_raises_instead_of_querying(db_session):
+    await _seed(db_session, templates=1, per_template=1)
+
+    response = (await db_session.execute(select(QuestionnaireResponse))).scalar_one()
+    with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+        response.template
+
+
+async def test_get_response_joins_its_template(db_engine, db_session):
+    await _seed(db_session, templates=1, per_template=1)
+    response_id = (await db_session.execute(select(QuestionnaireResponse.id))).scalar_one()
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            plain = await client.get(f"/api/questionnaires/{response_id}")
+            detailed = await client.get(f"/api/questionnaires/{response_id}?include_template=true")
+            missing = await client.get("/api/questionnaires/00000000-0000-0000-0000-000000000000")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert plain.status_code == 200 and "template" not in plain.json()
+    assert detailed.json()["template"]["title"] == "Template 0"
+    assert 'desc="1 queries"' in detailed.headers["server-timing"]
+    assert missing.status_code == 404
+
+
+async def test_query_budget_fails_requests_with_n_plus_one(db_engine, db_session, monkeypatch):
+    await _seed(db_session, templates=1, per_template=5)
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_PER_REQUEST", 3)
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    demo = FastAPI()
+    demo.add_middleware(InstrumentationMiddleware)
+
+    @demo.get("/titles")
+    async def titles():
+        async with session_factory() as session:
+            responses = (await session.execute(select(QuestionnaireResponse))).scalars().all()
+            # One query per row: the pattern the budget exists to catch
+            return [
+                (await session.execute(select(Template.title).where(Template.id == r.template_id))).scalar_one()
+                for r in responses
+            ]
+
+    async with httpx.AsyncClient(app=demo, base_url="http://test") as client:
+        with pytest.raises(QueryBudgetExceeded, match=r"GET /titles issued 6 queries, budget is 3; most repeated \(5x\)"):
+            await client.get("/titles")
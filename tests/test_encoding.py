@@ -0,0 +1,109 @@
+import asyncio
+import os
+import shutil
+import time
+import wave
+import pytest
+from uuid import uuid4
+from app.services.audio_service import AudioGenerationPipeline
+from app.services import encoding as encoding_module
+from app.services.encoding import EncodingError, EncodingExecutor, assemble_chapter, get_encoding_executor
+from app.services.tts_providers import StubTTSProvider
+from app.utils.audio_processing import mp3_duration
+from app.utils.loudness import LoudnessNormalizer
+
+
+@pytest.fixture
+def executor():
+    executor = EncodingExecutor(max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+def _write_tone(path, seconds, amplitude=3000, sample_rate=8000):
+    frames = int(seconds * sample_rate)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"".join(
+            (amplitude if (i // 20) % 2 else -amplitude).to_bytes(2, "little", signed=True)
+            for i in range(frames)
+        ))
+    return path
+
+
+async def test_stats_report_queue_depth(executor):
+    jobs = [asyncio.create_task(executor.run(time.sleep, 0.2)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert executor.stats() == {
+        'workers': 1, 'pending': 3, 'running': 1, 'queued': 2, 'completed': 0, 'failed': 0
+    }
+    await asyncio.gather(*jobs)
+    assert executor.stats()['completed'] == 3
+    assert executor.stats()['pending'] == 0
+
+
+async def test_chapters_are_assembled_in_a_worker_process(executor, tmp_path):
+    parts = [_write_tone(tmp_path / f"{n}.wav", 1.0) for n in range(3)]
+
+    duration = await executor.run(
+        assemble_chapter, parts, tmp_path / "chapter.wav", "wav", LoudnessNormalizer()
+    )
+
+    assert duration == pytest.approx(3.0, abs=0.01)
+    assert await executor.run(os.getpid) != os.getpid()
+
+
+async def test_dead_worker_fails_the_job_and_the_pool_recovers(executor):
+    with pytest.raises(EncodingError) as failure:
+        await executor.run(os._exit, 1)
+    assert failure.value.retryable
+
+    assert await executor.run(abs, -3) == 3
+    assert executor.stats()['failed'] == 1
+
+
+@pytest.mark.parametrize("cores, job_processes, expected", [(8, 2, 4), (8, 3, 2), (2, 4, 1), (4, 0, 4)])
+def test_default_pool_shares_cores_between_job_worker_processes(monkeypatch, cores, job_processes, expected):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "AUDIO_ENCODE_WORKERS", 0)
+    monkeypatch.setattr(settings, "JOB_WORKER_PROCESSES", job_processes)
+    monkeypatch.setattr(encoding_module, "available_cores", lambda: cores)
+    monkeypatch.setattr(encoding_module, "_encoding_executor", None)
+
+    assert get_encoding_executor().max_workers == expected
+
+    monkeypatch.setattr(settings, "AUDIO_ENCODE_WORKERS", 3)
+    monkeypatch.setattr(encoding_module, "_encoding_executor", None)
+    assert get_encoding_executor().max_workers == 3
+
+
+async def test_pipeline_assembles_chapters_through_the_executor(executor, tmp_path):
+    pipeline = AudioGenerationPipeline(StubTTSProvider(sample_rate=8000), tmp_path, executor=executor)
+    chapters = [{'title': f"Chapter {n}", 'content': "Some words. More words."} for n in range(3)]
+
+    result = await pipeline.render_book(uuid4(), chapters)
+
+    assert executor.stats()['completed'] == 3
+    assert all(c.duration_seconds > 0 for c in result.chapter_files)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is not None, reason="ffmpeg is installed")
+def test_encoding_requires_ffmpeg(tmp_path):
+    with pytest.raises(ValueError, match="ffmpeg"):
+        AudioGenerationPipeline(StubTTSProvider(), tmp_path, encode_format="mp3")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+async def test_chapters_are_encoded_to_mp3(executor, tmp_path):
+    pipeline = AudioGenerationPipeline(
+        StubTTSProvider(sample_rate=8000), tmp_path, executor=executor, encode_format="mp3"
+    )
+
+    result = await pipeline.render_book(uuid4(), [{'title': "One", 'content': "Some words."}])
+
+    chapter = result.chapter_files[0]
+    assert chapter.path.endswith(".mp3")
+    assert mp3_duration(tmp_path / chapter.path) == pytest.approx(chapter.duration_seconds, abs=0.2)
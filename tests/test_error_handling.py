@@ -1,3 +1,5 @@
+import asyncio
+import uuid
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -128,8 +130,10 @@ def test_unexpected_exception_handling(test_app):
     import uuid
     assert uuid.UUID(error_data['request_id'])
 
-def test_detailed_exception_with_internal_error(test_app):
-    """Test DetailedHTTPException with an internal error"""
+def test_detailed_exception_with_internal_error(test_app, monkeypatch):
+    """Test DetailedHTTPException with an internal error (tracebacks opted in)"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "EXPOSE_ERROR_TRACEBACKS", True)
     internal_error = RuntimeError("Original internal error")
     
     @test_app.get("/test/internal-error")
@@ -196,3 +200,150 @@ def test_unhandled_error():
     assert response.status_code == 500
     assert data.get('status') == 'error'
     assert 'request_id' in data
+
+def test_client_errors_do_not_build_traceback():
+    """4xx errors skip the traceback/trace construction entirely"""
+    try:
+        raise KeyError("missing")
+    except KeyError as ke:
+        exception = DetailedHTTPException(
+            status_code=404,
+            detail="Not found",
+            internal_error=ke
+        )
+
+    assert exception._error_trace is None
+    assert exception.error_trace['error_type'] == 'KeyError'
+
+def test_api_errors_reexports_core_exception():
+    """app.api.errors and app.core.errors expose the same class"""
+    from app.api.errors import DetailedHTTPException as ApiDetailedHTTPException
+    assert ApiDetailedHTTPException is DetailedHTTPException
+
+def test_error_sampler_limits_identical_errors():
+    """Repeated identical errors are logged at most max_per_window times"""
+    from app.core.errors import ErrorSampler
+    now = [0.0]
+    sampler = ErrorSampler(max_per_window=2, window_seconds=10, clock=lambda: now[0])
+
+    decisions = [sampler.should_log("same")[0] for _ in range(5)]
+    assert decisions == [True, True, False, False, False]
+    assert sampler.should_log("other") == (True, 0)
+
+    now[0] = 11
+    assert sampler.should_log("same") == (True, 3)
+
+def _get_scope(path):
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+
+async def _run_streaming_app(asgi_app, path):
+    """
+    Drive a streaming endpoint; return the body chunks and, for every chunk
+    the endpoint produced, how many chunks had already reached the client
+    """
+    from fastapi.responses import StreamingResponse
+
+    sent = []
+    delivered_before = []
+
+    async def body():
+        for i in range(3):
+            delivered_before.append(len(sent))
+            yield f"chunk{i};".encode()
+            # Give a buffering middleware the chance to run ahead
+            await asyncio.sleep(0)
+
+    asgi_app.router.add_route(path, lambda request: StreamingResponse(body()), methods=["GET"])
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Client stays connected until the response completes
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            sent.append(message["body"])
+
+    await asgi_app(_get_scope(path), receive, send)
+    return sent, delivered_before
+
+async def test_streaming_response_is_not_buffered_by_middleware():
+    """Each chunk reaches the client before the endpoint produces the next one"""
+    sent, delivered_before = await _run_streaming_app(app, "/test/stream")
+
+    assert sent == [b"chunk0;", b"chunk1;", b"chunk2;"]
+    assert delivered_before == [0, 1, 2]
+
+async def test_error_after_response_start_is_reraised_without_logging(monkeypatch):
+    """Errors mid-stream are left to the server's error middleware to log"""
+    from fastapi.responses import StreamingResponse
+    from app.api import middleware
+    logged = []
+    monkeypatch.setattr(middleware.logger, "exception", lambda *a, **k: logged.append(a))
+
+    async def body():
+        yield b"partial"
+        raise RuntimeError("mid-stream failure")
+
+    async def endpoint(scope, receive, send):
+        await StreamingResponse(body())(scope, receive, send)
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    with pytest.raises(RuntimeError):
+        await middleware.ErrorHandlerMiddleware(endpoint)(_get_scope("/"), receive, send)
+    assert logged == []
+
+def test_internal_error_details_not_exposed_by_default(test_app):
+    """Without EXPOSE_ERROR_TRACEBACKS the internal error never reaches the client"""
+    @test_app.get("/test/internal-error-hidden")
+    async def test_internal_error_hidden():
+        raise DetailedHTTPException(
+            status_code=500,
+            detail="Something failed",
+            internal_error=RuntimeError("password=hunter2 host=db.internal")
+        )
+
+    response = TestClient(test_app).get("/test/internal-error-hidden")
+
+    assert response.status_code == 500
+    assert 'traceback' not in response.json()
+    assert "hunter2" not in response.text
+
+def test_request_id_is_generated_lazily():
+    """The uuid is only generated when request_id is read"""
+    exception = DetailedHTTPException(status_code=404, detail="Not found")
+    assert exception._request_id is None
+    assert uuid.UUID(exception.request_id)
+    assert exception.request_id == exception.request_id
+
+def test_errors_with_interpolated_details_share_a_sample_key(monkeypatch):
+    """Sampling keys on error type and call site, not the formatted detail"""
+    from app.core import errors
+    keys = []
+    monkeypatch.setattr(errors.error_sampler, "should_log", lambda key: (keys.append(key), (False, 0))[1])
+
+    for _ in range(3):
+        template_id = uuid.uuid4()
+        DetailedHTTPException(
+            status_code=404,
+            detail=f"Template {template_id} not found",
+            internal_error=LookupError(str(template_id))
+        )
+
+    assert len(keys) == 3
+    assert len(set(keys)) == 1
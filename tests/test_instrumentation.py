@@ -0,0 +1,88 @@
+import re
+import httpx
+import pytest
+from pydantic import SecretStr
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.instrumentation import Histogram, instrument_engine, request_db_queries, reset_metrics
+from app.db.session import get_async_session
+from app.services.template_cache import get_template_cache
+from app.main import app
+
+
+@pytest.fixture
+async def client(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", SecretStr("metrics-token"))
+    instrument_engine(db_engine.sync_engine)
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    reset_metrics()
+    app.dependency_overrides[get_async_session] = override_session
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    reset_metrics()
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.1, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(3.0, "/a")
+
+    assert histogram.render() == [
+        "# HELP demo_seconds Demo",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a",le="0.1"} 2',
+        'demo_seconds_bucket{route="/a",le="1.0"} 3',
+        'demo_seconds_bucket{route="/a",le="+Inf"} 4',
+        'demo_seconds_sum{route="/a"} 3.65',
+        'demo_seconds_count{route="/a"} 4',
+    ]
+    assert histogram.samples("/a") == (4, 3.65)
+    assert histogram.samples("/b") == (0, 0.0)
+
+
+async def test_server_timing_reports_db_and_validation(client, test_template):
+    created = await client.post("/api/templates/", json=test_template)
+    assert created.status_code == 201
+
+    # Served from the template cache: no queries
+    cached = await client.get(f"/api/templates/{created.json()['id']}")
+    assert re.fullmatch(
+        r'app;dur=[\d.]+, db;dur=[\d.]+;desc="0 queries", validate;dur=[\d.]+',
+        cached.headers["server-timing"]
+    )
+
+    get_template_cache().clear()
+    response = await client.get(f"/api/templates/{created.json()['id']}")
+    assert response.status_code == 200
+    queries = re.search(r'desc="(\d+) queries"', response.headers["server-timing"])
+    assert int(queries.group(1)) >= 1
+
+
+async def test_metrics_labels_by_route_template(client, test_template):
+    created = await client.post("/api/templates/", json=test_template)
+    await client.get(f"/api/templates/{created.json()['id']}")
+    await client.get("/no/such/path")
+
+    response = await client.get("/metrics", headers={"X-Internal-Token": "metrics-token"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/templates/{template_id}",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/templates/",status="201"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in body
+    assert "# TYPE http_request_validation_seconds histogram" in body
+    count, queries = request_db_queries.samples("POST", "/api/templates/")
+    assert count == 1 and queries >= 1
+
+
+async def test_metrics_require_internal_token(client):
+    assert (await client.get("/metrics")).status_code == 401
@@ -0,0 +1,277 @@
+import asyncio
+import json
+from datetime import timedelta
+import pytest
+from uuid import UUID, uuid4
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.api.dependencies import get_job_event_broker, get_job_queue
+from app.api.routes import jobs as jobs_routes
+from app.db.base import Base
+from app.db.session import get_async_session
+from app.main import app
+from app.models.audiobook import Audiobook
+from app.models.job import Job
+from app.models.outline import BookOutline
+from app.services.audio_service import AudioGenerationPipeline
+from app.services.job_events import JobEventBroker
+from app.services.job_handlers import build_job_handlers
+from app.services.storage import LocalStorageBackend
+from app.services.job_queue import JobQueue
+from app.services.job_worker import JobWorker, PermanentJobError
+from app.services.tts_cache import TTSChunkCache
+from app.services.tts_providers import StubTTSProvider
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    # A file database, so the worker's heartbeat and the handler can hold
+    # separate connections like they would against Postgres
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def broker():
+    return JobEventBroker()
+
+
+@pytest.fixture
+def queue(session_factory, broker):
+    return JobQueue(session_factory, broker=broker, lease_seconds=30, retry_base_delay=0)
+
+
+async def _enqueue(queue, kind="noop", **kwargs):
+    async with queue.session_factory() as session:
+        return await queue.enqueue(session, kind, {}, **kwargs)
+
+
+async def test_enqueue_is_idempotent_per_key(queue):
+    first = await _enqueue(queue, idempotency_key="k1")
+    second = await _enqueue(queue, idempotency_key="k1")
+    other = await _enqueue(queue, idempotency_key="k2")
+
+    assert first.id == second.id
+    assert other.id != first.id
+
+
+async def test_a_job_is_claimed_by_one_worker(queue):
+    job = await _enqueue(queue)
+
+    claimed = await queue.claim("worker-a")
+
+    assert claimed.id == job.id
+    assert claimed.status == 'running'
+    assert claimed.attempts == 1
+    assert await queue.claim("worker-b") is None
+
+
+async def test_expired_lease_is_reclaimed_and_old_owner_is_fenced(queue):
+    queue.lease = timedelta(seconds=0.05)
+    job = await _enqueue(queue)
+    await queue.claim("worker-a")
+
+    await asyncio.sleep(0.1)
+    reclaimed = await queue.claim("worker-b")
+
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert await queue.heartbeat(job.id, "worker-a") is False
+    assert await queue.complete(job.id, "worker-a", {}) is False
+    assert await queue.complete(job.id, "worker-b", {'ok': True}) is True
+    assert (await queue.get(job.id)).result == {'ok': True}
+
+
+async def test_failed_attempts_are_retried_until_max_attempts(queue):
+    job = await _enqueue(queue, max_attempts=2)
+
+    await queue.claim("w")
+    await queue.fail(job.id, "w", "boom")
+    assert (await queue.get(job.id)).status == 'queued'
+
+    await queue.claim("w")
+    await queue.fail(job.id, "w", "boom again")
+    failed = await queue.get(job.id)
+    assert failed.status == 'failed'
+    assert failed.attempts == 2
+    assert await queue.claim("w") is None
+
+
+async def test_worker_pushes_progress_and_handles_permanent_errors(queue, broker):
+    async def steps(context):
+        for i in range(1, 4):
+            context.report(i / 3, f"step {i}")
+            await asyncio.sleep(0.02)
+        return {'steps': 3}
+
+    async def broken(context):
+        raise PermanentJobError("bad payload")
+
+    worker = JobWorker(
+        queue,
+        {'steps': steps, 'broken': broken},
+        heartbeat_interval=5,
+        progress_interval=0
+    )
+    job = await _enqueue(queue, kind='steps')
+    received = []
+    async with broker.subscribe(job.id) as updates:
+        assert await worker.run_once()
+        while not updates.empty():
+            received.append(updates.get_nowait())
+
+    assert received[-1].status == 'succeeded'
+    assert any(e.message == "step 2" for e in received)
+    assert (await queue.get(job.id)).result == {'steps': 3}
+
+    broken_job = await _enqueue(queue, kind='broken', max_attempts=5)
+    await worker.run_once()
+    assert (await queue.get(broken_job.id)).status == 'failed'
+    assert await worker.run_once() is False
+
+
+async def test_audiobook_job_end_to_end_with_sse(queue, broker, session_factory, tmp_path):
+    async with session_factory() as session:
+        outline = BookOutline(
+            chapters=[{"title": f"Chapter {i}", "content": "Words."} for i in range(3)],
+            status='approved'
+        )
+        session.add(outline)
+        await session.commit()
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    app.dependency_overrides[get_job_event_broker] = lambda: broker
+    # One chunk at a time, so chapters finish (and report) one by one
+    pipeline = AudioGenerationPipeline(
+        StubTTSProvider(sample_rate=8000, latency_seconds=0.02),
+        tmp_path / "audio",
+        max_concurrency_per_book=1,
+        cache=TTSChunkCache(tmp_path / "cache", max_bytes=10 * 1024 ** 2)
+    )
+    worker = JobWorker(
+        queue,
+        build_job_handlers(
+            session_factory, pipeline=pipeline, storage=LocalStorageBackend(tmp_path / "audio")
+        ),
+        progress_interval=0
+    )
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/api/audiobooks/",
+                json={"outline_id": str(outline.id)},
+                headers={"Idempotency-Key": "abc"}
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+            retried = await client.post(
+                "/api/audiobooks/",
+                json={"outline_id": str(outline.id)},
+                headers={"Idempotency-Key": "abc"}
+            )
+            assert retried.json()["id"] == job_id
+
+            # The stream stays open until the worker finishes the job
+            stream = asyncio.create_task(client.get(f"/api/jobs/{job_id}/events"))
+            await asyncio.sleep(0.05)
+            assert await worker.run_once()
+            body = (await asyncio.wait_for(stream, 5)).text
+
+            job = (await client.get(f"/api/jobs/{job_id}")).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    events = [json.loads(line[6:]) for line in body.splitlines() if line.startswith("data: ")]
+    assert events[0]["status"] == 'queued'
+    assert any(0 < e["progress"] < 1 for e in events)
+    assert events[-1]["status"] == 'succeeded'
+    assert job["status"] == 'succeeded'
+    assert job["result"]["cache"]["misses"] > 0
+    assert job["result"]["cache"]["hit_ratio"] == 0.0
+    async with session_factory() as session:
+        audiobook = await session.get(Audiobook, UUID(job["result"]["audiobook_id"]))
+    assert audiobook.status == 'completed'
+    assert len(audiobook.chapter_files) == 3
+
+
+async def test_event_stream_ends_when_job_is_deleted(queue, broker, session_factory, monkeypatch):
+    monkeypatch.setattr(jobs_routes, "SSE_KEEPALIVE_SECONDS", 0.02)
+    job = await _enqueue(queue)
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    app.dependency_overrides[get_job_event_broker] = lambda: broker
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            stream = asyncio.create_task(client.get(f"/api/jobs/{job.id}/events"))
+            await asyncio.sleep(0.05)
+            async with session_factory() as session:
+                await session.execute(delete(Job).where(Job.id == job.id))
+                await session.commit()
+            body = (await asyncio.wait_for(stream, 5)).text
+    finally:
+        app.dependency_overrides.clear()
+
+    assert body.startswith("event: progress\n")
+    assert body.endswith(f'event: deleted\ndata: {{"job_id": "{job.id}"}}\n\n')
+
+
+class FakeListenerConnection:
+    def __init__(self):
+        self.on_terminate = None
+
+    async def add_listener(self, channel, callback):
+        pass
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def close(self):
+        self.on_terminate(self)
+
+
+async def _wait_until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+async def test_listener_reconnects_with_backoff(monkeypatch):
+    import asyncpg
+    attempts = []
+
+    async def connect(dsn):
+        attempts.append(dsn)
+        if len(attempts) <= 2:
+            raise OSError("connection refused")
+        return FakeListenerConnection()
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    broker = JobEventBroker("postgresql://db/app", reconnect_base_delay=0.01, reconnect_max_delay=0.02)
+
+    # A failed first connect doesn't fail the subscription; it retries behind it
+    async with broker.subscribe(uuid4()):
+        assert not broker.listening
+        await _wait_until(lambda: broker.listening)
+    assert len(attempts) == 3
+
+    # A dropped connection is reopened
+    broker._listener.on_terminate(broker._listener)
+    assert not broker.listening
+    await _wait_until(lambda: broker.listening)
+    assert len(attempts) == 4
+
+    await broker.close()
+    await asyncio.sleep(0.03)
+    assert not broker.listening
+    assert len(attempts) == 4
@@ -0,0 +1,107 @@
+import json
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.api.middleware import CompressionMiddleware, _accepted_encodings
+from app.api.responses import ModelJSONResponse
+from app.core.config import settings
+from app.db.session import get_async_session
+from app.main import app
+from app.schemas.template import TemplateResponse
+
+
+def _large_template(test_template):
+    questions = [{"id": f"q{i}", "text": "Tell us about it " * 10, "type": "text"} for i in range(100)]
+    return {**test_template, "sections": [{"title": "Story", "questions": questions}]}
+
+
+@pytest.fixture
+async def client(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def test_model_json_response_matches_fastapi_encoding(test_template):
+    template = TemplateResponse(
+        id="00000000-0000-0000-0000-000000000001",
+        created_at="2026-01-01T00:00:00Z",
+        updated_at="2026-01-01T00:00:00Z",
+        **test_template
+    )
+
+    assert json.loads(ModelJSONResponse(template).body) == jsonable_encoder(template)
+    assert json.loads(ModelJSONResponse({"items": [template]}).body) == {"items": [jsonable_encoder(template)]}
+
+
+async def test_large_list_is_gzipped_when_accepted(client, test_template):
+    for _ in range(3):
+        assert (await client.post("/api/templates/", json=_large_template(test_template))).status_code == 201
+
+    plain = await client.get("/api/templates/", headers={"Accept-Encoding": "identity"})
+    compressed = await client.get("/api/templates/", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert int(compressed.headers["content-length"]) < len(plain.content) / 5
+    assert compressed.json() == plain.json()
+    assert len(plain.json()["items"]) == 3
+
+
+async def test_small_json_is_not_compressed(client):
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"status": "healthy"}
+
+
+async def test_only_single_message_json_bodies_are_compressed(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_COMPRESSION_MIN_BYTES", 10)
+    inner = FastAPI()
+    big = "x" * 10_000
+
+    @inner.get("/text")
+    async def text():
+        return PlainTextResponse(big)
+
+    @inner.get("/stream")
+    async def stream():
+        async def body():
+            yield b'{"a": "' + big.encode()
+            yield b'"}'
+        return StreamingResponse(body(), media_type="application/json")
+
+    @inner.get("/json")
+    async def as_json():
+        return ModelJSONResponse({"a": big})
+
+    transport = httpx.ASGITransport(app=CompressionMiddleware(inner))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Accept-Encoding": "gzip"}
+        text_response = await client.get("/text", headers=headers)
+        stream_response = await client.get("/stream", headers=headers)
+        json_response = await client.get("/json", headers=headers)
+
+    assert "content-encoding" not in text_response.headers
+    assert "content-encoding" not in stream_response.headers
+    assert stream_response.json() == {"a": big}
+    assert json_response.headers["content-encoding"] == "gzip"
+    assert json_response.json() == {"a": big}
+
+
+def test_accept_encoding_weights():
+    assert _accepted_encodings("gzip;q=0, br") == {"gzip": 0.0, "br": 1.0}
+    assert _accepted_encodings("deflate, gzip;q=0.5") == {"deflate": 1.0, "gzip": 0.5}
+    assert _accepted_encodings("") == {}
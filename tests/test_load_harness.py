@@ -0,0 +1,48 @@
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.db.session import get_async_session
+from app.main import app
+from benchmarks.load_test import SCENARIOS, percentile, run_suite
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+async def test_run_suite_reports_every_scenario_in_process(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            results = await run_suite(
+                client,
+                "asgi",
+                scenarios=list(SCENARIOS),
+                concurrency_levels=[1, 4],
+                requests=8,
+                seed=3
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [(r["scenario"], r["concurrency"]) for r in results] == [
+        (name, concurrency) for name in SCENARIOS for concurrency in (1, 4)
+    ]
+    for result in results:
+        assert result["mode"] == "asgi"
+        assert result["requests"] == 8
+        assert result["errors"] == 0, result
+        assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"] <= result["max_ms"]
+        assert result["rps"] > 0
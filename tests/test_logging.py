@@ -0,0 +1,93 @@
+import json
+import threading
+from loguru import logger
+from app.core.logging import QueuedJsonSink, RotatingFileTarget
+
+
+class MemoryTarget:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.chunks = []
+
+    def write(self, data):
+        if self.gate is not None:
+            self.gate.wait()
+        self.chunks.append(data)
+
+    def close(self):
+        pass
+
+    def lines(self):
+        return [json.loads(line) for line in b"".join(self.chunks).splitlines()]
+
+
+def _add_sink(sink):
+    return logger.add(sink, level="DEBUG", format="{message}", catch=False)
+
+
+def test_records_are_written_as_json_lines():
+    target = MemoryTarget()
+    sink = QueuedJsonSink([target], flush_interval=0.01)
+    handler_id = _add_sink(sink)
+    try:
+        logger.bind(request_id="abc").info("hello {}", "world")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        logger.remove(handler_id)
+
+    first, second = target.lines()
+    assert first["message"] == "hello world"
+    assert first["level"] == "INFO"
+    assert first["request_id"] == "abc"
+    assert "ValueError: boom" in second["exception"]
+    assert sink.stats()["written"] == 2
+
+
+def test_full_queue_drops_and_reports():
+    gate = threading.Event()
+    target = MemoryTarget(gate)
+    sink = QueuedJsonSink([target], max_queue_size=2, batch_size=1, flush_interval=0.01)
+    handler_id = _add_sink(sink)
+    try:
+        for i in range(50):
+            logger.info("message {}", i)
+        assert sink.dropped > 0
+    finally:
+        gate.set()
+        logger.remove(handler_id)
+
+    lines = target.lines()
+    warnings = [line for line in lines if line["level"] == "WARNING"]
+    assert warnings
+    assert warnings[-1]["extra"]["dropped_total"] == sink.dropped
+    assert sink.stats()["written"] + sink.dropped == 50
+
+
+def test_rotating_file_target_rotates_by_size(tmp_path):
+    target = RotatingFileTarget(tmp_path / "app.log", max_bytes=100, retention_days=1)
+    for _ in range(5):
+        target.write(b"x" * 60 + b"\n")
+    target.close()
+
+    rotated = list(tmp_path.glob("app.*.log"))
+    assert len(rotated) == 4
+    assert (tmp_path / "app.log").stat().st_size == 61
+
+
+def test_unencodable_record_does_not_kill_writer():
+    target = MemoryTarget()
+    sink = QueuedJsonSink([target], flush_interval=0.01)
+    handler_id = _add_sink(sink)
+    try:
+        logger.bind(big=2**70).info("huge int")
+        logger.info("after")
+    finally:
+        logger.remove(handler_id)
+
+    lines = target.lines()
+    assert [line["message"] for line in lines] == ["huge int", "after"]
+    assert lines[0]["extra"]["big"] == 2**70
+    assert sink.stats()["written"] == 2
@@ -0,0 +1,79 @@
+import math
+import wave
+import numpy as np
+from uuid import uuid4
+from app.services.audio_service import AudioGenerationPipeline
+from app.services.tts_providers import StubTTSProvider
+from app.utils.audio_processing import concatenate_audio_files
+from app.utils.loudness import LoudnessNormalizer
+
+RATE = 8000
+
+
+def _write(path, *segments):
+    """segments: (seconds, amplitude) pairs of 220 Hz tone; amplitude 0 is silence"""
+    pieces = []
+    for seconds, amplitude in segments:
+        t = np.arange(int(seconds * RATE)) / RATE
+        pieces.append(amplitude * np.sin(2 * np.pi * 220 * t))
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(np.concatenate(pieces).astype("<i2").tobytes())
+    return path
+
+
+def _read(path):
+    with wave.open(str(path), "rb") as wav:
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float64) / 32768
+
+
+def _rms_db(samples):
+    return 10 * math.log10(np.mean(np.square(samples)))
+
+
+def test_chunks_are_leveled_and_trimmed(tmp_path):
+    quiet = _write(tmp_path / "quiet.wav", (1.0, 0), (2.0, 500), (1.5, 0))
+    loud = _write(tmp_path / "loud.wav", (0.5, 0), (3.0, 12000), (1.0, 0))
+    dest = tmp_path / "chapter.wav"
+
+    duration = concatenate_audio_files([quiet, loud], dest, "wav", LoudnessNormalizer(target_db=-20))
+
+    # Each chunk keeps 0.25 s of its silence at either end
+    assert math.isclose(duration, 2.0 + 3.0 + 4 * 0.25, abs_tol=0.2)
+    samples = _read(dest)
+    first, second = samples[int(0.3 * RATE):int(2.2 * RATE)], samples[int(2.8 * RATE):int(5.6 * RATE)]
+    assert abs(_rms_db(first) - -20) < 0.5
+    assert abs(_rms_db(second) - -20) < 0.5
+
+
+def test_gain_is_capped_by_peak_and_max_gain(tmp_path):
+    normalizer = LoudnessNormalizer(target_db=0, max_gain_db=12)
+    near_full = _write(tmp_path / "near_full.wav", (1.0, 20000))
+    faint = _write(tmp_path / "faint.wav", (1.0, 50))
+
+    assert 20000 / 32768 * normalizer.gain_for(normalizer.measure(near_full)) <= 10 ** (-1 / 20) + 1e-9
+    assert math.isclose(normalizer.gain_for(normalizer.measure(faint)), 10 ** (12 / 20))
+
+
+def test_silent_chunk_passes_through_unchanged(tmp_path):
+    silent = _write(tmp_path / "silent.wav", (1.0, 0))
+    stats = LoudnessNormalizer().measure(silent)
+
+    assert stats.loudness_db == -math.inf
+    assert (stats.start_frame, stats.end_frame) == (0, RATE)
+    assert LoudnessNormalizer().gain_for(stats) == 1.0
+
+
+async def test_pipeline_normalizes_chapters_and_fingerprints_the_settings(tmp_path):
+    provider = StubTTSProvider(sample_rate=RATE, seconds_per_char=0.01)
+    chapter = {'title': "One", 'content': "A sentence. Another sentence."}
+    plain = AudioGenerationPipeline(provider, tmp_path)
+    leveled = AudioGenerationPipeline(provider, tmp_path, normalizer=LoudnessNormalizer(target_db=-20))
+
+    result = await leveled.render_book(uuid4(), [chapter])
+
+    samples = _read(tmp_path / result.chapter_files[0].path)
+    assert abs(_rms_db(samples) - -20) < 1.0
+    assert plain.render_fingerprint(chapter) != leveled.render_fingerprint(chapter)
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from uuid import UUID, uuid4
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.api.dependencies import get_job_queue
+from app.db.session import get_async_session
+from app.main import app
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.template import Template
+from app.services.ai_service import OutlineGenerator, OutlineService
+from app.services.job_queue import JobQueue
+from app.services.llm_providers import FakeLLMProvider, LLMCompletion
+from app.utils.ai_prompts import build_outline_messages
+from app.utils.rate_limit import TokenRateLimiter
+
+
+class CountingProvider(FakeLLMProvider):
+    """Fake provider tracking peak concurrency; can return bad replies first"""
+
+    def __init__(self, latency_seconds=0.0, bad_replies=0):
+        super().__init__(latency_seconds=latency_seconds, chapters=3)
+        self.in_flight = 0
+        self.peak = 0
+        self.bad_replies = bad_replies
+
+    async def complete(self, messages, model, max_tokens):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            completion = await super().complete(messages, model, max_tokens)
+            if self.bad_replies:
+                self.bad_replies -= 1
+                return LLMCompletion("not json", 10, 2)
+            return completion
+        finally:
+            self.in_flight -= 1
+
+
+def _generator(provider, **limits):
+    limits.setdefault("max_in_flight", 16)
+    return OutlineGenerator(provider, TokenRateLimiter(**limits), retry_base_delay=0.001)
+
+
+def _messages(answer="Paris"):
+    return build_outline_messages("Memoir", [], {"q1": answer})
+
+
+async def test_limiter_waits_for_token_budget():
+    # 6000 tokens/minute refills 100 tokens per second
+    limiter = TokenRateLimiter(tokens_per_minute=6000)
+    async with limiter.reserve(6000):
+        pass
+
+    start = time.perf_counter()
+    async with limiter.reserve(10):
+        pass
+
+    assert time.perf_counter() - start >= 0.08
+
+
+async def test_limiter_refunds_unused_tokens():
+    limiter = TokenRateLimiter(tokens_per_minute=6000)
+    async with limiter.reserve(6000) as reservation:
+        reservation.settle(100)
+
+    start = time.perf_counter()
+    async with limiter.reserve(5000):
+        pass
+
+    assert time.perf_counter() - start < 0.05
+
+
+async def test_in_flight_calls_are_capped():
+    provider = CountingProvider(latency_seconds=0.01)
+    generator = _generator(provider, max_in_flight=4)
+
+    await asyncio.gather(*(generator.generate(_messages(str(i))) for i in range(20)))
+
+    assert provider.peak == 4
+    assert provider.calls == 20
+
+
+async def test_identical_prompts_are_memoized():
+    provider = CountingProvider(latency_seconds=0.01)
+    generator = _generator(provider)
+
+    results = await asyncio.gather(*(generator.generate(_messages()) for _ in range(10)))
+    again = await generator.generate(_messages())
+
+    assert provider.calls == 1
+    assert generator.coalesced == 9
+    assert all(r == again for r in results)
+    assert len(again) == 3
+
+
+async def test_cancelling_the_first_caller_leaves_coalesced_callers_running():
+    provider = CountingProvider(latency_seconds=0.05)
+    generator = _generator(provider)
+
+    first = asyncio.create_task(generator.generate(_messages()))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(generator.generate(_messages()))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert len(await second) == 3
+    assert first.cancelled()
+    assert provider.calls == 1
+
+    # With every caller gone, the completion itself is cancelled
+    alone = asyncio.create_task(generator.generate(_messages("other")))
+    await asyncio.sleep(0.01)
+    alone.cancel()
+    await asyncio.sleep(0.06)
+    assert generator.stats()['cache']['size'] == 1
+    assert generator._in_flight == {}
+
+
+async def test_unparseable_replies_are_retried():
+    provider = CountingProvider(bad_replies=2)
+    generator = _generator(provider)
+
+    chapters = await generator.generate(_messages())
+
+    assert len(chapters) == 3
+    assert provider.calls == 3
+
+
+async def _responses(db_session, count):
+    template = Template(title="Memoir", sections=[{"title": "Life", "questions": []}])
+    db_session.add(template)
+    await db_session.flush()
+    rows = [
+        QuestionnaireResponse(template_id=template.id, responses={"q1": f"answer {i}"})
+        for i in range(count)
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+    return [r.id for r in rows]
+
+
+async def test_generate_outlines_writes_batches_and_skips_done_responses(db_session):
+    ids = await _responses(db_session, 7)
+    missing = uuid4()
+    progress = []
+    service = OutlineService(db_session, generator=_generator(CountingProvider()))
+
+    result = await service.generate_outlines(
+        ids + [missing],
+        write_batch_size=3,
+        on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert len(result.created) == 7
+    assert {o.questionnaire_id for o in result.created} == set(ids)
+    assert [e.index for e in result.errors] == [7]
+    assert result.errors[0].errors[0]['type'] == 'not_found'
+    assert progress[-1] == (7, 7)
+    response = await db_session.get(QuestionnaireResponse, ids[0])
+    await db_session.refresh(response)
+    assert response.status == 'completed'
+
+    rerun = await service.generate_outlines(ids)
+    assert rerun.created == []
+    assert set(rerun.skipped) == set(ids)
+
+
+async def test_generate_endpoint_enqueues_one_job(db_engine, db_session):
+    ids = await _responses(db_session, 2)
+    queue = JobQueue(sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False))
+
+    async def override_session():
+        yield db_session
+
+    app.dependency_overrides[get_async_session] = override_session
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/api/outlines/generate",
+                json={"questionnaire_ids": [str(i) for i in ids]}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 202
+    job = await queue.get(UUID(response.json()["id"]))
+    assert job.kind == 'outlines'
+    assert job.payload == {'questionnaire_ids': [str(i) for i in ids]}
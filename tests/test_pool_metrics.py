@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, PoolMetrics
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = PoolMetrics()
+    monkeypatch.setattr(InstrumentedAsyncAdaptedQueuePool, 'metrics', metrics)
+    return metrics
+
+
+async def test_checkouts_and_pool_state_are_reported(metrics, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=2,
+        max_overflow=0
+    )
+    try:
+        async with engine.connect() as conn:
+            snapshot = metrics.snapshot(engine.pool)
+            assert snapshot['checked_out'] == 1
+            assert snapshot['size'] == 2
+        async with engine.connect():
+            pass
+    finally:
+        await engine.dispose()
+
+    snapshot = metrics.snapshot()
+    assert snapshot['checkouts'] == 2
+    assert snapshot['timeouts'] == 0
+    assert snapshot['wait_seconds_max'] >= snapshot['wait_seconds_avg'] >= 0
+
+
+async def test_pool_timeout_is_counted(metrics, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    try:
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    assert metrics.timeouts == 1
+    assert metrics.checkouts == 1
+
+
+async def test_internal_endpoints_require_token(monkeypatch):
+    from httpx import AsyncClient
+    from pydantic import SecretStr
+    from app.core.config import settings
+    from app.main import app
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+        assert (await client.get("/internal/db/pool")).status_code == 404
+
+        monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", SecretStr("s3cret"))
+        assert (await client.get("/internal/db/pool")).status_code == 401
+        response = await client.get("/internal/db/pool", headers={"X-Internal-Token": "s3cret"})
+        assert response.status_code == 200
+        assert "checked_out" in response.json()
@@ -0,0 +1,160 @@
+import httpx
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import StatementError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db import session as db_session_module
+from app.db.base import Base
+from app.db.session import ReplicaSet, get_async_session
+from app.main import app
+from app.models.template import Template
+from app.services.template_cache import get_template_cache
+
+
+async def _sqlite_engine(*titles: str):
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession)() as session:
+        session.add_all([Template(title=title, sections=[]) for title in titles])
+        await session.commit()
+    return engine
+
+
+def _unreachable_engine(tmp_path):
+    return create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/replica.db")
+
+
+async def test_sessions_rotate_across_replicas():
+    replicas = ReplicaSet([await _sqlite_engine(), await _sqlite_engine()])
+    seen = []
+    for _ in range(4):
+        session = replicas.session()
+        seen.append(session.info['replica'])
+        await session.close()
+    assert seen == [0, 1, 0, 1]
+    await replicas.dispose()
+
+
+async def _count(session):
+    return await session.scalar(select(func.count()).select_from(Template))
+
+
+async def test_failed_replica_is_skipped_until_retry(tmp_path):
+    primary = await _sqlite_engine("a", "b")
+    replicas = ReplicaSet([_unreachable_engine(tmp_path), await _sqlite_engine()], retry_seconds=30)
+
+    # Nothing connects until the first statement, which fails over
+    async with sessionmaker(primary, class_=AsyncSession)() as fallback:
+        first = replicas.session(fallback)
+        assert first.info['replica'] == 0
+        assert replicas._down_until == {}
+        assert await _count(first) == 2
+        assert first.failed_over and 'replica' not in first.info
+        await first.close()
+    assert replicas.snapshots()[0]['available'] is False
+    down_until = replicas._down_until[0]
+
+    # While it is marked down the broken replica isn't tried again
+    for _ in range(3):
+        session = replicas.session()
+        assert session.info['replica'] == 1
+        assert await _count(session) == 0
+        await session.close()
+    assert replicas._down_until[0] == down_until
+
+    # Once the retry window has passed it is tried (and here fails) again
+    replicas._down_until[0] = 0.0
+    for _ in range(2):
+        async with sessionmaker(primary, class_=AsyncSession)() as fallback:
+            session = replicas.session(fallback)
+            await _count(session)
+            await session.close()
+    assert replicas._down_until[0] > 0.0
+    await replicas.dispose()
+    await primary.dispose()
+
+
+async def test_errors_in_the_statement_are_not_retried(tmp_path):
+    primary = await _sqlite_engine()
+    replicas = ReplicaSet([await _sqlite_engine()])
+    async with sessionmaker(primary, class_=AsyncSession)() as fallback:
+        session = replicas.session(fallback)
+        with pytest.raises(StatementError):
+            await session.execute(text("SELECT :missing"))
+        assert not session.failed_over
+        await session.close()
+    assert replicas._down_until == {}
+    await replicas.dispose()
+    await primary.dispose()
+
+
+async def test_reads_use_replica_and_fall_back_to_primary(tmp_path, monkeypatch):
+    primary = await _sqlite_engine("written to primary")
+    replica = await _sqlite_engine("on replica")
+    primary_factory = sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with primary_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    monkeypatch.setattr(db_session_module, "_replicas", ReplicaSet([replica]))
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            from_replica = await client.get("/api/templates/")
+            from_primary = await client.get("/api/templates/", headers={"X-Read-Your-Writes": "true"})
+            monkeypatch.setattr(db_session_module, "_replicas", ReplicaSet([_unreachable_engine(tmp_path)]))
+            fallback = await client.get("/api/templates/")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [t["title"] for t in from_replica.json()["items"]] == ["on replica"]
+    assert [t["title"] for t in from_primary.json()["items"]] == ["written to primary"]
+    assert fallback.status_code == 200
+    assert [t["title"] for t in fallback.json()["items"]] == ["written to primary"]
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def test_cached_templates_are_filled_from_primary_without_touching_replica(tmp_path, monkeypatch):
+    primary = await _sqlite_engine("current")
+    replica = await _sqlite_engine()
+    primary_factory = sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+    async with primary_factory() as session:
+        template = (await session.execute(select(Template))).scalar_one()
+    # The replica still has the template's previous title
+    async with sessionmaker(replica, class_=AsyncSession)() as session:
+        session.add(Template(id=template.id, title="stale", sections=[]))
+        await session.commit()
+
+    async def override_session():
+        async with primary_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    replicas = ReplicaSet([replica])
+    monkeypatch.setattr(db_session_module, "_replicas", replicas)
+    get_template_cache().clear()
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            miss = await client.get(f"/api/templates/{template.id}")
+            # A cache hit never reaches the replica, so a dead one isn't noticed
+            dead = ReplicaSet([_unreachable_engine(tmp_path)])
+            monkeypatch.setattr(db_session_module, "_replicas", dead)
+            hit = await client.get(f"/api/templates/{template.id}")
+    finally:
+        app.dependency_overrides.clear()
+        get_template_cache().clear()
+
+    assert miss.json()["title"] == "current"
+    assert hit.json()["title"] == "current"
+    assert dead._down_until == {}
+    await primary.dispose()
+    await replica.dispose()
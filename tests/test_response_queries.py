@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.db.session import get_async_session
+from app.main import app
+from app.models.questionnaire import QuestionnaireResponse
+from app.models.template import Template
+from app.schemas.questionnaire import AnswerFilter, ResponseQuery
+from app.services.questionnaire_service import QuestionnaireService
+from app.services.response_query import answer_jsonpath, response_filter_clauses
+from app.services.response_validator import ResponseValidators
+
+
+async def _seed(db_session):
+    template = Template(title="Memoir", sections=[{"title": "Life", "questions": []}])
+    other = Template(title="Career", sections=[{"title": "Work", "questions": []}])
+    db_session.add_all([template, other])
+    await db_session.flush()
+    start = datetime(2024, 1, 1)
+    answers = [
+        ({"tone": "warm", "q3": 5, "topics": ["career", "family"]}, 'submitted'),
+        ({"tone": "warm", "q3": 2, "topics": ["family"]}, 'completed'),
+        ({"tone": "formal", "q3": 4, "topics": ["career"]}, 'submitted'),
+        ({"tone": "warm", "q3": 4}, 'submitted'),
+    ]
+    db_session.add_all([
+        QuestionnaireResponse(
+            template_id=template.id, responses=responses, status=status,
+            created_at=start + timedelta(minutes=i)
+        )
+        for i, (responses, status) in enumerate(answers)
+    ])
+    db_session.add(QuestionnaireResponse(template_id=other.id, responses={"tone": "warm"}))
+    await db_session.commit()
+    return template
+
+
+def _service(db_session):
+    return QuestionnaireService(db_session, validators=ResponseValidators())
+
+
+async def test_search_filters_by_columns_and_answers(db_session):
+    template = await _seed(db_session)
+    service = _service(db_session)
+
+    page = await service.search_responses(ResponseQuery(
+        template_id=template.id,
+        status=['submitted'],
+        answers={"tone": "warm", "topics": ["career"]}
+    ))
+    assert [r.responses["q3"] for r in page.items] == [5]
+
+    page = await service.search_responses(ResponseQuery(
+        template_id=template.id,
+        filters=[AnswerFilter(key="q3", op="ge", value=4), AnswerFilter(key="topics", op="exists")]
+    ))
+    assert [r.responses["q3"] for r in page.items] == [5, 4]
+
+
+async def test_search_pages_in_creation_order(db_session):
+    template = await _seed(db_session)
+    service = _service(db_session)
+    query = ResponseQuery(template_id=template.id)
+
+    first = await service.search_responses(query, limit=3)
+    second = await service.search_responses(query, cursor=first.next_cursor, limit=3)
+
+    assert [r.responses["q3"] for r in first.items + second.items] == [5, 2, 4, 4]
+    assert second.next_cursor is None
+
+
+async def test_counts_group_by_status_and_answer(db_session):
+    template = await _seed(db_session)
+    service = _service(db_session)
+
+    by_status = await service.count_responses(ResponseQuery(template_id=template.id), group_by="status")
+    by_tone = await service.count_responses(ResponseQuery(), group_by="answers.tone")
+    total = await service.count_responses(ResponseQuery(filters=[AnswerFilter(key="q3", op="lt", value=5)]))
+
+    assert by_status.total == 4
+    assert {(g.value, g.count) for g in by_status.groups} == {('submitted', 3), ('completed', 1)}
+    assert [(g.value, g.count) for g in by_tone.groups] == [('warm', 4), ('formal', 1)]
+    assert total.total == 3
+
+
+async def test_count_endpoint_rejects_unknown_grouping(db_session):
+    async def override_session():
+        yield db_session
+
+    app.dependency_overrides[get_async_session] = override_session
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/questionnaires/counts?group_by=title", json={})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 400
+
+
+def test_postgres_filters_use_indexable_jsonb_operators():
+    query = ResponseQuery(
+        answers={"topics": ["career"]},
+        filters=[AnswerFilter(key='say "hi"', op="gt", value=3)]
+    )
+
+    sql = " AND ".join(
+        str(clause.compile(dialect=postgresql.dialect()))
+        for clause in response_filter_clauses(query, "postgresql")
+    )
+
+    assert "questionnaire_responses.responses @> " in sql
+    assert "questionnaire_responses.responses @? CAST(" in sql and "AS JSONPATH)" in sql
+    assert answer_jsonpath(query.filters[0]) == '$."say \\"hi\\"" ? (@ > 3)'
+
+
+def test_postgres_schema_uses_jsonb_and_gin_index():
+    table = QuestionnaireResponse.__table__
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    gin = next(i for i in table.indexes if i.name == "ix_questionnaire_responses_responses_gin")
+
+    assert "responses JSONB NOT NULL" in ddl
+    assert "USING gin (responses jsonb_path_ops)" in str(CreateIndex(gin).compile(dialect=postgresql.dialect()))
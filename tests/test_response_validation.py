@@ -0,0 +1,83 @@
+from uuid import uuid4
+import pytest
+from pydantic import ValidationError
+from app.models.template import Template
+from app.services.questionnaire_service import QuestionnaireService
+from app.services.response_validator import ResponseValidators, compile_response_model
+
+SECTIONS = [
+    {
+        "title": "About you",
+        "questions": [
+            {"text": "Your name", "type": "text", "max_length": 20},
+            {"id": "tone", "text": "Tone", "type": "choice", "options": ["warm", "formal"]},
+        ]
+    },
+    {
+        "title": "Book",
+        "questions": [
+            {"text": "Confidence", "type": "rating", "min": 1, "max": 5},
+            {"id": "topics", "text": "Topics", "type": "checkbox",
+             "options": [{"value": "career"}, {"value": "family"}]},
+            {"id": "notes", "text": "Anything else?", "type": "textarea", "required": False},
+        ]
+    },
+]
+
+
+def _errors(model, responses):
+    with pytest.raises(ValidationError) as exc_info:
+        model.model_validate(responses)
+    return {e['loc']: e['type'] for e in exc_info.value.errors()}
+
+
+def test_compiled_model_reports_errors_by_answer_key():
+    model = compile_response_model(SECTIONS)
+
+    errors = _errors(model, {"q1": "x" * 21, "tone": "sarcastic", "q3": 9, "topics": [], "extra": 1})
+
+    assert errors == {
+        ('q1',): 'string_too_long',
+        ('tone',): 'literal_error',
+        ('q3',): 'less_than_equal',
+        ('topics',): 'too_short',
+        ('extra',): 'extra_forbidden',
+    }
+    assert _errors(model, {})[('tone',)] == 'missing'
+
+
+def test_valid_answers_are_normalized_and_optional_ones_omitted():
+    validators = ResponseValidators()
+
+    responses = validators.validate(
+        uuid4(), 1, SECTIONS,
+        {"q1": "Ada", "tone": "warm", "q3": "4", "topics": ["family"]}
+    )
+
+    assert responses == {"q1": "Ada", "tone": "warm", "q3": 4, "topics": ["family"]}
+
+
+def test_models_are_cached_per_template_version():
+    validators = ResponseValidators()
+    template_id = uuid4()
+
+    first = validators.model_for(template_id, 1, SECTIONS)
+
+    assert validators.model_for(template_id, 1, []) is first
+    assert validators.model_for(template_id, 2, SECTIONS[:1]) is not first
+
+
+async def test_bulk_create_rejects_invalid_answers_per_item(db_session):
+    template = Template(title="Memoir", sections=SECTIONS)
+    db_session.add(template)
+    await db_session.commit()
+    valid = {"q1": "Ada", "tone": "formal", "q3": 5, "topics": ["career"]}
+
+    result = await QuestionnaireService(db_session, validators=ResponseValidators()).bulk_create_responses([
+        {"template_id": str(template.id), "responses": valid},
+        {"template_id": str(template.id), "responses": {**valid, "tone": "loud"}},
+    ])
+
+    assert len(result.created) == 1
+    assert result.errors[0].index == 1
+    assert result.errors[0].errors[0]['loc'] == ('responses', 'tone')
@@ -0,0 +1,43 @@
+import json
+import sys
+from loguru import logger
+from app.core.config import get_settings
+from app.core.logging import RotatingFileTarget, get_log_pipeline_stats
+from app.main import app
+from benchmarks.import_time import APP_SELF_BUDGET_MS, TOTAL_BUDGET_MS, measure_import
+
+
+def test_app_imports_within_budget_without_settings_or_io(tmp_path):
+    profile = measure_import("app.main", cwd=str(tmp_path))
+
+    assert profile.eager == []
+    assert profile.total_ms <= TOTAL_BUDGET_MS
+    assert profile.app_self_ms <= APP_SELF_BUDGET_MS
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_log_file_is_created_by_first_write(tmp_path):
+    path = tmp_path / "logs" / "app.log"
+    target = RotatingFileTarget(path, max_bytes=1024)
+    assert not path.parent.exists()
+
+    target.write(b"line\n")
+    target.close()
+
+    assert path.read_bytes() == b"line\n"
+
+
+async def test_lifespan_installs_and_flushes_log_sinks(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "LOG_MODE", "queued")
+    monkeypatch.setattr(settings, "LOG_FILE_PATH", str(tmp_path / "app.log"))
+    try:
+        async with app.router.lifespan_context(app):
+            logger.info("started")
+            assert get_log_pipeline_stats()["dropped"] == 0
+    finally:
+        logger.add(sys.stderr)
+
+    lines = [json.loads(line) for line in (tmp_path / "app.log").read_text().splitlines()]
+    assert "started" in [line["message"] for line in lines]
+    assert get_log_pipeline_stats()["written"] == 0  # Sinks were stopped and removed
@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import httpx
+import pytest
+from app.services import storage as storage_module
+from app.services.storage import (
+    LocalStorageBackend,
+    StorageError,
+    SupabaseStorageBackend,
+    UploadItem,
+    close_storage_backend,
+    get_storage_backend
+)
+
+
+def _file(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(bytes(i % 251 for i in range(size)))
+    return path
+
+
+async def test_local_backend_round_trip(tmp_path):
+    backend = LocalStorageBackend(tmp_path / "objects")
+    source = _file(tmp_path, "chapter.wav", 1000)
+
+    await backend.upload(UploadItem("book/chapter_000.wav", source, "audio/wav"))
+    await backend.download("book/chapter_000.wav", tmp_path / "copy.wav")
+
+    assert (tmp_path / "copy.wav").read_bytes() == source.read_bytes()
+    await backend.delete(["book/chapter_000.wav", "book/missing.wav"])
+    with pytest.raises(StorageError) as exc_info:
+        await backend.download("book/chapter_000.wav", tmp_path / "again.wav")
+    assert exc_info.value.retryable is False
+
+
+async def test_local_backend_rejects_keys_outside_root(tmp_path):
+    backend = LocalStorageBackend(tmp_path / "objects")
+
+    with pytest.raises(StorageError):
+        await backend.upload(UploadItem("../escape.wav", _file(tmp_path, "a.wav", 10)))
+    assert not (tmp_path / "escape.wav").exists()
+
+
+async def test_local_backend_upload_of_the_object_itself_is_a_noop(tmp_path):
+    backend = LocalStorageBackend(tmp_path)
+    source = _file(tmp_path, "chapter.wav", 10)
+
+    await backend.upload(UploadItem("chapter.wav", source))
+
+    assert source.read_bytes() == bytes(range(10))
+
+
+async def test_upload_many_bounds_concurrency(tmp_path):
+    class SlowBackend(LocalStorageBackend):
+        in_flight = peak = 0
+
+        async def upload(self, item):
+            SlowBackend.in_flight += 1
+            SlowBackend.peak = max(SlowBackend.peak, SlowBackend.in_flight)
+            await asyncio.sleep(0.01)
+            await super().upload(item)
+            SlowBackend.in_flight -= 1
+
+    backend = SlowBackend(tmp_path / "objects", upload_concurrency=3)
+    items = [UploadItem(f"b/{i}.wav", _file(tmp_path, f"{i}.wav", 10)) for i in range(10)]
+
+    await backend.upload_many(items)
+
+    assert SlowBackend.peak == 3
+    assert all((tmp_path / "objects" / item.key).exists() for item in items)
+
+
+def _supabase(handler, **kwargs):
+    return SupabaseStorageBackend(
+        "https://project.supabase.co",
+        "service-key",
+        "audiobooks",
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
+
+
+async def test_supabase_small_upload_is_one_request(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"Key": "audiobooks/book/chapter_000.wav"})
+
+    backend = _supabase(handler)
+    source = _file(tmp_path, "chapter.wav", 1000)
+    await backend.upload(UploadItem("book/chapter_000.wav", source, "audio/wav"))
+    await backend.close()
+
+    (request,) = requests
+    assert request.method == "POST"
+    assert request.url == "https://project.supabase.co/storage/v1/object/audiobooks/book/chapter_000.wav"
+    assert request.headers["authorization"] == "Bearer service-key"
+    assert request.headers["x-upsert"] == "true"
+    assert request.headers["content-type"] == "audio/wav"
+    assert request.content == source.read_bytes()
+
+
+async def test_supabase_large_upload_goes_up_in_parts(tmp_path):
+    received = bytearray()
+    offsets = []
+
+    def handler(request):
+        if request.method == "POST":
+            assert request.url.path == "/storage/v1/upload/resumable"
+            assert request.headers["upload-length"] == "2500"
+            metadata = dict(item.split(" ") for item in request.headers["upload-metadata"].split(","))
+            assert base64.b64decode(metadata["objectName"]) == b"book/chapter_000.wav"
+            return httpx.Response(201, headers={"Location": "https://project.supabase.co/upload/abc"})
+        assert request.method == "PATCH"
+        assert int(request.headers["upload-offset"]) == len(received)
+        offsets.append(len(received))
+        received.extend(request.content)
+        return httpx.Response(204, headers={"Upload-Offset": str(len(received))})
+
+    backend = _supabase(handler, multipart_threshold=1000, chunk_size=1000)
+    source = _file(tmp_path, "chapter.wav", 2500)
+    await backend.upload(UploadItem("book/chapter_000.wav", source, "audio/wav"))
+    await backend.close()
+
+    assert offsets == [0, 1000, 2000]
+    assert bytes(received) == source.read_bytes()
+
+
+async def test_supabase_errors_are_classified(tmp_path):
+    statuses = iter([503, 403])
+    backend = _supabase(lambda request: httpx.Response(next(statuses), text="nope"))
+    item = UploadItem("book/chapter.wav", _file(tmp_path, "chapter.wav", 10))
+
+    with pytest.raises(StorageError) as unavailable:
+        await backend.upload(item)
+    with pytest.raises(StorageError) as forbidden:
+        await backend.upload(item)
+    await backend.close()
+
+    assert unavailable.value.retryable is True
+    assert forbidden.value.retryable is False
+
+
+async def test_supabase_download_streams_to_file(tmp_path):
+    payload = bytes(range(256)) * 100
+
+    def handler(request):
+        if request.url.path.endswith("missing.wav"):
+            return httpx.Response(404)
+        assert request.url.path == "/storage/v1/object/authenticated/audiobooks/book/chapter.wav"
+        return httpx.Response(200, content=payload)
+
+    backend = _supabase(handler)
+    await backend.download("book/chapter.wav", tmp_path / "out" / "chapter.wav")
+    with pytest.raises(StorageError):
+        await backend.download("book/missing.wav", tmp_path / "out" / "missing.wav")
+    await backend.close()
+
+    assert (tmp_path / "out" / "chapter.wav").read_bytes() == payload
+    assert not (tmp_path / "out" / "missing.wav").exists()
+
+
+async def test_shared_backend_is_created_once(monkeypatch, tmp_path):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_DIR", str(tmp_path))
+    monkeypatch.setattr(storage_module, "_storage_backend", None)
+
+    backend = get_storage_backend()
+    assert get_storage_backend() is backend
+    assert backend.root == tmp_path
+
+    await close_storage_backend()
+    assert storage_module._storage_backend is None
@@ -0,0 +1,194 @@
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from app.core.errors import DetailedHTTPException
+from app.models.template import Template
+from app.schemas.template import TemplateCreate, TemplateResponse
+from app.services.template_cache import TemplateCache
+from app.services.template_service import TemplateService
+
+
+async def _seed(session, count):
+    base = datetime(2024, 1, 1)
+    for i in range(count):
+        session.add(Template(
+            title=f"Template {i}",
+            sections=[{"title": "S", "questions": []}],
+            # Every other pair shares a timestamp to exercise the id tie-break
+            created_at=base + timedelta(minutes=i // 2)
+        ))
+    await session.commit()
+
+
+async def test_keyset_pages_cover_every_row_once(db_session):
+    await _seed(db_session, 25)
+    service = TemplateService(db_session)
+
+    seen = []
+    cursor = None
+    while True:
+        page = await service.list_templates_page(cursor=cursor, limit=10)
+        seen.extend(t.id for t in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+async def test_last_page_has_no_cursor(db_session):
+    await _seed(db_session, 3)
+    page = await TemplateService(db_session).list_templates_page(limit=3)
+
+    assert len(page.items) == 3
+    assert page.next_cursor is None
+
+
+async def test_invalid_cursor_is_rejected(db_session):
+    with pytest.raises(DetailedHTTPException) as exc_info:
+        await TemplateService(db_session).list_templates_page(cursor="not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+async def test_stream_templates_yields_bounded_chunks(db_session):
+    await _seed(db_session, 12)
+    service = TemplateService(db_session)
+
+    chunks = [chunk async for chunk in service.stream_templates(chunk_size=5)]
+
+    assert [len(c) for c in chunks] == [5, 5, 2]
+    page = await service.list_templates_page(limit=12)
+    assert [t.id for c in chunks for t in c] == [t.id for t in page.items]
+
+
+async def test_get_template_by_id_is_served_from_cache(db_session, test_template):
+    service = TemplateService(db_session)
+    created = await service.create_template(TemplateCreate(**test_template))
+    misses = service.cache.stats()['misses']
+
+    fetched = await service.get_template_by_id(created.id)
+
+    assert fetched is created
+    assert service.cache.stats()['misses'] == misses
+    assert service.cache.stats()['hits'] >= 1
+
+
+async def test_cache_invalidated_on_update(db_session, test_template):
+    service = TemplateService(db_session)
+    created = await service.create_template(TemplateCreate(**test_template))
+
+    db_template = await db_session.get(Template, created.id)
+    db_template.title = "Renamed"
+    db_template.version = 2
+    await db_session.commit()
+
+    fetched = await service.get_template_by_id(created.id)
+    assert fetched.title == "Renamed"
+    assert fetched.version == 2
+
+
+def test_template_cache_ignores_older_versions():
+    cache = TemplateCache(max_size=2)
+    now = datetime(2024, 1, 1)
+    newer = TemplateResponse(id=uuid4(), title="v2", sections=[], version=2,
+                             created_at=now, updated_at=now)
+    older = newer.model_copy(update={'title': "v1", 'version': 1})
+
+    cache.put(newer)
+    cache.put(older)
+
+    assert cache.get(newer.id).title == "v2"
+
+
+def test_template_cache_rejects_put_after_invalidation():
+    cache = TemplateCache(max_size=2)
+    now = datetime(2024, 1, 1)
+    stale = TemplateResponse(id=uuid4(), title="old", sections=[], created_at=now, updated_at=now)
+
+    # A reader takes its token, an update commits, then the reader finishes
+    generation = cache.generation(stale.id)
+    cache.invalidate(stale.id)
+    cache.put(stale, generation)
+
+    assert cache.get(stale.id) is None
+
+
+async def test_cache_invalidated_again_on_commit(db_session, test_template):
+    service = TemplateService(db_session)
+    created = await service.create_template(TemplateCreate(**test_template))
+
+    db_template = await db_session.get(Template, created.id)
+    db_template.title = "Renamed"
+    await db_session.flush()
+    # Old row re-cached by a concurrent reader between flush and commit
+    service.cache.put(created)
+    await db_session.commit()
+
+    assert service.cache.get(created.id) is None
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = TemplateCache(max_size=2)
+    now = datetime(2024, 1, 1)
+    templates = [
+        TemplateResponse(id=uuid4(), title=str(i), sections=[], created_at=now, updated_at=now)
+        for i in range(3)
+    ]
+    for t in templates:
+        cache.put(t)
+
+    assert cache.get(templates[0].id) is None
+    assert cache.stats()['evictions'] == 1
+
+
+async def test_stream_templates_closes_cursor_on_early_exit(db_session, monkeypatch):
+    await _seed(db_session, 6)
+    service = TemplateService(db_session)
+    closed = []
+    original_stream = db_session.stream
+
+    async def tracking_stream(*args, **kwargs):
+        result = await original_stream(*args, **kwargs)
+        original_close = result.close
+
+        async def close():
+            closed.append(True)
+            await original_close()
+
+        result.close = close
+        return result
+
+    monkeypatch.setattr(db_session, "stream", tracking_stream)
+
+    stream = service.stream_templates(chunk_size=2)
+    async for _ in stream:
+        break
+    await stream.aclose()
+
+    assert closed == [True]
+
+
+async def test_template_endpoints(db_session, test_template):
+    from httpx import AsyncClient
+    from app.db.session import get_async_session
+    from app.main import app
+
+    async def override_session():
+        yield db_session
+
+    app.dependency_overrides[get_async_session] = override_session
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            created = await client.post("/api/templates/", json=test_template)
+            template_id = created.json()["id"]
+            fetched = await client.get(f"/api/templates/{template_id}")
+            page = await client.get("/api/templates/", params={"limit": 5})
+            missing = await client.get(f"/api/templates/{uuid4()}")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert created.status_code == 201
+    assert fetched.json()["title"] == test_template["title"]
+    assert [t["id"] for t in page.json()["items"]] == [template_id]
+    assert missing.status_code == 404